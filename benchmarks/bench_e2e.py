@@ -0,0 +1,98 @@
+"""
+End-to-end benchmark of HpComwareDriver against the local simulated
+Comware SSH server (napalm_hp_comware.simulator, needs asyncssh).
+
+    python benchmarks/bench_e2e.py [--rows 1000] [--latency 0.05]
+        [--bandwidth 1000000] [--chunk-size 1024] [--sessions 8]
+
+Prints seconds and round trips (commands received by the server) of
+open(), the getters and cli() with and without pipelining, for one session
+and for --sessions concurrent sessions. Compare two revisions of the driver
+with the same options to measure round trip savings.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.simulator import ComwareSimulator, synthetic_outputs
+
+CLI_COMMANDS = ['display version', 'display interface brief', 'display arp',
+                'display mac-address', 'display lldp neighbor-information']
+
+STEPS = [
+    # name, function of an open driver
+    ('get_facts', lambda device: device.get_facts()),
+    ('get_facts_fast', lambda device: device.get_facts_fast()),
+    ('get_interfaces', lambda device: device.get_interfaces()),
+    ('get_interfaces_ip', lambda device: device.get_interfaces_ip()),
+    ('get_mac_address_table', lambda device: device.get_mac_address_table()),
+    ('get_arp_table', lambda device: device.get_arp_table()),
+    ('get_lldp_neighbors', lambda device: device.get_lldp_neighbors()),
+    ('cli', lambda device: device.cli(CLI_COMMANDS)),
+    ('cli pipelined', lambda device: device.cli(CLI_COMMANDS, pipeline_window=len(CLI_COMMANDS))),
+]
+
+
+def _driver(switch, optional_args):
+    return HpComwareDriver('127.0.0.1', switch.username, switch.password, timeout=30,
+                           optional_args=dict(optional_args, port=switch.port,
+                                              secret=switch.super_password))
+
+
+def session(switch, optional_args):
+    """ Return [(step, seconds, round trips)] of one driver session """
+    results = []
+    device = _driver(switch, optional_args)
+    sent = len(switch.commands)
+    start = time.perf_counter()
+    device.open()
+    results.append(('open', time.perf_counter() - start, len(switch.commands) - sent))
+    try:
+        for name, step in STEPS:
+            # every step starts with an empty cache and session state
+            device.invalidate_cache()
+            sent = len(switch.commands)
+            start = time.perf_counter()
+            step(device)
+            results.append((name, time.perf_counter() - start, len(switch.commands) - sent))
+    finally:
+        device.close()
+    return results
+
+
+def main(argv):
+    args = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    args.add_argument('--rows', type=int, default=1000)
+    args.add_argument('--latency', type=float, default=0.05)
+    args.add_argument('--bandwidth', type=int, default=1000000)
+    args.add_argument('--chunk-size', type=int, default=1024)
+    args.add_argument('--sessions', type=int, default=8)
+    args.add_argument('--read-mode', choices=('timing', 'prompt'), default='prompt')
+    options = args.parse_args(argv)
+
+    optional_args = {'read_mode': options.read_mode, 'global_delay_factor': 0.1,
+                     'fast_cli': True, 'command_cache': True}
+    with ComwareSimulator(synthetic_outputs(options.rows), latency=options.latency,
+                          bandwidth=options.bandwidth, chunk_size=options.chunk_size) as switch:
+        print('{:<24}{:>10}{:>8}'.format('one session', 'seconds', 'trips'))
+        for name, seconds, trips in session(switch, optional_args):
+            print('{:<24}{:>10.3f}{:>8}'.format(name, seconds, trips))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options.sessions) as pool:
+            runs = list(pool.map(lambda _: session(switch, optional_args),
+                                 range(options.sessions)))
+        elapsed = time.perf_counter() - start
+        print('')
+        print('{:<24}{:>10}{:>10}'.format('{} sessions'.format(options.sessions), 'mean', 'max'))
+        for idx, (name, _, _) in enumerate(runs[0]):
+            times = [run[idx][1] for run in runs]
+            print('{:<24}{:>10.3f}{:>10.3f}'.format(name, sum(times) / len(times), max(times)))
+        print('{:<24}{:>10.3f}'.format('wall time', elapsed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,198 @@
+"""
+Throughput and peak memory of the getters' parse paths on synthetic
+outputs of 10 to 1M rows, with no device attached.
+
+    python benchmarks/bench_parsers.py                       # up to 100k rows
+    python benchmarks/bench_parsers.py --max-size 1000000    # full range
+    python benchmarks/bench_parsers.py --parser textfsm --case arp_table
+    python benchmarks/bench_parsers.py --save                # new baseline
+    python benchmarks/bench_parsers.py --compare             # exit 1 on regression
+
+Every case feeds one output of synthetic.GENERATORS to the code a getter
+runs after sending its command: the parse method of the output
+(get_arp_table -> _arp_table_from_output ...), or the getter itself when
+it parses while reading (get_mac_address_table streams the rows) or keeps
+a snapshot (get_lldp_neighbors). Getters read the output from
+SyntheticChannel, a channel double answering with the synthetic text in
+64 KiB chunks. Rows are records of the output (MAC entries, ARP entries, LLDP
+neighbours, aggregation member ports, interfaces). Time is the best of
+--repeat runs, peak memory is measured in a separate run with tracemalloc
+and includes the result, not the output text.
+
+--compare checks every case and size of the baseline that was measured
+again: throughput below (1 - tolerance) or peak memory above
+(1 + tolerance) times the baseline is a regression. Baselines depend on
+the machine, save one before comparing on a new one.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils import synthetic
+
+SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+class SyntheticChannel(object):
+    """ netmiko connection double answering commands from outputs """
+
+    base_prompt = 'sw-01'
+    chunk_size = 65536
+
+    def __init__(self):
+        self.outputs = {}
+        self._pending = ''
+        self._offset = 0
+
+    def normalize_cmd(self, command):
+        return command + '\n'
+
+    def clear_buffer(self):
+        self._pending = ''
+
+    def write_channel(self, data):
+        command = data.strip()
+        self._pending = '{}\n{}\n<{}>'.format(command, self.outputs[command], self.base_prompt)
+        self._offset = 0
+
+    def read_channel(self):
+        data = self._pending[self._offset:self._offset + self.chunk_size]
+        self._offset += len(data)
+        return data
+
+    def send_command(self, command, **kwargs):
+        return self.outputs[command]
+
+    send_command_timing = send_command
+
+
+def _mac_address_table(driver, raw_text):
+    driver.device.outputs['display mac-address'] = raw_text
+    return driver.get_mac_address_table()
+
+
+def _lldp_neighbors(driver, raw_text):
+    driver.device.outputs['display lldp neighbor-information'] = raw_text
+    # drop the snapshot of the previous run
+    driver._lldp_snapshot = None
+    return driver.get_lldp_neighbors()
+
+
+def _interfaces_ip(driver, raw_text):
+    # drop the running config parsed by the previous run of the same text
+    driver._running_config = None
+    return driver._interfaces_ip_from_output(raw_text)
+
+
+CASES = [
+    # name, command of the generator, parse path of the getter
+    ('mac_address_table', 'display mac-address', _mac_address_table),
+    ('interfaces', 'display interface brief',
+     lambda driver, raw: driver._interfaces_from_output(raw)),
+    ('arp_table', 'display arp',
+     lambda driver, raw: driver._arp_table_from_output(raw)),
+    ('lldp_neighbors', 'display lldp neighbor-information', _lldp_neighbors),
+    ('link_aggregation_members', 'display link-aggregation verbose',
+     lambda driver, raw: driver._link_aggregation_members_from_output(raw)),
+    ('interfaces_ip', 'display current-configuration', _interfaces_ip),
+]
+
+
+def measure(function, raw_text, repeat, number=1):
+    """ Return (best seconds, peak bytes) of function(raw_text) """
+    seconds = min(timeit.repeat(
+            lambda: function(raw_text), number=number, repeat=repeat)) / number
+    tracemalloc.start()
+    try:
+        function(raw_text)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run(cases, sizes, parser, repeat):
+    """ Print and return {case: {size: {'rows_per_s', 'peak_kib'}}} """
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args={
+        'parser': parser, 'read_mode': 'prompt'})
+    driver.device = SyntheticChannel()
+    # session prepared: no paging, Comware v5 (plain lldp form of the generator)
+    driver.session.paging_disabled = True
+    driver.session.os_version = '5.20.105'
+    results = {}
+    print('{:<26}{:>9}{:>12}{:>14}{:>12}'.format('case', 'rows', 'seconds', 'rows/s', 'peak KiB'))
+    for name, command, parse in cases:
+        generator = synthetic.GENERATORS[command]
+        for size in sizes:
+            raw_text = generator(size)
+            # small outputs are parsed several times per run to be measurable
+            seconds, peak = measure(lambda raw: parse(driver, raw), raw_text, repeat,
+                                    number=max(1, 1000 // size))
+            del raw_text
+            result = {'rows_per_s': round(size / seconds), 'peak_kib': round(peak / 1024.0, 1)}
+            results.setdefault(name, {})[str(size)] = result
+            print('{:<26}{:>9}{:>12.5f}{:>14.0f}{:>12.0f}'.format(
+                    name, size, seconds, result['rows_per_s'], result['peak_kib']))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """ Return regression messages of results against baseline """
+    regressions = []
+    for name, sizes in sorted(baseline.items()):
+        for size, expected in sorted(sizes.items(), key=lambda item: int(item[0])):
+            measured = results.get(name, {}).get(size)
+            if measured is None:
+                continue
+            if measured['rows_per_s'] < expected['rows_per_s'] * (1 - tolerance):
+                regressions.append('{} {} rows: {:.0f} rows/s, baseline {:.0f}'.format(
+                        name, size, measured['rows_per_s'], expected['rows_per_s']))
+            if measured['peak_kib'] > expected['peak_kib'] * (1 + tolerance):
+                regressions.append('{} {} rows: {:.0f} KiB, baseline {:.0f}'.format(
+                        name, size, measured['peak_kib'], expected['peak_kib']))
+    return regressions
+
+
+def main(argv):
+    args = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    args.add_argument('--case', action='append', choices=[case[0] for case in CASES],
+                      help='run only this case (repeatable)')
+    args.add_argument('--max-size', type=int, default=100000)
+    args.add_argument('--parser', choices=('native', 'textfsm'), default='native')
+    args.add_argument('--repeat', type=int, default=3)
+    args.add_argument('--baseline', default=BASELINE)
+    args.add_argument('--save', action='store_true', help='write results as baseline')
+    args.add_argument('--compare', action='store_true', help='exit 1 on regression')
+    args.add_argument('--tolerance', type=float, default=0.3)
+    options = args.parse_args(argv)
+
+    cases = [case for case in CASES if not options.case or case[0] in options.case]
+    sizes = [size for size in SIZES if size <= options.max_size]
+    results = run(cases, sizes, options.parser, options.repeat)
+    # baselines are per parser
+    if options.save:
+        baseline = {}
+        if os.path.exists(options.baseline):
+            with open(options.baseline) as f:
+                baseline = json.load(f)
+        baseline.setdefault(options.parser, {}).update(results)
+        with open(options.baseline, 'w') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write('\n')
+    if options.compare:
+        with open(options.baseline) as f:
+            baseline = json.load(f).get(options.parser, {})
+        regressions = compare(results, baseline, options.tolerance)
+        for message in regressions:
+            print('Regression: ' + message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
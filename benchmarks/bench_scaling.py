@@ -0,0 +1,112 @@
+"""
+Scaling benchmark of the line oriented parsers against the regexes they
+replaced, on synthetic outputs of growing size.
+
+    python benchmarks/bench_scaling.py [--check]
+
+Prints seconds per size and the scaling exponent k of time ~ size**k
+between the smallest and the biggest size (1.0 is linear), for expected
+outputs and for outputs the regexes did not expect (long space runs and
+lines). --check exits with 1 when a line oriented parser scales worse than
+MAX_EXPONENT.
+"""
+import math
+import re
+import sys
+import timeit
+
+from napalm_hp_comware.utils import synthetic
+from napalm_hp_comware.utils.fast_parsers import (
+    INTERFACE_IPV4_RE,
+    MANUINFO_RE,
+    SYSNAME_RE,
+    parse_device_manuinfo,
+    parse_lldp_neighbor_information,
+)
+from napalm_hp_comware.utils.running_config import RunningConfig
+
+SIZES = (500, 1000, 2000, 4000, 8000)
+UNEXPECTED_SIZES = (50, 100, 200, 400)
+MAX_EXPONENT = 1.3
+
+# regex of get_lldp_neighbors before the single pass parser
+LLDP_RE = re.compile(
+    r'^LLDP.*port\s+\d+\[(.*)\]:\s+.*\s+Update\s+time\s+:\s+(.*)\s+\s+.*\s+.*\s+.*\s+Port\s+ID\s+:'
+    r'\s+(.*)\s+Port\s+description\s:.*\s+System\s+name\s+:\s(.*)\n', re.M)
+
+
+def config_ipv4(raw_text):
+    return [interface.ipv4 for interface in RunningConfig(raw_text).interfaces.values()]
+
+
+def config_sysname(raw_text):
+    return RunningConfig(raw_text).sysname
+
+
+CASES = [
+    # name, generator, line oriented parser, replaced regex
+    ('lldp', synthetic.lldp_neighbor_information,
+     parse_lldp_neighbor_information, LLDP_RE.findall),
+    ('interfaces_ip', synthetic.current_configuration,
+     config_ipv4, INTERFACE_IPV4_RE.findall),
+    ('sysname', synthetic.current_configuration, config_sysname, SYSNAME_RE.findall),
+    ('manuinfo', synthetic.device_manuinfo, parse_device_manuinfo, MANUINFO_RE.findall),
+]
+
+
+def _lldp_padded_port_id(n):
+    """ n neighbours, 'Port ID' lines with a run of spaces and no colon """
+    return synthetic.lldp_neighbor_information(n).replace(
+            '  Port ID          :', '  Port ID' + ' ' * 60 + '-')
+
+
+def _config_long_descriptions(n):
+    """ 50 interfaces, descriptions of n words """
+    return synthetic.current_configuration(50, description_words=n)
+
+
+# outputs the regexes did not expect, size is records or words per line
+UNEXPECTED_CASES = [
+    ('lldp', _lldp_padded_port_id, parse_lldp_neighbor_information, LLDP_RE.findall),
+    ('sysname', _config_long_descriptions, config_sysname, SYSNAME_RE.findall),
+]
+
+
+def measure(function, raw_text, repeat=3):
+    """ Best of repeat runs in seconds """
+    return min(timeit.repeat(lambda: function(raw_text), number=1, repeat=repeat))
+
+
+def exponent(sizes, times):
+    return math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+
+
+def run(title, cases, sizes):
+    """ Print timings of cases, return names of superlinear parsers """
+    failed = []
+    print('{:<15}{:<8}'.format(title, 'parser')
+          + ''.join('{:>10}'.format(n) for n in sizes) + '        k')
+    for name, generator, parser, regex in cases:
+        outputs = [generator(size) for size in sizes]
+        for label, function in (('lines', parser), ('regex', regex)):
+            times = [measure(function, raw_text) for raw_text in outputs]
+            k = exponent(sizes, times)
+            print('{:<15}{:<8}'.format(name, label)
+                  + ''.join('{:>10.5f}'.format(t) for t in times) + '{:>9.2f}'.format(k))
+            if label == 'lines' and k > MAX_EXPONENT:
+                failed.append(name)
+    print('')
+    return failed
+
+
+def main(argv):
+    failed = run('expected', CASES, SIZES)
+    failed += run('unexpected', UNEXPECTED_CASES, UNEXPECTED_SIZES)
+    if '--check' in argv and failed:
+        print('Superlinear: ' + ', '.join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,4 +1,27 @@
-"""napalm hp comware package."""
-from napalm_hp_comware.hp_comware import HpComwareDriver
+"""napalm hp comware package.
+
+HpComwareDriver is imported on first access, so importing the package or
+its utils does not load napalm, netmiko and paramiko.
+"""
+import importlib
 
 __all__ = ["HpComwareDriver"]
+
+# lazily imported attribute -> module
+_LAZY_ATTRIBUTES = {
+    'HpComwareDriver': 'napalm_hp_comware.hp_comware',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    # napalm.get_network_driver() looks for the driver class in dir(module)
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,236 @@
+"""
+Pool of prepared Comware SSH sessions shared by driver instances
+
+Sessions are kept per hostname/port/credentials with paging disabled and
+the user level escalated, so a borrowed session skips the SSH handshake,
+authentication and session preparation.
+
+    pool = ConnectionPool(max_sessions_per_device=2, idle_timeout=300)
+    device = HpComwareDriver('sw-01', 'user', 'pass',
+                             optional_args={'connection_pool': pool})
+    device.open()       # borrows an idle session or connects a new one
+    device.get_facts()
+    device.close()      # returns the session to the pool
+    ...
+    pool.close()
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from napalm_hp_comware.utils.session_state import SessionState
+
+logger = logging.getLogger(__name__)
+
+
+class HpConnectionPoolTimeout(Exception):
+    pass
+
+
+def pool_key(driver):
+    """ Return key of sessions driver can share (secrets only as digest) """
+    args = driver.netmiko_optional_args
+    secrets = '\0'.join([driver.password or '', args.get('secret', '')])
+    return (driver.hostname, args.get('port'), driver.username,
+            driver.proxy_host, hashlib.sha256(secrets.encode()).hexdigest())
+
+
+class PooledSession(object):
+    """ Netmiko connection with its SessionState """
+    __slots__ = ('key', 'device', 'session', 'created', 'last_used', 'last_checked')
+
+    def __init__(self, key, device, now):
+        self.key = key
+        self.device = device
+        self.session = SessionState()
+        self.created = now
+        self.last_used = now
+        self.last_checked = now
+
+    @property
+    def is_new(self):
+        """ True until the session was prepared (paging disabled) """
+        return not self.session.paging_disabled
+
+
+class ConnectionPool(object):
+    """ Thread safe pool of device sessions.
+
+        - max_sessions_per_device - open sessions per key, borrowed and idle
+                                    together (Comware VTY lines are scarce)
+        - idle_timeout - seconds after which an idle session is closed
+        - health_check_interval - idle sessions older than this are checked
+                                  with netmiko is_alive() before reuse and by
+                                  maintain(), which also keeps them alive
+        - acquire_timeout - seconds to wait for a free session slot
+        - prepare - disable paging and escalate the user level on new
+                    sessions (default: True)
+        - maintenance_interval - run maintain() every N seconds in a daemon
+                                 thread (default: None - call it yourself)
+    """
+
+    def __init__(self, max_sessions_per_device=2, idle_timeout=300, health_check_interval=30,
+                 acquire_timeout=60, prepare=True, maintenance_interval=None, clock=time.monotonic):
+        self.max_sessions_per_device = max_sessions_per_device
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.prepare = prepare
+        self._clock = clock
+        self._idle = defaultdict(list)
+        self._borrowed = Counter()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stop = threading.Event()
+        if maintenance_interval:
+            thread = threading.Thread(target=self._maintenance_loop,
+                                      args=(maintenance_interval,), daemon=True)
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _is_alive(device):
+        try:
+            return device.is_alive()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _disconnect(pooled):
+        try:
+            pooled.device.disconnect()
+        except Exception as e:
+            logger.debug(f' --- Closing pooled session to {pooled.key[0]} failed: {e} ---')
+
+    def _expired(self, pooled, now):
+        return self.idle_timeout is not None and now - pooled.last_used > self.idle_timeout
+
+    def acquire(self, driver):
+        """ Return PooledSession for driver, reusing an idle one if possible.
+        New sessions are connected with driver._connect().
+        """
+        key = pool_key(driver)
+        deadline = self._clock() + self.acquire_timeout
+        expired = []
+        pooled = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ValueError('Connection pool is closed')
+                idle = self._idle[key]
+                now = self._clock()
+                while idle and pooled is None:
+                    candidate = idle.pop()
+                    if self._expired(candidate, now):
+                        expired.append(candidate)
+                    else:
+                        pooled = candidate
+                if (pooled is not None or
+                        len(idle) + self._borrowed[key] < self.max_sessions_per_device):
+                    # slot is reserved, a new session is connected outside the lock
+                    self._borrowed[key] += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise HpConnectionPoolTimeout(f'No free session to {driver.hostname} '
+                                                  f'in {self.acquire_timeout} seconds')
+                self._cond.wait(remaining)
+        for session in expired:
+            self._disconnect(session)
+
+        now = self._clock()
+        if pooled is not None and now - pooled.last_checked >= self.health_check_interval:
+            if self._is_alive(pooled.device):
+                pooled.last_checked = now
+            else:
+                logger.info(f' --- Pooled session to {driver.hostname} is dead, reconnecting ---')
+                self._disconnect(pooled)
+                pooled = None
+        if pooled is None:
+            try:
+                pooled = PooledSession(key, driver._connect(), self._clock())
+            except Exception:
+                with self._cond:
+                    self._borrowed[key] -= 1
+                    self._cond.notify_all()
+                raise
+        pooled.last_used = self._clock()
+        return pooled
+
+    def release(self, pooled, discard=False):
+        """ Return borrowed session, discard=True closes it (broken session) """
+        with self._cond:
+            self._borrowed[pooled.key] -= 1
+            keep = not discard and not self._closed
+            if keep:
+                pooled.last_used = self._clock()
+                self._idle[pooled.key].append(pooled)
+            self._cond.notify_all()
+        if not keep:
+            self._disconnect(pooled)
+
+    def maintain(self):
+        """ Close expired idle sessions and check (keep alive) the others """
+        now = self._clock()
+        expired, to_check = [], []
+        with self._cond:
+            for key, idle in self._idle.items():
+                keep = []
+                for pooled in idle:
+                    if self._expired(pooled, now):
+                        expired.append(pooled)
+                    elif now - pooled.last_checked >= self.health_check_interval:
+                        # borrowed by the check
+                        to_check.append(pooled)
+                        self._borrowed[key] += 1
+                    else:
+                        keep.append(pooled)
+                idle[:] = keep
+        for pooled in expired:
+            self._disconnect(pooled)
+        for pooled in to_check:
+            alive = self._is_alive(pooled.device)
+            if alive:
+                pooled.last_checked = self._clock()
+            with self._cond:
+                self._borrowed[pooled.key] -= 1
+                if alive and not self._closed:
+                    # keep last_used, checks do not extend the idle lifetime
+                    self._idle[pooled.key].append(pooled)
+                self._cond.notify_all()
+            if not alive or self._closed:
+                self._disconnect(pooled)
+
+    def _maintenance_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error(f' --- Connection pool maintenance failed: {e} ---')
+
+    def stats(self):
+        """ Return {key: {'idle': n, 'borrowed': n}} """
+        with self._cond:
+            keys = set(self._idle) | set(self._borrowed)
+            return dict((key, {'idle': len(self._idle.get(key, ())),
+                               'borrowed': self._borrowed[key]})
+                        for key in keys
+                        if self._idle.get(key) or self._borrowed[key])
+
+    def close(self):
+        """ Close idle sessions, borrowed ones are closed when released """
+        self._stop.set()
+        with self._cond:
+            self._closed = True
+            idle = [pooled for sessions in self._idle.values() for pooled in sessions]
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._disconnect(pooled)
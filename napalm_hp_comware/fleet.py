@@ -0,0 +1,167 @@
+"""
+Run getters on many Comware devices concurrently
+
+    inventory = [
+        {'hostname': 'sw-01', 'username': 'u', 'password': 'p', 'site': 'dc1'},
+        {'hostname': 'sw-02', 'username': 'u', 'password': 'p', 'site': 'dc2',
+         'optional_args': {'read_mode': 'prompt'}},
+    ]
+    executor = FleetExecutor(max_workers=64, timeout=120, site_limits={'dc1': 8})
+    for result in executor.run(inventory, ['get_facts', ('get_arp_table', {})]):
+        print(result['hostname'], result['errors'] or result['results'])
+
+Results are yielded as soon as each device completes:
+
+    {
+     'hostname': 'sw-01',
+     'site': 'dc1',
+     'results': {'get_facts': {...}, 'get_arp_table': [...]},
+     'errors': {},                     # step ('open', getter, 'timeout') -> exception
+     'elapsed': 3.2,
+    }
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from napalm_hp_comware.hp_comware import HpComwareDriver
+
+logger = logging.getLogger(__name__)
+
+
+class HpFleetTimeout(Exception):
+    pass
+
+
+def default_driver_factory(device):
+    """ Build HpComwareDriver from an inventory entry """
+    return HpComwareDriver(
+            device['hostname'],
+            device['username'],
+            device['password'],
+            timeout=device.get('timeout', 60),
+            optional_args=device.get('optional_args'))
+
+
+class FleetExecutor(object):
+    """ Bounded concurrency open() -> getters -> close() over an inventory.
+
+        - max_workers - devices processed at the same time
+        - timeout - seconds one device may take, after that its result is
+                    yielded with a 'timeout' error and its worker is told
+                    to stop after the running getter and close the session.
+                    The device keeps its worker and site slot until then.
+        - site_limits - {site: max devices of the site processed at once}
+        - default_site_limit - limit of sites missing in site_limits
+        - driver_factory - callable(inventory entry) returning a driver
+    """
+
+    def __init__(self, max_workers=32, timeout=300, site_limits=None,
+                 default_site_limit=None, driver_factory=default_driver_factory,
+                 poll_interval=0.5):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.site_limits = dict(site_limits or {})
+        self.default_site_limit = default_site_limit
+        self.driver_factory = driver_factory
+        self.poll_interval = poll_interval
+
+    def _site_limit(self, site):
+        return self.site_limits.get(site, self.default_site_limit)
+
+    def _new_result(self, device):
+        return {
+            'hostname': device['hostname'],
+            'site': device.get('site'),
+            'results': {},
+            'errors': {},
+            'elapsed': None,
+        }
+
+    def _run_device(self, device, getters, state):
+        """ Worker: open, run getters until state['stop'] is set, close """
+        state['started'] = time.monotonic()
+        result = self._new_result(device)
+        try:
+            driver = self.driver_factory(device)
+            driver.open()
+        except Exception as e:
+            result['errors']['open'] = e
+            result['elapsed'] = time.monotonic() - state['started']
+            return result
+        try:
+            for getter in getters:
+                if state['stop'].is_set():
+                    break
+                name, kwargs = (getter, {}) if isinstance(getter, str) else getter
+                try:
+                    result['results'][name] = getattr(driver, name)(**kwargs)
+                except Exception as e:
+                    logger.error(f' --- {device["hostname"]}: {name} failed: {e} ---')
+                    result['errors'][name] = e
+        finally:
+            try:
+                driver.close()
+            except Exception as e:
+                logger.debug(f' --- {device["hostname"]}: close failed: {e} ---')
+        result['elapsed'] = time.monotonic() - state['started']
+        return result
+
+    def _abandon(self, device, state):
+        """ Result of a device over timeout. Its worker stops after the
+        running getter and closes the session in its own thread (netmiko
+        sessions are not thread safe). """
+        state['stop'].set()
+        result = self._new_result(device)
+        result['errors']['timeout'] = HpFleetTimeout(
+                f'{device["hostname"]} did not finish in {self.timeout} seconds')
+        result['elapsed'] = time.monotonic() - state['started']
+        return result
+
+    def run(self, inventory, getters):
+        """ Yield result of every inventory device as soon as it completes """
+        queue = deque(inventory)
+        running = {}
+        # timed out devices whose worker did not exit yet
+        abandoned = {}
+        site_running = Counter()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while queue or running:
+                # start as many devices as global and site limits allow
+                deferred = []
+                while queue and len(running) + len(abandoned) < self.max_workers:
+                    device = queue.popleft()
+                    site = device.get('site')
+                    limit = self._site_limit(site)
+                    if limit is not None and site_running[site] >= limit:
+                        deferred.append(device)
+                        continue
+                    state = {'stop': threading.Event()}
+                    future = pool.submit(self._run_device, device, getters, state)
+                    running[future] = (device, state)
+                    site_running[site] += 1
+                queue.extendleft(reversed(deferred))
+
+                done, _ = wait(set(running) | set(abandoned), timeout=self.poll_interval,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in abandoned:
+                        site_running[abandoned.pop(future).get('site')] -= 1
+                        continue
+                    device, state = running.pop(future)
+                    site_running[device.get('site')] -= 1
+                    yield future.result()
+
+                now = time.monotonic()
+                for future, (device, state) in list(running.items()):
+                    started = state.get('started')
+                    if started is not None and now - started > self.timeout:
+                        del running[future]
+                        abandoned[future] = device
+                        yield self._abandon(device, state)
+        finally:
+            # do not wait for abandoned devices
+            pool.shutdown(wait=False)
@@ -3,13 +3,14 @@ Napalm driver for HpComware Devices
 
 Read https://napalm.readthedocs.io for more information.
 """
-from netmiko import ConnectHandler, FileTransfer, InLineTransfer
-from netmiko import __version__ as netmiko_version
 
 import sys
 import re
+import time
+import socket
 import logging
 from json import dumps
+from functools import partial
 
 from napalm.base.utils import py23_compat
 from napalm.base.base import NetworkDriver
@@ -19,9 +20,34 @@ from napalm.base.exceptions import (
     MergeConfigException,
     ReplaceConfigException,
     CommandErrorException,
+    ConnectionClosedException,
     )
-from napalm.base.helpers import (
-    textfsm_extractor,
+from napalm_hp_comware.utils.command_cache import (
+    CommandCache,
+    changes_config,
+    is_read_only,
+)
+from napalm_hp_comware.utils.session_state import SessionState
+from napalm_hp_comware.utils.textfsm_registry import textfsm_extractor
+from napalm_hp_comware.utils.fast_parsers import (
+    NATIVE_PARSERS,
+    is_mac_address_header,
+    parse_arp,
+    parse_arp_regex,
+    parse_device_manuinfo,
+    parse_link_aggregation_verbose,
+    parse_mac_address_line,
+)
+from napalm_hp_comware.utils.mac_table import CompactMacTable
+from napalm_hp_comware.utils.mac_index import MacIndex
+from napalm_hp_comware.utils.metrics import TransferMetrics, metered
+from napalm_hp_comware.utils.running_config import RunningConfig
+from napalm_hp_comware.utils.prompt import (
+    is_interactive,
+    is_rejected,
+    prompt_line_pattern,
+    prompt_pattern,
+    split_pipelined_output,
 )
 logger = logging.getLogger(__name__)
 
@@ -55,12 +81,45 @@ class HpComwareDriver(NetworkDriver):
             - proxy_username - hopping station username
             - proxy_password - hopping station password
             - proxy_port - hopping station ssh port
-            TODO: 
-                Set proxy host to work with user/password 
-                (works only with preloaded ssh-key in the ssh-agent for now)
+            - proxy_mode - 'native' (default) opens device sessions as channels
+                          of one SSH transport to the hopping station shared
+                          by all drivers, 'ssh_config' generates a ssh config
+                          file with 'ssh ... nc %h %p' ProxyCommand (ssh-agent
+                          keys only)
+            - command_cache - cache 'display' outputs for the session (default: False)
+            - command_cache_size - max number of cached commands (default: 128)
+            - command_cache_ttl - default TTL of cached output in seconds (default: 300)
+            - command_cache_ttls - dict with per command (or command prefix) TTLs
+            - read_mode - 'timing' (default) waits for the channel to go quiet,
+                          'prompt' returns as soon as the Comware prompt is back
+                          (use it with a low global_delay_factor)
+            - cli_pipeline_window - number of 'display' commands cli() writes
+                          to the channel at once (default: 0 - no pipelining)
+            - parser - 'native' (default) parses the biggest outputs with single
+                          pass parsers falling back to TextFSM, 'textfsm' always
+                          uses the TextFSM templates
+            - mac_index - answer trace_mac_address from an in-memory index of
+                          the full MAC table (default: False)
+            - mac_index_max_age - seconds after which the index is rebuilt (default: 300)
+            - mac_index_arp - add the ARP table to the index (default: False)
+            - connection_pool - ConnectionPool to borrow the session from in
+                          open() and return it to in close()
+            - fast_facts - get_facts() uses get_facts_fast() (default: False)
+            - scoped_config - read only the needed part of the running config
+                          ('| include sysname', 'display current-configuration
+                          interface', '| begin interface') falling back to
+                          the full dump where rejected (default: True)
+            - metrics_sink - callable receiving a TimingEvent per command,
+                          parse step and getter, ex: LatencyStats() (default: None)
+            - record - path of a transcript file the session is recorded to
+            - replay - path of a transcript file open() replays instead of
+                          connecting to the device
+            - replay_speed - None (default) replays as fast as possible,
+                          1.0 at the recorded speed
         """
 
         self.device = None
+        self.session = SessionState()
         self.hostname = hostname
         self.username = username
         self.password = password
@@ -76,15 +135,63 @@ class HpComwareDriver(NetworkDriver):
         self.proxy_port = optional_args.get('proxy_port', None)
        
 
-        # Check for proxy parameters and generate ssh config file
+        # Check for proxy parameters and set up the jump host
+        self.proxy_mode = optional_args.get('proxy_mode', 'native')
+        self.jump_host = None
+        self.ssh_proxy_file = None
         if self.proxy_host:
-            if self.proxy_port and self.proxy_username: 
+            if not (self.proxy_port and self.proxy_username):
+                raise ValueError("All proxy options must be specified ")
+            if self.proxy_mode == 'native':
+                from napalm_hp_comware.jump_host import JumpHost
+                self.jump_host = JumpHost.shared(
+                        self.proxy_host, port=self.proxy_port,
+                        username=self.proxy_username, password=self.proxy_password)
+            elif self.proxy_mode == 'ssh_config':
                 print("Generate SSH proxy config file for hopping station: {}".format(self.proxy_host))
                 self.ssh_proxy_file = self._generate_ssh_proxy_file()
             else:
-                raise ValueError("All proxy options must be specified ")
+                raise ValueError("Unknown proxy_mode: {}".format(self.proxy_mode))
+
+        self.read_mode = optional_args.get('read_mode', 'timing')
+        if self.read_mode not in ('timing', 'prompt'):
+            raise ValueError("Unknown read_mode: {}".format(self.read_mode))
+        self.cli_pipeline_window = optional_args.get('cli_pipeline_window', 0)
+        self.parser = optional_args.get('parser', 'native')
+        if self.parser not in ('native', 'textfsm'):
+            raise ValueError("Unknown parser: {}".format(self.parser))
+
+        # MAC/ARP index
+        self.use_mac_index = optional_args.get('mac_index', False)
+        self.mac_index_max_age = optional_args.get('mac_index_max_age', 300)
+        self.mac_index_arp = optional_args.get('mac_index_arp', False)
+        self._mac_index = None
+        # {local port_key: [lldp entries]} of the session
+        self._lldp_snapshot = None
+        # RunningConfig of the last fetched running config
+        self._running_config = None
+        self.scoped_config = optional_args.get('scoped_config', True)
+        self.fast_facts = optional_args.get('fast_facts', False)
+        # transcripts (see napalm_hp_comware.transcript)
+        self.record = optional_args.get('record', None)
+        self.replay = optional_args.get('replay', None)
+        self.replay_speed = optional_args.get('replay_speed', None)
+        # command forms the device rejected
+        self._rejected_commands = set()
+        self.metrics = TransferMetrics(sink=optional_args.get('metrics_sink', None))
+
+        # Shared sessions
+        self.connection_pool = optional_args.get('connection_pool', None)
+        self._pooled = None
+
+        # Command output cache
+        if optional_args.get('command_cache', False):
+            self.command_cache = CommandCache(
+                    maxsize=optional_args.get('command_cache_size', 128),
+                    ttl=optional_args.get('command_cache_ttl', 300),
+                    ttls=optional_args.get('command_cache_ttls', None))
         else:
-            self.ssh_proxy_file = None
+            self.command_cache = None
 
         # Netmiko possible arguments
         netmiko_argument_map = {
@@ -103,16 +210,10 @@ class HpComwareDriver(NetworkDriver):
             'alt_host_keys': False,
             'alt_key_file': '',
             'ssh_config_file': None,
+            'fast_cli': False,
+            # dropped in _connect() for netmiko older than 1.1
+            'allow_agent': False,
         }
-         
-
-        fields = netmiko_version.split('.')
-        fields = [int(x) for x in fields]
-        maj_ver, min_ver, bug_fix = fields
-        if maj_ver >= 2:
-            netmiko_argument_map['allow_agent'] = False
-        elif maj_ver == 1 and min_ver >= 1:
-            netmiko_argument_map['allow_agent'] = False
 
         # Build dict of any optional Netmiko args
         self.netmiko_optional_args = {}
@@ -142,34 +243,122 @@ class HpComwareDriver(NetworkDriver):
  
     def open(self):
         """Open a connection to the device."""
-        self.device = ConnectHandler(
+        self.invalidate_cache()
+        self._lldp_snapshot = None
+        if self.connection_pool is not None:
+            self._borrow()
+        else:
+            self.session.reset()
+            self.device = self._connect()
+
+    def _connect(self):
+        """ Return new netmiko connection to the device (or the replay of a
+        transcript), recording it when asked to """
+        if self.replay is not None:
+            from napalm_hp_comware.transcript import ReplayDevice, Transcript
+            return ReplayDevice(
+                    Transcript.load(self.replay), speed=self.replay_speed,
+                    username=self.username, password=self.password,
+                    secret=self.netmiko_optional_args.get('secret', ''),
+                    global_delay_factor=self.netmiko_optional_args.get('global_delay_factor', 1),
+                    fast_cli=self.netmiko_optional_args.get('fast_cli', False))
+        # netmiko is imported with the first connection
+        from netmiko import ConnectHandler
+        from netmiko import __version__ as netmiko_version
+        netmiko_optional_args = self.netmiko_optional_args
+        maj_ver, min_ver = [int(x) for x in netmiko_version.split('.')[:2]]
+        if (maj_ver, min_ver) < (1, 1):
+            netmiko_optional_args = dict(netmiko_optional_args)
+            netmiko_optional_args.pop('allow_agent', None)
+        connect_handler = ConnectHandler
+        if self.jump_host is not None:
+            from napalm_hp_comware.jump_host import jump_connect_handler
+            connect_handler = partial(jump_connect_handler, self.jump_host)
+        device = connect_handler(
                 device_type = 'hp_comware',
                 host = self.hostname,
                 username = self.username,
                 password = self.password,
-                **self.netmiko_optional_args)
+                **netmiko_optional_args)
+        if self.record is not None:
+            from napalm_hp_comware.transcript import record
+            record(device, self.record, hostname=self.hostname)
+        return device
+
+    def _borrow(self):
+        """ Take session from the connection pool, preparing new sessions """
+        pooled = self.connection_pool.acquire(self)
+        self.device = pooled.device
+        self.session = pooled.session
+        if self.connection_pool.prepare and pooled.is_new:
+            try:
+                self.disable_pageing()
+                self.privilege_escalation()
+            except HpComwarePrivilegeError:
+                logger.warning(f' --- {self.hostname}: pooled session not escalated ---')
+            except Exception:
+                self.connection_pool.release(pooled, discard=True)
+                self.device = None
+                self.session = SessionState()
+                raise
+        self._pooled = pooled
 
     def close(self):
         """Close the connection to the device."""
-        self.device.disconnect()
+        self.invalidate_cache()
+        self._lldp_snapshot = None
+        if self._pooled is not None:
+            pooled, self._pooled = self._pooled, None
+            self.connection_pool.release(pooled)
+            self.device = None
+            self.session = SessionState()
+        else:
+            self.session.reset()
+            self.device.disconnect()
+
+    def invalidate_cache(self, command=None):
+        """ Drop command (or all commands if None) from the command cache """
+        if self.command_cache is not None:
+            self.command_cache.invalidate(command)
+
 
+    @property
+    def current_user_level(self):
+        """ User level of the session as shown by 'display users' """
+        return self.session.user_level
 
     def disable_pageing(self):
-        """ Disable pageing on the device """
+        """ Disable pageing on the device (once per session) """
+        if self.session.paging_disabled:
+            return
         out_disable_pageing = self._send_command('screen-length disable')
         if 'configuration is disabled for current user' in out_disable_pageing:
-            pass
+            self.session.paging_disabled = True
         else:
             raise ValueError("Disable Pageing cli command error: {}".format(out_disable_pageing))
             sys.exit(" --- Exiting: try to workaround this ---")
 
-    def get_current_privilege(self):
-        """ Get and set as property current privilege of the user """
-        raw_out = self._send_command('display users', delay_factor=2)
-        disp_usr_entries = textfsm_extractor(self, "display_users", raw_out)
-        self.current_user_level = disp_usr_entries[0]['user_level']
+    def get_current_privilege(self, refresh=False):
+        """ Get and set as property current privilege of the user, asking
+        the device once per session (again if refresh is True) """
+        if self.current_user_level is not None and not refresh:
+            return self.current_user_level
+        raw_out = self._send_command('display users', use_cache=False)
+        return self._privilege_from_output(raw_out)
+
+    def _privilege_from_output(self, raw_out):
+        """ Set and return user level from 'display users' """
+        disp_usr_entries = self.metrics.timed_parse(
+                'display_users', textfsm_extractor, self, 'display_users', raw_out)
+        self.session.user_level = disp_usr_entries[0]['user_level']
         return self.current_user_level
 
+    def get_os_version(self):
+        """ Return Comware version string, asking the device once per session """
+        if self.session.os_version is None:
+            self.get_version()
+        return self.session.os_version
+
 
     def privilege_escalation(self, os_version=''):
         """ Depends on Comware version 
@@ -193,9 +382,11 @@ class HpComwareDriver(NetworkDriver):
 
         
         """
-        os_version = os_version
-        # check user level mode
-        self.get_current_privilege()
+        if os_version:
+            self.session.os_version = os_version
+        # check user level mode (known after first check in this session)
+        if self.current_user_level is None:
+            self.get_current_privilege()
 
         if self.current_user_level == '3': 
             msg = f' Already in user level: {self.current_user_level} ' 
@@ -203,18 +394,17 @@ class HpComwareDriver(NetworkDriver):
             return 0
         elif self.current_user_level in ['1', '2']: 
             # Escalate user level in order to have all commands available
-            if os_version:
-                os_version = os_version
-            else:
-                os_version = self.get_version()['os_version']
+            os_version = self.get_os_version()
             if os_version.startswith('5.'):
                 cmd = 'super'
                 l1_password = self.device.password
                 l2_password = self.device.secret
                 self.device.send_command_expect(cmd, expect_string='assword:')
                 self.device.send_command_timing(l2_password, strip_command=True)
+                # outputs collected with the old user level are not valid anymore
+                self.invalidate_cache()
                 # Check and confirm user level mode
-                if self.get_current_privilege() == '3': 
+                if self.get_current_privilege(refresh=True) == '3': 
                     msg = f' --- Changed to user level: {self.current_user_level} ---' 
                     logger.info(msg); print(msg)
                     return 0
@@ -225,6 +415,7 @@ class HpComwareDriver(NetworkDriver):
                 cmd = 'system-view'
         
 
+    @metered
     def get_facts(self):
         """
         Returns a dictionary containing the following information:
@@ -251,7 +442,11 @@ class HpComwareDriver(NetworkDriver):
             'serial_number': u'SN0123A34AS',
             'hostname': u'eos-router',
             'fqdn': u'eos-router',
+
+        With the fast_facts optional arg the facts come from get_facts_fast().
         """
+        if self.fast_facts:
+            return self.get_facts_fast()
         self.disable_pageing()
         facts = self.get_version()
         facts['vendor'] = u'Hewlett-Packard'
@@ -260,17 +455,42 @@ class HpComwareDriver(NetworkDriver):
 
         # get hardware and serial number
         out_display_device = self._send_command("display device manuinfo")
-        match = re.findall(r"""^Slot\s+(\d+):\nDEVICE_NAME\s+:\s+(.*)\nDEVICE_SERIAL_NUMBER\s+:\s+(.*)\nMAC_ADDRESS\s+:\s+([0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4})\nMANUFACTURING_DATE\s+:\s+(.*)\nVENDOR_NAME\s+:\s+(.*)""",out_display_device,re.M)
+        out_display_current_config = self._scoped_config_output(
+                'display current-configuration | include sysname')
+        hostname = self._running_config_from_output(out_display_current_config).sysname
+        return self._facts_from_outputs(facts, out_display_device, hostname)
+
+    @metered
+    def get_facts_fast(self):
+        """ get_facts() with the fewest round trips: 'display version',
+        'display interface brief' and 'display device manuinfo' are sent in
+        one pipelined batch and the hostname is the sysname of the prompt.
+        The user level is escalated only if manuinfo is rejected.
+        """
+        commands = ['display version', 'display interface brief', 'display device manuinfo']
+        out_version, out_brief, out_display_device = self._send_commands_pipelined(
+                commands, len(commands))
+        facts = self._version_from_output(out_version)
+        facts['vendor'] = u'Hewlett-Packard'
+        facts['interface_list'] = list(self._interfaces_from_output(out_brief).keys())
+        if is_rejected(out_display_device):
+            self.invalidate_cache('display device manuinfo')
+            self.privilege_escalation(os_version=facts['os_version'])
+            out_display_device = self._send_command('display device manuinfo')
+        return self._facts_from_outputs(facts, out_display_device, self.device.base_prompt)
+
+    def _facts_from_outputs(self, facts, out_display_device, hostname):
+        """ Complete facts with the 'display device manuinfo' output and the
+        hostname """
         snumber = set()
         vendor = set()
         hwmodel = set()
-        for idx in match:
+        for idx in self.metrics.timed_parse(
+                'parse_device_manuinfo', parse_device_manuinfo, out_display_device):
             slot,dev,sn,mac,date,ven = idx
             snumber.add(sn)
             vendor.add(ven)
             hwmodel.add(dev)
-        out_display_current_config = self._send_command("display current-configuration")
-        hostname = ''.join(re.findall(r'.*\s+sysname\s+(.*)\n',out_display_current_config,re.M))
         facts["hostname"] = py23_compat.text_type(hostname),
         facts["serial_number"] = py23_compat.text_type(','.join(snumber)),
         facts["model"] = py23_compat.text_type(','.join(hwmodel)),
@@ -278,7 +498,22 @@ class HpComwareDriver(NetworkDriver):
         return facts
 
 
-    def get_interfaces(self):
+    def _parse(self, template_name, raw_out, parser=None):
+        """ Parse raw_out with the native parser of template_name when there is
+        one and parser (default self.parser) is 'native', else with TextFSM.
+        """
+        if (parser or self.parser) == 'native' and template_name in NATIVE_PARSERS:
+            entries = self.metrics.timed_parse(
+                    template_name, NATIVE_PARSERS[template_name], raw_out)
+            if entries is not None:
+                return entries
+            logger.debug(f'Unrecognised {template_name} output, fall back to TextFSM')
+        return self.metrics.timed_parse(
+                template_name, textfsm_extractor, self, template_name, raw_out)
+
+
+    @metered
+    def get_interfaces(self, parser=None):
         """
         Returns a dictionary of dictionaries. The keys for the first dictionary will be the \
         interfaces in the devices. The inner dictionary will containing the following data for \
@@ -316,7 +551,11 @@ class HpComwareDriver(NetworkDriver):
              },
         """
         raw_out_brief = self._send_command('display interface brief')
-        ifaces_entries_br = textfsm_extractor(self, "display_interface_brief", raw_out_brief)
+        return self._interfaces_from_output(raw_out_brief, parser)
+
+    def _interfaces_from_output(self, raw_out_brief, parser=None):
+        """ Build get_interfaces() result from 'display interface brief' """
+        ifaces_entries_br = self._parse("display_interface_brief", raw_out_brief, parser)
         ifaces = dict()
         for row in ifaces_entries_br:
             for k,v in row.items():
@@ -358,7 +597,8 @@ class HpComwareDriver(NetworkDriver):
         return ifaces
 
 
-    def get_mac_address_table(self, raw_mac_table=None):
+    @metered
+    def get_mac_address_table(self, raw_mac_table=None, parser=None, compact=False):
 
         """
         Returns a lists of dictionaries. Each dictionary represents an entry in the MAC Address
@@ -374,6 +614,9 @@ class HpComwareDriver(NetworkDriver):
         However, please note that not all vendors provide all these details.
         E.g.: field last_move is not available on JUNOS devices etc.
 
+        With compact=True a CompactMacTable (MACs as 48-bit integers, rows as
+        dict-like views) is returned instead of a list.
+
         Example::
 
             [
@@ -404,21 +647,84 @@ class HpComwareDriver(NetworkDriver):
                 }
             ]
         """
+        if raw_mac_table is not None and 'No mac address found' in raw_mac_table:
+            return ['No mac address found']
+        if (parser or self.parser) == 'native':
+            state = {}
+            entries = self._iter_mac_entries(raw_mac_table, state)
+            table = CompactMacTable(entries) if compact else list(entries)
+            return ['No mac address found'] if state.get('no_mac') else table
+
         if raw_mac_table is not None:
-            if 'No mac address found' in raw_mac_table:
-                return ['No mac address found']
-            out_mac_table = raw_mac_table
+            raw_out = raw_mac_table
         else:
             # Disable Pageing of the device
             self.disable_pageing()
-        raw_out = self._send_command('display mac-address')
-        mac_table_entries = textfsm_extractor(self, "display_mac_address_all", raw_out)
+            raw_out = self._send_command('display mac-address')
+            if 'No mac address found' in raw_out:
+                return ['No mac address found']
+        return self._mac_table_from_output(raw_out, parser, compact)
+
+    def _mac_table_from_output(self, raw_out, parser=None, compact=False):
+        """ Build get_mac_address_table() result from 'display mac-address' """
+        mac_table_entries = self._parse("display_mac_address_all", raw_out, parser)
         # owerwrite some values in order to be compliant 
         for row in mac_table_entries:                                            
             row['mac'] = self.format_mac_cisco_way(row['mac'])                   
             row['interface'] = self.normalize_port_name(row['interface'])        
+        if compact:
+            return CompactMacTable(mac_table_entries)
         return mac_table_entries
-    
+
+    def iter_mac_address_table(self, raw_mac_table=None):
+        """ Yield get_mac_address_table() entries one by one.
+
+        With read_mode 'prompt' and no command cache the rows are parsed
+        while 'display mac-address' output is read from the channel, so
+        memory use does not depend on the MAC table size. Otherwise the
+        output (or raw_mac_table) is read with _send_command and iterated.
+        Output without the column header goes through _parse (TextFSM
+        fallback) once it is complete.
+        """
+        return self._iter_mac_entries(raw_mac_table, {})
+
+    def _iter_mac_entries(self, raw_mac_table, state):
+        """ iter_mac_address_table(), state['no_mac'] is set when the device
+        answered 'No mac address found' """
+        command = 'display mac-address'
+        if raw_mac_table is not None:
+            lines = iter(raw_mac_table.splitlines())
+        elif self.read_mode == 'prompt' and self.command_cache is None:
+            self.disable_pageing()
+            lines = self._iter_command_lines(command)
+        else:
+            self.disable_pageing()
+            lines = iter(self._send_command(command).splitlines())
+        # lines before the column header, parsed once it shows up
+        kept = []
+        for line in lines:
+            if kept is not None:
+                kept.append(line)
+                if not is_mac_address_header(line):
+                    continue
+                pending, kept = kept, None
+            else:
+                pending = (line,)
+            for pending_line in pending:
+                row = parse_mac_address_line(pending_line)
+                if row is not None:
+                    row['mac'] = self.format_mac_cisco_way(row['mac'])
+                    row['interface'] = self.normalize_port_name(row['interface'])
+                    yield row
+        if kept is None:
+            return
+        raw_out = '\n'.join(kept)
+        if 'No mac address found' in raw_out:
+            state['no_mac'] = True
+            return
+        for row in self._mac_table_from_output(raw_out, 'native'):
+            yield row
+
     def format_mac_cisco_way(self,macAddress):
         """ 
         function formating mac address to cisco form 
@@ -432,7 +738,8 @@ class HpComwareDriver(NetworkDriver):
                 ':'+macAddress[8:10]+\
                 ':'+macAddress[10:12]
 
-    def get_arp_table(self):
+    @metered
+    def get_arp_table(self, parser=None):
 
         """
         Returns a list of dictionaries having the following set of keys:
@@ -462,16 +769,22 @@ class HpComwareDriver(NetworkDriver):
         # Disable Pageing of the device
         self.disable_pageing()
         out_arp_table = self._send_command('display arp')
-        arptable = re.findall(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+([0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4})\s+(\d+)\s+([A-Za-z0-9-/]{1,40})\s+(\d+)\s+(\w+)\n',out_arp_table,re.M)
+        return self._arp_table_from_output(out_arp_table, parser)
+
+    def _arp_table_from_output(self, out_arp_table, parser=None):
+        """ Build get_arp_table() result from 'display arp' """
+        if (parser or self.parser) == 'native':
+            arptable = self.metrics.timed_parse('parse_arp', parse_arp, out_arp_table)
+        else:
+            arptable = self.metrics.timed_parse('parse_arp_regex', parse_arp_regex, out_arp_table)
         output_arptable = []
-        record = {}
         for rec in arptable:
-            ip,mac,vlan,port,aging,arp_type = rec
-            record['interface'] = self.normalize_port_name(port)
-            record['mac'] = self.format_mac_cisco_way(mac)
-            record['ip'] = ip
-            record['vlan'] = vlan
-            record['aging'] = aging 
+            record = {}
+            record['interface'] = self.normalize_port_name(rec['interface'])
+            record['mac'] = self.format_mac_cisco_way(rec['mac'])
+            record['ip'] = rec['ip']
+            record['vlan'] = rec['vlan']
+            record['aging'] = rec['aging']
             output_arptable.append(record)
         return output_arptable     
 
@@ -504,6 +817,7 @@ class HpComwareDriver(NetworkDriver):
             return res_port 
             # print('\x1b[1;31;40m' + " --- Unknown Port Name: {} --- ".format(res_port)+'\x1b[0m')
 
+    @metered
     def get_interfaces_ip(self):
         """
         Returns all configured IP addresses on all interfaces as a dictionary of dictionaries.
@@ -554,26 +868,70 @@ class HpComwareDriver(NetworkDriver):
                 }
             }
         """
-        # Disable Pageing of the device
+        return self._interfaces_ip_from_output(self._scoped_config_output(
+                'display current-configuration interface',
+                'display current-configuration | begin interface'))
+
+    def _interfaces_ip_from_output(self, raw_config):
+        """ Build get_interfaces_ip() result from (part of) the running config """
+        config = self._running_config_from_output(raw_config)
+        interfaces_ip = dict()
+        for interface in config.interfaces.values():
+            addresses = dict()
+            if interface.ipv4:
+                addresses['ipv4'] = dict(
+                        (ip, {'prefix_length': prefix}) for ip, prefix in interface.ipv4)
+            if interface.ipv6:
+                addresses['ipv6'] = dict(
+                        (ip, {'prefix_length': prefix}) for ip, prefix in interface.ipv6)
+            if addresses:
+                interfaces_ip[self.normalize_port_name(interface.name)] = addresses
+        return interfaces_ip
+
+    @metered
+    def get_running_config(self):
+        """ Return RunningConfig of 'display current-configuration', parsed
+        once per fetch (once per session with the command cache) """
         self.disable_pageing()
-       
-        out_curr_config = self._send_command('display current-configuration')
-        ipv4table = re.findall(r'^interface\s+([A-Za-z0-9-/]{1,40})\n.*\s+ip\s+address\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\n',out_curr_config,re.M)
-        # TODO: get device with v6 and update above struct
-        # ipv6table = re.findall(r'',out_curr_config,re.M)
-        output_ipv4table = []
-        iface = {}
-        iface['ipv4'] = {}
-        iface['ipv6'] = {}
-        for rec in ipv4table:
-            interface,ip,mask = rec
-            norm_int = self.normalize_port_name(interface)
-            iinterfaces = { norm_int : {'ipv4': {ip: { 'prefix_len': mask}}}}
-            output_ipv4table.append(iinterfaces)
-
-        return output_ipv4table     
+        raw_config = self._send_command('display current-configuration')
+        return self._running_config_from_output(raw_config)
+
+    def _scoped_config_output(self, *scoped_commands):
+        """ Return output of the first scoped form of the running config the
+        device accepts, or the full running config when scoped_config is off,
+        it is cached already or every scoped form is rejected.
+        """
+        full_command = 'display current-configuration'
+        self.disable_pageing()
+        if (not self.scoped_config or
+                (self.command_cache is not None and full_command in self.command_cache)):
+            return self._send_command(full_command)
+        return self._send_first_accepted(list(scoped_commands) + [full_command])
+
+    def _send_first_accepted(self, commands):
+        """ Return output of the first of commands the device accepts (the
+        last one is always sent). Rejected commands are not sent again by
+        this driver.
+        """
+        for command in commands[:-1]:
+            if command in self._rejected_commands:
+                continue
+            output = self._send_command(command)
+            if not is_rejected(output):
+                return output
+            logger.info(f' --- {self.hostname} rejected "{command}", falling back ---')
+            self._rejected_commands.add(command)
+            self.invalidate_cache(command)
+        return self._send_command(commands[-1])
+
+    def _running_config_from_output(self, raw_config):
+        if self._running_config is None or self._running_config.raw_text is not raw_config:
+            self._running_config = self.metrics.timed_parse(
+                    'running_config', partial(RunningConfig, key=self.port_key), raw_config)
+        return self._running_config
 
 
+    @metered
     def get_lldp_neighbors(self):
         """
         Returns a dictionary where the keys are local ports and the value is a list of \
@@ -618,19 +976,29 @@ class HpComwareDriver(NetworkDriver):
                 ]
             }
         """
-        # Disable Pageing of the device
-        self.disable_pageing()
-        out_lldp = self._send_command('display lldp neighbor-information')
-        lldptable = re.findall(r'^LLDP.*port\s+\d+\[(.*)\]:\s+.*\s+Update\s+time\s+:\s+(.*)\s+\s+.*\s+.*\s+.*\s+Port\s+ID\s+:\s+(.*)\s+Port\s+description\s:.*\s+System\s+name\s+:\s(.*)\n',out_lldp,re.M)
-        output_lldptable = {} 
-        for rec in lldptable:
-            local_port,update_time,remote_port,neighbor = rec
-            output_lldptable[local_port] = [{'hostname': neighbor, 'port': remote_port}]
-        return output_lldptable     
-
-    def cli(self, commands):
+        lldp_table = self.get_lldp_neighbors_by_interface()
+        return self._lldp_neighbors_from_entries(
+                entry for entries in lldp_table.values() for entry in entries)
+
+    def _lldp_neighbors_from_output(self, out_lldp):
+        """ Build get_lldp_neighbors() result from 'display lldp neighbor-information' """
+        return self._lldp_neighbors_from_entries(
+                self._parse("display_lldp_neighbor_information_interface", out_lldp))
+
+    @staticmethod
+    def _lldp_neighbors_from_entries(lldp_entries):
+        output_lldptable = {}
+        for entry in lldp_entries:
+            output_lldptable.setdefault(entry['local_interface'], []).append(
+                    {'hostname': entry['remote_system_name'], 'port': entry['remote_port']})
+        return output_lldptable
+
+    @metered
+    def cli(self, commands, pipeline_window=None):
         """
         Will execute a list of commands and return the output in a dictionary format.
+        With pipeline_window (or optional arg cli_pipeline_window) > 1 up to
+        pipeline_window 'display' commands are written to the channel at once.
 
         Example::
 
@@ -644,9 +1012,15 @@ class HpComwareDriver(NetworkDriver):
         cli_output = dict()
         if type(commands) is not list:
             raise TypeError('Please enter a valid list of commands!')
-        
-        for command in commands:
-            output = self._send_command(command)
+
+        if pipeline_window is None:
+            pipeline_window = self.cli_pipeline_window
+        if pipeline_window and pipeline_window > 1:
+            outputs = self._send_commands_pipelined(commands, pipeline_window)
+        else:
+            outputs = (self._send_command(command) for command in commands)
+
+        for command, output in zip(commands, outputs):
             if 'Invalid input:' in output:
                 raise ValueError(
                     'Unable to execute command "{}"'.format(command))
@@ -655,24 +1029,218 @@ class HpComwareDriver(NetworkDriver):
         return cli_output
 
 
-    def _send_command(self, command):
-        """ Wrapper for self.device.send.command().
-        If command is a list will iterate through commands until valid command.
+    def _send_commands_pipelined(self, commands, window):
+        """ Return list with outputs of commands, sending up to window commands
+        at once. Falls back to one by one execution unless all commands are
+        non interactive 'display' commands.
         """
+        if not all(is_read_only(c) and not is_interactive(c) for c in commands):
+            return [self._send_command(command) for command in commands]
+        # pipelined output can not answer '---- More ----'
+        self.disable_pageing()
+
+        outputs = {}
+        todo = []
+        for command in commands:
+            if command in outputs or command in todo:
+                continue
+            cached = self.command_cache.get(command) if self.command_cache is not None else None
+            if cached is not None:
+                outputs[command] = cached
+                self.metrics.record(command, cached, cached=True)
+            else:
+                todo.append(command)
+
+        for start in range(0, len(todo), window):
+            batch = todo[start:start + window]
+            batch_outputs = self.metrics.timed_read(
+                    self.device, '; '.join(batch), partial(self._send_batch, batch))
+            for command, output in zip(batch, batch_outputs):
+                outputs[command] = output
+                self.metrics.record(command, output)
+                if self.command_cache is not None:
+                    self.command_cache.set(command, output)
+        return [outputs[command] for command in commands]
+
+    def _send_batch(self, batch):
+        """ Write all commands of the batch and split the combined output """
+        base_prompt = self.device.base_prompt
         try:
-            if isinstance(command, list):
-                for cmd in command:
-                    output = self.device.send_command_timing(command)
-                    # output = self.device.send_command(cmd)
-                    if "% Unrecognized" not in output:
-                        break
+            self.device.clear_buffer()
+            self.device.write_channel(
+                    ''.join(self.device.normalize_cmd(c) for c in batch))
+            raw_out = self._read_until_prompts(len(batch), base_prompt)
+        except (socket.error, EOFError) as e:
+            self.invalidate_cache()
+            self.session.reset()
+            raise ConnectionClosedException(str(e))
+        return split_pipelined_output(raw_out, batch, base_prompt)
+
+    def _read_until_prompts(self, count, base_prompt, loop_delay=0.05):
+        """ Read channel until count prompts were received or self.timeout """
+        pattern = prompt_line_pattern(base_prompt)
+        deadline = time.time() + self.timeout
+        output = ''
+        seen = scanned = 0
+        while time.time() < deadline:
+            new_data = self.device.read_channel()
+            if new_data:
+                output += new_data.replace('\r', '')
+                # count prompts of complete lines once, recheck the last line
+                complete = output.rfind('\n') + 1
+                seen += len(pattern.findall(output, scanned, complete))
+                scanned = complete
+                if seen + len(pattern.findall(output, scanned)) >= count:
+                    return output
             else:
-                # output = self.device.send_command(command)
-                output = self.device.send_command_timing(command)
+                time.sleep(loop_delay)
+        raise CommandErrorException(
+                'Timeout waiting for {} prompts of pipelined commands'.format(count))
+
+
+    def _send_command(self, command, use_cache=True):
+        """ Wrapper for self.device.send.command().
+        If command is a list will iterate through commands until valid command.
+
+        When command cache is enabled 'display' outputs are served from the
+        cache and any other command (possible config change) flushes it.
+        """
+        if isinstance(command, list):
+            for cmd in command:
+                output = self._send_command(cmd, use_cache=use_cache)
+                if "% Unrecognized" not in output:
+                    break
             return output
+
+        cache = self.command_cache if use_cache else None
+        if self.command_cache is not None and changes_config(command):
+            self.command_cache.invalidate()
+        elif cache is not None:
+            output = cache.get(command)
+            if output is not None:
+                self.metrics.record(command, output, cached=True)
+                return output
+        try:
+            output = self.metrics.timed_read(
+                    self.device, command, partial(self._read_command, command))
+        except (socket.error, EOFError) as e:
+            self.invalidate_cache()
+            self.session.reset()
+            if self._pooled is None:
+                raise ConnectionClosedException(str(e))
+            output = self._retry_on_new_session(command, e)
+        self.metrics.record(command, output)
+        if cache is not None and is_read_only(command):
+            cache.set(command, output)
+        return output
+
+
+    def _retry_on_new_session(self, command, error):
+        """ Replace broken pooled session and send command once more """
+        logger.warning(f' --- {self.hostname}: pooled session broken ({error}), reconnecting ---')
+        pooled, self._pooled = self._pooled, None
+        self.connection_pool.release(pooled, discard=True)
+        try:
+            self._borrow()
+            return self._read_command(command)
         except (socket.error, EOFError) as e:
             raise ConnectionClosedException(str(e))
 
+    def _read_command(self, command):
+        """ Send command and read its output according to self.read_mode.
+        Interactive commands are always read with timing based reads.
+        """
+        if self.read_mode == 'prompt' and not is_interactive(command):
+            return self.device.send_command(
+                    command, expect_string=self._get_prompt_pattern())
+        return self.device.send_command_timing(command)
+
+    def _iter_command_lines(self, command, loop_delay=0.05):
+        """ Send command and yield its output line by line as it arrives.
+        The command echo and the final prompt are not yielded. Output left in
+        the channel by a generator closed early is read and dropped. A
+        pooled session breaking before any output arrived is replaced and
+        the command sent once more. The read is counted and timed by
+        self.metrics like the reads of _send_command.
+        """
+        base_prompt = self.device.base_prompt
+        pattern = prompt_line_pattern(base_prompt)
+        finished = received = False
+        broken = None
+        read = self.metrics.streamed_read(command)
+        try:
+            self.device.clear_buffer()
+            self.device.write_channel(self.device.normalize_cmd(command))
+            first_line = True
+            buf = ''
+            deadline = time.time() + self.timeout
+            while not finished:
+                new_data = self.device.read_channel()
+                if not new_data:
+                    if time.time() > deadline:
+                        # nothing to drain after waiting self.timeout already
+                        finished = True
+                        raise CommandErrorException(
+                                'Timeout waiting for output of "{}"'.format(command))
+                    time.sleep(loop_delay)
+                    continue
+                received = True
+                read.received(new_data)
+                deadline = time.time() + self.timeout
+                buf += new_data.replace('\r', '')
+                lines = buf.split('\n')
+                buf = lines.pop()
+                finished = pattern.match(buf) is not None
+                for line in lines:
+                    if first_line:
+                        first_line = False
+                        if command.strip() in line:
+                            continue
+                    if pattern.match(line):
+                        continue
+                    yield line
+        except (socket.error, EOFError) as e:
+            finished = True
+            self.invalidate_cache()
+            self.session.reset()
+            if self._pooled is None or received:
+                raise ConnectionClosedException(str(e))
+            broken = e
+        finally:
+            if not finished:
+                self._drain_until_prompt(pattern, loop_delay)
+            if broken is None:
+                read.done()
+        if broken is not None:
+            output = self.metrics.timed_read(
+                    self.device, command, partial(self._retry_on_new_session, command, broken))
+            self.metrics.record(command, output)
+            for line in output.splitlines():
+                yield line
+
+    def _drain_until_prompt(self, pattern, loop_delay=0.05):
+        """ Read and drop channel data until the prompt or self.timeout """
+        deadline = time.time() + self.timeout
+        tail = ''
+        try:
+            while time.time() < deadline:
+                new_data = self.device.read_channel()
+                if not new_data:
+                    time.sleep(loop_delay)
+                    continue
+                tail = (tail + new_data.replace('\r', '')).rsplit('\n', 1)[-1]
+                if pattern.match(tail):
+                    return
+        except (socket.error, EOFError):
+            self.invalidate_cache()
+            self.session.reset()
+
+    def _get_prompt_pattern(self):
+        """ Regex matching the session prompts, built once per session """
+        if self.session.prompt_pattern is None:
+            self.session.prompt_pattern = prompt_pattern(self.device.base_prompt)
+        return self.session.prompt_pattern
+
 
     def hp_mac_format(self, mac):
         """ return hp mac format """
@@ -690,6 +1258,8 @@ class HpComwareDriver(NetworkDriver):
                 temp_mac = mac
             else:
                 raise HpMacFormatError(f'Unrecognised Mac format: {mac}')
+        if not re.match(r'[0-9a-fA-F]{12}\Z', temp_mac):
+            raise HpMacFormatError(f'Unrecognised Mac format: {mac}')
         out_mac = ''
         for idx, value in enumerate(temp_mac):
             if idx in [4,8]:
@@ -701,7 +1271,9 @@ class HpComwareDriver(NetworkDriver):
     def get_active_physical_ports(self, aggregation_port):
         """ Return textFSM table with physical ports joined as "aggregation_port" """
         raw_out = self._send_command('display link-aggregation verbose ' + str(aggregation_port))
-        port_entries = textfsm_extractor(self, "display_link_aggregation_verbose", raw_out)
+        port_entries = self.metrics.timed_parse(
+                'display_link_aggregation_verbose', textfsm_extractor, self,
+                'display_link_aggregation_verbose', raw_out)
         a_ports = list()
         for row in port_entries:
             # Return only active ports
@@ -716,10 +1288,30 @@ class HpComwareDriver(NetworkDriver):
             raise HpNoActiePortsInAggregation
 
 
-    def trace_mac_address(self, mac_address):
-        """ Search for mac_address, get switch port and return lldp/cdp
-        neighbour of that port """
-        result = { 
+    def get_mac_index(self, refresh=False):
+        """ Return MacIndex of the device MAC (and ARP) table, rebuilding it
+        when older than mac_index_max_age seconds or if refresh is True
+        """
+        if (refresh or self._mac_index is None
+                or not self._mac_index.is_fresh(self.mac_index_max_age)):
+            arp_table = self.get_arp_table() if self.mac_index_arp else ()
+            self._mac_index = MacIndex(
+                    self.get_mac_address_table(compact=True), arp_table)
+        return self._mac_index
+
+    def _find_mac(self, mac_address):
+        """ Return MAC table rows of mac_address, from the MAC index if enabled """
+        if self.use_mac_index:
+            return [dict(row) for row in self.get_mac_index().lookup(mac_address)]
+        raw_out = self._send_command('display mac-address ' + mac_address)
+        if 'No mac address found' in raw_out:
+            return []
+        return self._parse("display_mac_address", raw_out)
+
+
+    @staticmethod
+    def _new_trace_result():
+        return { 
                 'found': False,
                 'cdp_answer': False,
                 'lldp_answer': False,
@@ -728,15 +1320,20 @@ class HpComwareDriver(NetworkDriver):
                 'next_device': '',
                 'next_device_descr': '',
                 }
+
+    @metered
+    def trace_mac_address(self, mac_address):
+        """ Search for mac_address, get switch port and return lldp/cdp
+        neighbour of that port """
+        result = self._new_trace_result()
         try:
             mac_address = self.hp_mac_format(mac_address)
-            raw_out = self._send_command('display mac-address ' + mac_address)
-            if 'No mac address found' in raw_out:
+            mac_table = self._find_mac(mac_address)
+            if not mac_table:
                 raise HpNoMacFound
             else:
                 result['found'] = True
             msg = f' --- Found {mac_address} mac address --- \n'
-            mac_table = textfsm_extractor(self, "display_mac_address", raw_out)
             print(msg); logger.info(msg)
             print(dumps(mac_table, sort_keys=True, indent=4, separators=(',', ': ')))
             for row in mac_table:
@@ -765,11 +1362,9 @@ class HpComwareDriver(NetworkDriver):
                                 msg = f' --- CDP Neighbour System Name: {result["next_device"]}'
                             print(msg); logger.info(msg)
                             return result
-                        elif ('XGE' in pname) or ('GE' in pname):
+                        elif ('XGE' in pname) or ('GE' in pname) or ('GigabitEthernet' in pname):
                             pname = self.normalize_port_name(pname)
                             result['local_port'] = pname
-                            from IPython import embed; embed()
-                            from IPython.core import debugger; debug = debugger.Pdb().set_trace; debug()
                             lldp_neighbours = self.get_lldp_neighbors_detail(interface=pname)
                             cdp_neighbours = self.get_cdp_neighbors_detail(interface=pname)
                             if lldp_neighbours:
@@ -800,6 +1395,102 @@ class HpComwareDriver(NetworkDriver):
             raise e
 
 
+    def port_key(self, port_name):
+        """ Normalized port name without spaces, comparable between outputs
+        (ex: GE1/0/1, GigabitEthernet 1/0/1 --> GigabitEthernet1/0/1) """
+        return self.normalize_port_name(port_name).replace(' ', '')
+
+    @metered
+    def get_link_aggregation_members(self):
+        """ Return {aggregation port_key: [active physical ports]} of all
+        aggregations from one 'display link-aggregation verbose' """
+        raw_out = self._send_command('display link-aggregation verbose')
+        return self._link_aggregation_members_from_output(raw_out)
+
+    def _link_aggregation_members_from_output(self, raw_out):
+        """ Build get_link_aggregation_members() result from
+        'display link-aggregation verbose' """
+        members = dict()
+        aggregations = self.metrics.timed_parse(
+                'parse_link_aggregation_verbose', parse_link_aggregation_verbose, raw_out)
+        for agg_port, port_entries in aggregations.items():
+            members[self.port_key(agg_port)] = [
+                    self.normalize_port_name(row['port_name'])
+                    for row in port_entries if row['status'].lower() == 's']
+        return members
+
+    @metered
+    def get_lldp_neighbors_by_interface(self, refresh=False):
+        """ Return {local port_key: [lldp entries]}, the LLDP snapshot of the
+        session taken from one full lldp dump (again if refresh is True).
+        get_lldp_neighbors, get_lldp_neighbors_detail and trace_mac_address
+        answer from it. Comware v7 is asked for the verbose form, its plain
+        form has no system description and capabilities.
+        """
+        if refresh or self._lldp_snapshot is None:
+            self.disable_pageing()
+            command = 'display lldp neighbor-information'
+            if self.get_os_version().startswith('7.'):
+                command += ' verbose'
+            raw_out = self._send_command(command)
+            lldp_table = dict()
+            for entry in self._parse("display_lldp_neighbor_information_interface", raw_out):
+                lldp_table.setdefault(self.port_key(entry['local_interface']), []).append(entry)
+            self._lldp_snapshot = lldp_table
+        return self._lldp_snapshot
+
+    @metered
+    def trace_mac_addresses(self, mac_addresses):
+        """ Bulk trace_mac_address().
+        Fetch MAC table, link-aggregation members and LLDP neighbours once and
+        resolve every mac address locally.
+        Return {mac_address: trace_mac_address() like result}
+        """
+        self.disable_pageing()
+        mac_index = self.get_mac_index(refresh=not self.use_mac_index)
+        aggregations = self.get_link_aggregation_members()
+        lldp_table = self.get_lldp_neighbors_by_interface()
+        results = dict()
+        for mac_address in mac_addresses:
+            results[mac_address] = self._trace_from_tables(
+                    mac_address, mac_index, aggregations, lldp_table)
+        return results
+
+    def _trace_from_tables(self, mac_address, mac_index, aggregations, lldp_table):
+        """ trace_mac_address() of one mac answered from prefetched tables """
+        result = self._new_trace_result()
+        try:
+            rows = mac_index.lookup(mac_address)
+        except ValueError:
+            logger.error(f'Unrecognised Mac format: {mac_address}')
+            return result
+        if not rows:
+            logger.info(f' --- No mac address {mac_address} found ---')
+            return result
+        result['found'] = True
+        pname = rows[0]['interface']
+        result['local_port'] = pname
+        if 'Bridge-Aggregation' in pname:
+            active_ports = aggregations.get(self.port_key(pname))
+            if not active_ports:
+                logger.error(f' --- No active ports in {pname} ({mac_address}) ---')
+                return result
+            physical_port = active_ports[0]
+        elif 'GigabitEthernet' in pname:
+            physical_port = pname
+        else:
+            logger.error(f' --- Unsupported port {pname} ({mac_address}) ---')
+            return result
+        lldp_neighbours = lldp_table.get(self.port_key(physical_port))
+        if lldp_neighbours:
+            result['lldp_answer'] = True
+            result['remote_port'] = lldp_neighbours[0]["remote_port"]
+            result['next_device'] = lldp_neighbours[0]["remote_system_name"]
+            result['next_device_descr'] = lldp_neighbours[0]['remote_system_description']
+        return result
+
+
+    @metered
     def get_version(self):
         """ Return Comware version, vendor, model and uptime. 
         Use it as part of get_facts
@@ -812,8 +1503,13 @@ class HpComwareDriver(NetworkDriver):
          }
         """
         raw_out = self._send_command('display version')
+        return self._version_from_output(raw_out)
+
+    def _version_from_output(self, raw_out):
+        """ Build get_version() result from 'display version' """
         # get only first row of text FSM table
-        version_entries = textfsm_extractor(self, "display_version", raw_out)[0]
+        version_entries = self.metrics.timed_parse(
+                'display_version', textfsm_extractor, self, 'display_version', raw_out)[0]
         # convert uptime from '24 weeks, 4 days, 7 hours, 41 minutes to seconds
         uptime_str = version_entries['uptime']
         uptime = 0
@@ -830,11 +1526,14 @@ class HpComwareDriver(NetworkDriver):
             elif 'minute' in timer[1]:
                 uptime += int(timer[0]) * self._MINUTE_SECONDS
         version_entries['uptime'] = uptime
+        self.session.os_version = version_entries['os_version']
         return version_entries
 
 
+    @metered
     def get_lldp_neighbors_detail(self, interface=""):
-        """ lldp cli commands depends on comware version
+        """ LLDP neighbours of interface (all if empty) from the LLDP snapshot
+        of the session (see get_lldp_neighbors_by_interface)
         return diction format 
         { [
             'local_interface'    :'',
@@ -849,19 +1548,11 @@ class HpComwareDriver(NetworkDriver):
             ]
         }
         """
-        version_dict = self.get_version()
-
+        lldp_table = self.get_lldp_neighbors_by_interface()
         if interface:
-            if version_dict['os_version'].startswith('5.'):
-                command = 'display lldp neighbor-information interface ' + str(interface)
-            elif version_dict['os_version'].startswith('7.'):
-                command = 'display lldp neighbor-information interface ' + str(interface)+' verbose'
+            lldp_entries = list(lldp_table.get(self.port_key(str(interface)), ()))
         else:
-            # display all lldp neigh interfaces command
-            command = "display lldp neighbor-information "
-        raw_out = self._send_command(command)
-        lldp_entries = textfsm_extractor(
-                self, "display_lldp_neighbor_information_interface", raw_out )
+            lldp_entries = [entry for entries in lldp_table.values() for entry in entries]
         if len(lldp_entries) == 0:
             return {}
         return lldp_entries
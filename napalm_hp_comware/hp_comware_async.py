@@ -0,0 +1,415 @@
+"""
+asyncio variant of the HpComware driver
+
+Uses asyncssh (optional dependency) instead of netmiko, so one process can
+keep thousands of device sessions open. Outputs are parsed by a never
+connected HpComwareDriver, so parsing, caches and metrics are the ones of
+the synchronous driver.
+
+    async def facts(hostname):
+        async with AsyncHpComwareDriver(hostname, username, password) as device:
+            return await device.get_facts()
+
+    results = await asyncio.gather(*(facts(h) for h in hostnames))
+
+Coroutines: open, close, cli, disable_pageing, get_current_privilege,
+get_os_version, privilege_escalation, get_version, get_facts,
+get_facts_fast, get_interfaces, get_mac_address_table, get_arp_table,
+get_lldp_neighbors. Other getters of HpComwareDriver do not exist here.
+"""
+import re
+import asyncio
+import logging
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+from napalm.base.exceptions import ConnectionClosedException, ConnectionException
+
+from napalm_hp_comware.hp_comware import HpComwareDriver, HpComwarePrivilegeError
+from napalm_hp_comware.utils.command_cache import changes_config, is_read_only
+from napalm_hp_comware.utils.metrics import metered_async
+from napalm_hp_comware.utils.prompt import (
+    is_interactive,
+    is_rejected,
+    prompt_line_pattern,
+    prompt_pattern,
+    split_pipelined_output,
+)
+
+logger = logging.getLogger(__name__)
+
+# any Comware prompt, used before the base prompt is known
+_ANY_PROMPT_RE = re.compile(r'[<\[]([^<>\[\]\n]+)[>\]]\s*$')
+
+# optional args of HpComwareDriver about netmiko sessions, the asyncssh
+# session can not honour them
+UNSUPPORTED_OPTIONAL_ARGS = (
+    'proxy_host',
+    'proxy_username',
+    'proxy_password',
+    'proxy_port',
+    'proxy_mode',
+    'connection_pool',
+    'record',
+    'replay',
+    'replay_speed',
+    'read_mode',
+)
+
+
+class AsyncComwareChannel(object):
+    """ Interactive Comware CLI session over asyncssh """
+
+    # prompts are searched only at the end of the received data
+    _PROMPT_WINDOW = 512
+
+    def __init__(self, connection, process, timeout=60):
+        self.connection = connection
+        self.process = process
+        self.timeout = timeout
+        self.base_prompt = None
+        self._prompt_re = _ANY_PROMPT_RE
+
+    @classmethod
+    async def connect(cls, host, username, password, port=22, timeout=60, **kwargs):
+        """ Open SSH session, start the CLI and learn the base prompt """
+        if asyncssh is None:
+            raise ImportError('AsyncHpComwareDriver needs asyncssh (pip install asyncssh)')
+        kwargs.setdefault('known_hosts', None)
+        connection = await asyncio.wait_for(
+                asyncssh.connect(host, port=port, username=username, password=password, **kwargs),
+                timeout)
+        process = await connection.create_process(term_type='vt100', term_size=(511, 24))
+        channel = cls(connection, process, timeout)
+        first_prompt = await channel.read_until(_ANY_PROMPT_RE)
+        channel.base_prompt = _ANY_PROMPT_RE.search(first_prompt).group(1)
+        channel._prompt_re = re.compile(prompt_pattern(channel.base_prompt))
+        return channel
+
+    async def _read(self, deadline, on_data):
+        """ Next chunk of the channel before deadline, '\\r' removed """
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError('Timeout waiting for the device prompt')
+        data = await asyncio.wait_for(self.process.stdout.read(65536), remaining)
+        if not data:
+            raise EOFError('Channel closed by the device')
+        if on_data is not None:
+            on_data(data)
+        return data.replace('\r', '')
+
+    async def read_until(self, regex, on_data=None):
+        """ Read until regex matches the end of the received data.
+        on_data is called with every received chunk.
+        """
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        chunks = []
+        tail = ''
+        while not regex.search(tail):
+            data = await self._read(deadline, on_data)
+            chunks.append(data)
+            tail = (tail + data)[-self._PROMPT_WINDOW:]
+        return ''.join(chunks)
+
+    async def send_command(self, command, expect_string=None, on_data=None):
+        """ Send command and return its output without echo and prompt.
+        With expect_string read until it matches and return everything.
+        """
+        self.process.stdin.write(command + '\n')
+        if expect_string is not None:
+            return await self.read_until(re.compile(expect_string), on_data)
+        lines = (await self.read_until(self._prompt_re, on_data)).split('\n')
+        if lines and command.strip() in lines[0]:
+            lines = lines[1:]
+        return '\n'.join(lines[:-1]).strip('\n')
+
+    async def send_commands(self, commands, on_data=None):
+        """ Write commands at once and return their outputs, paging has to
+        be disabled (see split_pipelined_output) """
+        self.process.stdin.write(''.join(command + '\n' for command in commands))
+        pattern = prompt_line_pattern(self.base_prompt)
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        chunks = []
+        seen = 0
+        # prompts are counted on complete lines, the last one is rechecked
+        last_line = ''
+        while True:
+            data = await self._read(deadline, on_data)
+            chunks.append(data)
+            lines = (last_line + data).split('\n')
+            last_line = lines.pop()
+            seen += sum(1 for line in lines if pattern.match(line))
+            if seen + (pattern.match(last_line) is not None) >= len(commands):
+                break
+        return split_pipelined_output(''.join(chunks), commands, self.base_prompt)
+
+    async def close(self):
+        self.process.close()
+        self.connection.close()
+        await self.connection.wait_closed()
+
+
+class AsyncHpComwareDriver(object):
+    """ asyncio counterpart of HpComwareDriver (see module docstring).
+    Accepts the same arguments; 'port' and 'secret' optional args are used
+    for the asyncssh session, UNSUPPORTED_OPTIONAL_ARGS raise ValueError.
+    """
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        unsupported = sorted(set(optional_args or ()).intersection(UNSUPPORTED_OPTIONAL_ARGS))
+        if unsupported:
+            raise ValueError("Optional args not supported by AsyncHpComwareDriver: {}".format(
+                    ', '.join(unsupported)))
+        # parses the outputs, holds session state, command cache and metrics
+        self._driver = HpComwareDriver(
+                hostname, username, password, timeout=timeout, optional_args=optional_args)
+        self.device = None
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.session = self._driver.session
+        self.metrics = self._driver.metrics
+        self.command_cache = self._driver.command_cache
+        self.netmiko_optional_args = self._driver.netmiko_optional_args
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def current_user_level(self):
+        return self.session.user_level
+
+    def invalidate_cache(self, command=None):
+        self._driver.invalidate_cache(command)
+
+    async def open(self):
+        """Open a connection to the device."""
+        self.invalidate_cache()
+        self.session.reset()
+        try:
+            self.device = await AsyncComwareChannel.connect(
+                    self.hostname, self.username, self.password,
+                    port=self.netmiko_optional_args.get('port') or 22,
+                    timeout=self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ConnectionException(str(e))
+        except Exception as e:
+            if asyncssh is not None and isinstance(e, asyncssh.Error):
+                raise ConnectionException(str(e))
+            raise
+
+    async def close(self):
+        """Close the connection to the device."""
+        self.invalidate_cache()
+        self.session.reset()
+        if self.device is not None:
+            device, self.device = self.device, None
+            await device.close()
+
+    def _channel(self):
+        """ Return the open channel, raise ConnectionClosedException if closed """
+        if self.device is None:
+            raise ConnectionClosedException('{} is not connected'.format(self.hostname))
+        return self.device
+
+    async def _send_command(self, command, use_cache=True):
+        """ Async HpComwareDriver._send_command() """
+        cache = self.command_cache if use_cache else None
+        if self.command_cache is not None and changes_config(command):
+            self.command_cache.invalidate()
+        elif cache is not None:
+            output = cache.get(command)
+            if output is not None:
+                self.metrics.record(command, output, cached=True)
+                return output
+        read = self.metrics.streamed_read(command)
+        try:
+            output = await self._channel().send_command(command, on_data=read.received)
+        except (OSError, EOFError, asyncio.TimeoutError) as e:
+            self.invalidate_cache()
+            self.session.reset()
+            raise ConnectionClosedException(str(e))
+        read.done()
+        if cache is not None and is_read_only(command):
+            cache.set(command, output)
+        return output
+
+    async def _send_commands_pipelined(self, commands):
+        """ Async HpComwareDriver._send_commands_pipelined(), all commands
+        not cached in one batch """
+        if not all(is_read_only(c) and not is_interactive(c) for c in commands):
+            return [await self._send_command(command) for command in commands]
+        await self.disable_pageing()
+        outputs = {}
+        todo = []
+        for command in commands:
+            if command in outputs or command in todo:
+                continue
+            cached = self.command_cache.get(command) if self.command_cache is not None else None
+            if cached is not None:
+                outputs[command] = cached
+                self.metrics.record(command, cached, cached=True)
+            else:
+                todo.append(command)
+        if todo:
+            read = self.metrics.streamed_read('; '.join(todo))
+            try:
+                batch_outputs = await self._channel().send_commands(
+                        todo, on_data=read.received)
+            except (OSError, EOFError, asyncio.TimeoutError) as e:
+                self.invalidate_cache()
+                self.session.reset()
+                raise ConnectionClosedException(str(e))
+            read.report()
+            for command, output in zip(todo, batch_outputs):
+                outputs[command] = output
+                self.metrics.record(command, output)
+                if self.command_cache is not None:
+                    self.command_cache.set(command, output)
+        return [outputs[command] for command in commands]
+
+    async def _send_first_accepted(self, commands):
+        """ Async HpComwareDriver._send_first_accepted() """
+        rejected_commands = self._driver._rejected_commands
+        for command in commands[:-1]:
+            if command in rejected_commands:
+                continue
+            output = await self._send_command(command)
+            if not is_rejected(output):
+                return output
+            logger.info(f' --- {self.hostname} rejected "{command}", falling back ---')
+            rejected_commands.add(command)
+            self.invalidate_cache(command)
+        return await self._send_command(commands[-1])
+
+    async def _scoped_config_output(self, *scoped_commands):
+        """ Async HpComwareDriver._scoped_config_output() """
+        full_command = 'display current-configuration'
+        await self.disable_pageing()
+        if (not self._driver.scoped_config or
+                (self.command_cache is not None and full_command in self.command_cache)):
+            return await self._send_command(full_command)
+        return await self._send_first_accepted(list(scoped_commands) + [full_command])
+
+    @metered_async
+    async def cli(self, commands):
+        """ Async HpComwareDriver.cli() """
+        cli_output = dict()
+        if type(commands) is not list:
+            raise TypeError('Please enter a valid list of commands!')
+        for command in commands:
+            output = await self._send_command(command)
+            if 'Invalid input:' in output:
+                raise ValueError(
+                    'Unable to execute command "{}"'.format(command))
+            cli_output[command] = output
+        return cli_output
+
+    async def disable_pageing(self):
+        """ Disable pageing on the device (once per session) """
+        if self.session.paging_disabled:
+            return
+        out_disable_pageing = await self._send_command('screen-length disable')
+        if 'configuration is disabled for current user' in out_disable_pageing:
+            self.session.paging_disabled = True
+        else:
+            raise ValueError("Disable Pageing cli command error: {}".format(out_disable_pageing))
+
+    async def get_current_privilege(self, refresh=False):
+        if self.current_user_level is not None and not refresh:
+            return self.current_user_level
+        raw_out = await self._send_command('display users', use_cache=False)
+        return self._driver._privilege_from_output(raw_out)
+
+    async def get_os_version(self):
+        if self.session.os_version is None:
+            await self.get_version()
+        return self.session.os_version
+
+    async def privilege_escalation(self, os_version=''):
+        """ Async HpComwareDriver.privilege_escalation() (Comware v5 'super') """
+        if os_version:
+            self.session.os_version = os_version
+        if self.current_user_level is None:
+            await self.get_current_privilege()
+        if self.current_user_level == '3':
+            return 0
+        elif self.current_user_level in ['1', '2']:
+            os_version = await self.get_os_version()
+            if os_version.startswith('5.'):
+                await self.device.send_command('super', expect_string='assword:')
+                await self.device.send_command(self.netmiko_optional_args.get('secret', ''))
+                self.invalidate_cache()
+                if await self.get_current_privilege(refresh=True) == '3':
+                    logger.info(f' --- Changed to user level: {self.current_user_level} ---')
+                    return 0
+                raise HpComwarePrivilegeError
+
+    @metered_async
+    async def get_version(self):
+        return self._driver._version_from_output(await self._send_command('display version'))
+
+    @metered_async
+    async def get_facts(self):
+        """ Async HpComwareDriver.get_facts(), get_facts_fast() with the
+        fast_facts optional arg """
+        if self._driver.fast_facts:
+            return await self.get_facts_fast()
+        await self.disable_pageing()
+        facts = await self.get_version()
+        facts['vendor'] = u'Hewlett-Packard'
+        facts['interface_list'] = list((await self.get_interfaces()).keys())
+        await self.privilege_escalation(os_version=facts['os_version'])
+        out_display_device = await self._send_command("display device manuinfo")
+        out_display_current_config = await self._scoped_config_output(
+                'display current-configuration | include sysname')
+        hostname = self._driver._running_config_from_output(out_display_current_config).sysname
+        return self._driver._facts_from_outputs(facts, out_display_device, hostname)
+
+    @metered_async
+    async def get_facts_fast(self):
+        """ Async HpComwareDriver.get_facts_fast() """
+        commands = ['display version', 'display interface brief', 'display device manuinfo']
+        out_version, out_brief, out_display_device = await self._send_commands_pipelined(
+                commands)
+        facts = self._driver._version_from_output(out_version)
+        facts['vendor'] = u'Hewlett-Packard'
+        facts['interface_list'] = list(self._driver._interfaces_from_output(out_brief).keys())
+        if is_rejected(out_display_device):
+            self.invalidate_cache('display device manuinfo')
+            await self.privilege_escalation(os_version=facts['os_version'])
+            out_display_device = await self._send_command('display device manuinfo')
+        return self._driver._facts_from_outputs(
+                facts, out_display_device, self.device.base_prompt)
+
+    @metered_async
+    async def get_interfaces(self, parser=None):
+        raw_out = await self._send_command('display interface brief')
+        return self._driver._interfaces_from_output(raw_out, parser)
+
+    @metered_async
+    async def get_mac_address_table(self, parser=None, compact=False):
+        await self.disable_pageing()
+        raw_out = await self._send_command('display mac-address')
+        return self._driver.get_mac_address_table(
+                raw_mac_table=raw_out, parser=parser, compact=compact)
+
+    @metered_async
+    async def get_arp_table(self, parser=None):
+        await self.disable_pageing()
+        raw_out = await self._send_command('display arp')
+        return self._driver._arp_table_from_output(raw_out, parser)
+
+    @metered_async
+    async def get_lldp_neighbors(self):
+        await self.disable_pageing()
+        raw_out = await self._send_command('display lldp neighbor-information')
+        return self._driver._lldp_neighbors_from_output(raw_out)
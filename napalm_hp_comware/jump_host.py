@@ -0,0 +1,142 @@
+"""
+Shared SSH jump host (bastion) transport
+
+One authenticated paramiko transport per bastion and user is opened lazily
+and shared by all drivers and threads; every device session is a
+'direct-tcpip' channel over it instead of an external 'ssh ... nc %h %p'
+process with its own bastion login.
+
+    jump = JumpHost.shared('bastion', port=22, username='u', password='p')
+    connection = jump_connect_handler(jump, device_type='hp_comware',
+                                      host='sw-01', username='u', password='p')
+"""
+import hashlib
+import logging
+import threading
+
+from netmiko.ssh_dispatcher import ssh_dispatcher
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+
+class JumpHost(object):
+    """ Lazily connected, self healing transport to one bastion """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, host, port=22, username=None, password=None, key_filename=None,
+                 allow_agent=True, look_for_keys=True, timeout=30, keepalive=30):
+        self.host = host
+        self.port = int(port or 22)
+        self.username = username
+        self.password = password
+        self.key_filename = key_filename
+        self.allow_agent = allow_agent
+        self.look_for_keys = look_for_keys
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self._client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, host, port=22, username=None, password=None, **kwargs):
+        """ Return JumpHost shared by everybody using the same bastion and credentials """
+        digest = hashlib.sha256((password or '').encode()).hexdigest()
+        key = (host, int(port or 22), username, digest)
+        with cls._shared_lock:
+            jump_host = cls._shared.get(key)
+            if jump_host is None:
+                jump_host = cls._shared[key] = cls(host, port, username, password, **kwargs)
+            return jump_host
+
+    @classmethod
+    def close_all(cls):
+        """ Close all shared transports """
+        with cls._shared_lock:
+            jump_hosts, cls._shared = list(cls._shared.values()), {}
+        for jump_host in jump_hosts:
+            jump_host.close()
+
+    @property
+    def is_active(self):
+        transport = self._client.get_transport() if self._client else None
+        return transport is not None and transport.is_active()
+
+    def _transport(self):
+        """ Return active transport, (re)connecting the bastion when needed """
+        with self._lock:
+            if not self.is_active:
+                if self._client is not None:
+                    logger.info(f' --- Jump host {self.host} transport lost, reconnecting ---')
+                    self._client.close()
+                client = paramiko.SSHClient()
+                # same as 'StrictHostKeyChecking no' of the ssh config proxy
+                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                client.connect(
+                        self.host, port=self.port, username=self.username,
+                        password=self.password, key_filename=self.key_filename,
+                        allow_agent=self.allow_agent, look_for_keys=self.look_for_keys,
+                        timeout=self.timeout, auth_timeout=self.timeout)
+                if self.keepalive:
+                    client.get_transport().set_keepalive(self.keepalive)
+                self._client = client
+            return self._client.get_transport()
+
+    def open_channel(self, host, port=22, timeout=None):
+        """ Return 'direct-tcpip' channel to host:port through the bastion """
+        timeout = timeout or self.timeout
+        try:
+            return self._transport().open_channel(
+                    'direct-tcpip', (host, int(port)), ('127.0.0.1', 0), timeout=timeout)
+        except (paramiko.SSHException, EOFError):
+            if self.is_active:
+                raise
+            # transport died between the check and the request
+            return self._transport().open_channel(
+                    'direct-tcpip', (host, int(port)), ('127.0.0.1', 0), timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_connection_classes = {}
+
+
+def _jump_connection_class(device_type):
+    """ Netmiko connection class of device_type taking the socket as 'sock'
+    (netmiko 2.x takes it only from a ssh config ProxyCommand)
+    """
+    connection_class = _connection_classes.get(device_type)
+    if connection_class is None:
+        base = ssh_dispatcher(device_type)
+
+        def __init__(self, *args, **kwargs):
+            self._jump_sock = kwargs.pop('sock')
+            base.__init__(self, *args, **kwargs)
+
+        def _connect_params_dict(self):
+            params = base._connect_params_dict(self)
+            params['sock'] = self._jump_sock
+            return params
+
+        connection_class = _connection_classes[device_type] = type(
+                'Jump' + base.__name__, (base,),
+                {'__init__': __init__, '_connect_params_dict': _connect_params_dict})
+    return connection_class
+
+
+def jump_connect_handler(jump_host, **kwargs):
+    """ ConnectHandler() with the device SSH session over jump_host """
+    connection_class = _jump_connection_class(kwargs['device_type'])
+    channel = jump_host.open_channel(kwargs['host'], kwargs.get('port') or 22)
+    try:
+        return connection_class(sock=channel, **kwargs)
+    except Exception:
+        channel.close()
+        raise
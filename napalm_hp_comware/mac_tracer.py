@@ -0,0 +1,189 @@
+"""
+Multi-hop MAC address tracing across Comware devices
+
+Starts at one HpComwareDriver and follows the LLDP neighbour of the port a
+MAC address is learned on, device by device, until the edge port. Sessions
+and per device tables (MAC index, aggregation members, LLDP neighbours) are
+kept for the whole walk and reused by later traces.
+
+    def factory(hostname):
+        return HpComwareDriver(hostname, username, password, optional_args=args)
+
+    with MacTracer(factory) as tracer:
+        for path in tracer.trace(first_driver, '2c41-3888-0001'):
+            print(' -> '.join(hop['device'] + ':' + hop['local_port'] for hop in path))
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class _DeviceTables(object):
+    """ MAC index, aggregation members and LLDP neighbours of one device """
+    __slots__ = ('mac_index', 'aggregations', 'lldp')
+
+    def __init__(self, driver):
+        driver.disable_pageing()
+        self.mac_index = driver.get_mac_index(refresh=not driver.use_mac_index)
+        self.aggregations = driver.get_link_aggregation_members()
+        self.lldp = driver.get_lldp_neighbors_by_interface()
+
+
+class MacTracer(object):
+    """ Follow MAC addresses hop by hop through LLDP neighbours.
+
+        - driver_factory - callable(hostname) returning a (closed) driver for
+                           the next device
+        - max_hops - stop every path after max_hops devices
+        - max_workers - number of devices investigated in parallel when a
+                        MAC is behind aggregation members with different
+                        neighbours
+        - resolve_hostname - callable mapping LLDP system name to the
+                             hostname to connect to (default: same name)
+    """
+
+    def __init__(self, driver_factory=None, max_hops=16, max_workers=4, resolve_hostname=None):
+        self.driver_factory = driver_factory
+        self.max_hops = max_hops
+        self.max_workers = max_workers
+        self.resolve_hostname = resolve_hostname or (lambda name: name)
+        self._drivers = {}
+        self._opened = set()
+        self._tables = {}
+        self._device_locks = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_driver(self, driver):
+        """ Reuse already open driver for driver.hostname """
+        with self._lock:
+            self._drivers[driver.hostname] = driver
+
+    def clear(self):
+        """ Forget cached device tables """
+        with self._lock:
+            self._tables.clear()
+
+    def close(self):
+        """ Close sessions opened by the tracer """
+        with self._lock:
+            opened, self._opened = self._opened, set()
+        for hostname in opened:
+            try:
+                self._drivers.pop(hostname).close()
+            except Exception as e:
+                logger.error(f' --- Closing {hostname} failed: {e} ---')
+
+    def _device_lock(self, hostname):
+        with self._lock:
+            return self._device_locks.setdefault(hostname, threading.Lock())
+
+    def _get_driver(self, hostname):
+        driver = self._drivers.get(hostname)
+        if driver is None:
+            if self.driver_factory is None:
+                raise ValueError(f'No driver for {hostname} and no driver_factory')
+            driver = self.driver_factory(hostname)
+            driver.open()
+            with self._lock:
+                self._drivers[hostname] = driver
+                self._opened.add(hostname)
+        return driver
+
+    def _get_tables(self, hostname, driver):
+        tables = self._tables.get(hostname)
+        if tables is None:
+            tables = self._tables[hostname] = _DeviceTables(driver)
+        return tables
+
+    @staticmethod
+    def _new_hop(hostname):
+        return {
+            'device': hostname,
+            'found': False,
+            'local_port': '',
+            'physical_port': '',
+            'remote_port': '',
+            'next_device': '',
+            'next_device_descr': '',
+            'error': '',
+        }
+
+    def hops(self, hostname, mac_address):
+        """ Return list of candidate hops of mac_address on hostname, one per
+        distinct LLDP neighbour of the port (aggregation members) it is on
+        """
+        with self._device_lock(hostname):
+            try:
+                driver = self._get_driver(hostname)
+                tables = self._get_tables(hostname, driver)
+                rows = tables.mac_index.lookup(mac_address)
+            except Exception as e:
+                hop = self._new_hop(hostname)
+                hop['error'] = str(e)
+                logger.error(f' --- Tracing {mac_address} on {hostname} failed: {e} ---')
+                return [hop]
+        hop = self._new_hop(hostname)
+        if not rows:
+            return [hop]
+        hop['found'] = True
+        hop['local_port'] = rows[0]['interface']
+        if 'Bridge-Aggregation' in hop['local_port']:
+            physical_ports = tables.aggregations.get(driver.port_key(hop['local_port']), [])
+        else:
+            physical_ports = [hop['local_port']]
+
+        hops = []
+        next_devices = set()
+        for physical_port in physical_ports:
+            neighbours = tables.lldp.get(driver.port_key(physical_port))
+            next_device = neighbours[0]['remote_system_name'] if neighbours else ''
+            if next_device in next_devices:
+                continue
+            next_devices.add(next_device)
+            candidate = dict(hop, physical_port=physical_port)
+            if neighbours:
+                candidate['remote_port'] = neighbours[0]['remote_port']
+                candidate['next_device'] = next_device
+                candidate['next_device_descr'] = neighbours[0]['remote_system_description']
+            hops.append(candidate)
+        return hops or [hop]
+
+    def trace(self, start, mac_address):
+        """ Trace mac_address starting at start (driver or hostname).
+        Return list of paths, every path is a list of hops ending at the edge
+        port, at a device seen before or after max_hops.
+        """
+        if isinstance(start, str):
+            hostname = start
+        else:
+            self.add_driver(start)
+            hostname = start.hostname
+
+        paths = []
+        frontier = [([], hostname)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while frontier:
+                futures = [(path, pool.submit(self.hops, host, mac_address))
+                           for path, host in frontier]
+                frontier = []
+                for path, future in futures:
+                    for hop in future.result():
+                        new_path = path + [hop]
+                        next_host = None
+                        if hop['next_device']:
+                            next_host = self.resolve_hostname(hop['next_device'])
+                        visited = set(h['device'] for h in new_path)
+                        if (not next_host or next_host in visited
+                                or len(new_path) >= self.max_hops):
+                            paths.append(new_path)
+                        else:
+                            frontier.append((new_path, next_host))
+        return paths
@@ -0,0 +1,342 @@
+"""
+Simulated Comware SSH server
+
+Local asyncssh (optional dependency) server answering like a Comware v5
+switch, to test and benchmark open(), getters and cli() of the drivers
+without a device or network:
+
+    with ComwareSimulator(synthetic_outputs(rows=1000), latency=0.02,
+                          bandwidth=1000000, chunk_size=1024) as switch:
+        device = HpComwareDriver('127.0.0.1', 'admin', 'admin', optional_args={
+            'port': switch.port, 'secret': 'super'})
+        device.open()
+        device.get_facts()
+    switch.commands     # every command received, in order
+
+Every SSH session starts in user view with user level 1. Outputs longer
+than page_lines are paged with '---- More ----' until 'screen-length
+disable'. 'super' asks for the super password and raises the level to 3.
+Commands starting with one of privileged_commands are rejected below
+level 3. 'display users' shows the level of the session, 'system-view',
+'quit' and 'return' switch views. Any other command is answered from
+outputs (text, or callable(session) returning text), with '| include',
+'| exclude' and '| begin' filters applied, or rejected.
+
+Each answer waits latency seconds (command_latency per command) before the
+first byte, then the output is written in chunks of chunk_size characters
+at most bandwidth characters per second (both optional).
+"""
+import asyncio
+import re
+import threading
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+from napalm_hp_comware.utils import synthetic
+
+PRIVILEGED_COMMANDS = ('display current-configuration', 'display device manuinfo')
+REJECTED = " ^\r\n % Unrecognized command found at '^' position."
+MORE = '  ---- More ----'
+# erases MORE before the next page, like Comware
+MORE_ERASE = '\x1b[16D' + ' ' * 16 + '\x1b[16D'
+
+DISPLAY_USERS = (
+    'The user application information of the user interface(s):\n'
+    '  Idx UI      Delay    Type Userlevel\n'
+    '+ 29  VTY 0   00:00:00 SSH  {level}\n'
+    '\n'
+    'Following are more details.\n'
+    'VTY 0   :\n'
+    '        User name: {username}\n'
+    '        Location: 127.0.0.1\n'
+    ' +    : Current operation user.\n'
+    ' F    : Current operation user work in async mode.')
+
+
+def _filter_output(output, pipe):
+    """ Apply a Comware output filter ('include REGEX', ...) to output """
+    keyword, _, pattern = pipe.strip().partition(' ')
+    try:
+        regex = re.compile(pattern.strip())
+    except re.error:
+        return REJECTED
+    lines = output.split('\n')
+    if keyword == 'include':
+        lines = [line for line in lines if regex.search(line)]
+    elif keyword == 'exclude':
+        lines = [line for line in lines if not regex.search(line)]
+    elif keyword == 'begin':
+        first = next((idx for idx, line in enumerate(lines) if regex.search(line)), len(lines))
+        lines = lines[first:]
+    else:
+        return REJECTED
+    return '\n'.join(lines)
+
+
+def synthetic_outputs(rows=100, sysname='sw-01'):
+    """ Outputs of every synthetic generator with about rows records """
+    outputs = dict((command, generator(rows))
+                   for command, generator in synthetic.GENERATORS.items())
+    outputs['display current-configuration'] = synthetic.current_configuration(
+            rows, sysname=sysname)
+    return outputs
+
+
+class SimulatedSession(object):
+    """ State of one SSH session of the simulator """
+
+    def __init__(self, simulator, username):
+        self.simulator = simulator
+        self.username = username
+        self.user_level = simulator.user_level
+        self.paging = True
+        self.system_view = False
+
+    @property
+    def prompt(self):
+        if self.system_view:
+            return '[{}]'.format(self.simulator.sysname)
+        return '<{}>'.format(self.simulator.sysname)
+
+
+class _SSHServer(asyncssh.SSHServer if asyncssh else object):
+    """ Password authentication against the simulator credentials """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.connection = None
+
+    def connection_made(self, connection):
+        self.connection = connection
+        self.simulator._connections.add(connection)
+
+    def connection_lost(self, exc):
+        self.simulator._connections.discard(self.connection)
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return (username, password) == (self.simulator.username, self.simulator.password)
+
+
+class ComwareSimulator(object):
+    """ Comware CLI over SSH on host:port (port 0 picks a free port),
+    served from a background thread (see module docstring).
+    """
+
+    def __init__(self, outputs=None, sysname='sw-01', username='admin', password='admin',
+                 super_password='super', user_level='1', latency=0.0, command_latency=None,
+                 bandwidth=None, chunk_size=None, page_lines=24,
+                 privileged_commands=PRIVILEGED_COMMANDS, host='127.0.0.1', port=0):
+        if asyncssh is None:
+            raise ImportError('ComwareSimulator needs asyncssh (pip install asyncssh)')
+        self.outputs = outputs if outputs is not None else synthetic_outputs(sysname=sysname)
+        self.sysname = sysname
+        self.username = username
+        self.password = password
+        self.super_password = super_password
+        self.user_level = user_level
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.bandwidth = bandwidth
+        self.chunk_size = chunk_size
+        self.page_lines = page_lines
+        self.privileged_commands = privileged_commands
+        self.host = host
+        self.port = port
+        self.commands = []
+        self.sessions = 0
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._connections = set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """ Start the event loop thread and listen """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, args=(self._loop,), daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(self._listen(), self._loop).result(30)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    @staticmethod
+    def _run_loop(loop):
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _listen(self):
+        return await asyncssh.create_server(
+                lambda: _SSHServer(self), self.host, self.port, line_editor=False,
+                process_factory=self._session,
+                server_host_keys=[asyncssh.generate_private_key('ssh-ed25519')])
+
+    def stop(self):
+        """ Close the server and its sessions, stop the thread """
+        if self._loop is None:
+            return
+
+        async def close():
+            self._server.close()
+            for connection in list(self._connections):
+                connection.close()
+                await connection.wait_closed()
+            await self._server.wait_closed()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(30)
+        self._loop = self._server = self._thread = None
+
+    async def _session(self, process):
+        session = SimulatedSession(self, process.get_extra_info('username'))
+        self.sessions += 1
+        reader = _LineReader(process.stdin)
+        process.stdout.write('\r\n' + '*' * 60 + '\r\n* Simulated Comware switch\r\n'
+                             + '*' * 60 + '\r\n\r\n' + session.prompt)
+        try:
+            while True:
+                line = await reader.readline()
+                if line is None:
+                    break
+                command = line.strip()
+                process.stdout.write(line.rstrip('\r\n') + '\r\n')
+                if not command:
+                    process.stdout.write(session.prompt)
+                    continue
+                self.commands.append(command)
+                if command == 'quit' and not session.system_view:
+                    break
+                output = await self._answer(session, command, process, reader)
+                await self._write_output(session, command, output, process, reader)
+        except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, ConnectionError):
+            pass
+        process.exit(0)
+
+    async def _answer(self, session, command, process, reader):
+        """ Return output of command, changing the session state """
+        if command == 'screen-length disable':
+            session.paging = False
+            return 'Info: The configuration is disabled for current user.'
+        if command == 'display users':
+            return DISPLAY_USERS.format(level=session.user_level, username=session.username)
+        if command.split()[0] == 'super':
+            process.stdout.write('Password:')
+            password = await reader.readline()
+            process.stdout.write('\r\n')
+            if password is None or password.strip() != self.super_password:
+                return ' % Password is incorrect.'
+            session.user_level = '3'
+            return ('User privilege level is 3, and only those commands whose level is '
+                    'equal to or less than this can be used.\n'
+                    'Privilege note: 0-VISIT, 1-MONITOR, 2-SYSTEM, 3-MANAGE')
+        if command == 'system-view':
+            session.system_view = True
+            return 'System View: return to User View with Ctrl+Z.'
+        if command in ('quit', 'return'):
+            session.system_view = False
+            return ''
+        if session.user_level != '3' and command.startswith(self.privileged_commands):
+            return REJECTED
+        output = self.outputs.get(command)
+        if output is not None:
+            return output(session) if callable(output) else output
+        # '| include', '| exclude' and '| begin' of an output
+        base, sep, pipe = command.partition(' | ')
+        output = self.outputs.get(base)
+        if not sep or output is None:
+            return REJECTED
+        output = output(session) if callable(output) else output
+        return _filter_output(output, pipe)
+
+    async def _write_output(self, session, command, output, process, reader):
+        """ Write output and prompt with latency, paging and throttling """
+        await asyncio.sleep(self.command_latency.get(command, self.latency))
+        lines = output.replace('\r\n', '\n').split('\n') if output else []
+        if session.paging and len(lines) > self.page_lines:
+            for start in range(0, len(lines), self.page_lines):
+                page = lines[start:start + self.page_lines]
+                if start:
+                    await self._write(process, MORE_ERASE)
+                await self._write(process, '\r\n'.join(page) + '\r\n')
+                if start + self.page_lines >= len(lines):
+                    break
+                await self._write(process, MORE)
+                key = await reader.read_key()
+                if key is None or key in 'qQ\x03':
+                    await self._write(process, MORE_ERASE)
+                    break
+        elif lines:
+            await self._write(process, '\r\n'.join(lines) + '\r\n')
+        await self._write(process, session.prompt)
+
+    async def _write(self, process, data):
+        chunk_size = self.chunk_size or (4096 if self.bandwidth else len(data)) or 1
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start:start + chunk_size]
+            process.stdout.write(chunk)
+            await process.stdout.drain()
+            if self.bandwidth:
+                await asyncio.sleep(len(chunk) / float(self.bandwidth))
+
+
+class _LineReader(object):
+    """ Lines and single keys (answers to '---- More ----') of the session input """
+
+    def __init__(self, stdin):
+        self.stdin = stdin
+        self._buffer = ''
+        self._skip_lf = False
+
+    async def _fill(self):
+        data = await self.stdin.read(4096)
+        if not data:
+            return False
+        self._buffer += data
+        return True
+
+    async def readline(self):
+        """ Next line with its end ('\r', '\n' or '\r\n'), None at EOF """
+        while True:
+            if self._skip_lf and self._buffer:
+                # '\n' of a '\r\n' split between two reads
+                if self._buffer[0] == '\n':
+                    self._buffer = self._buffer[1:]
+                self._skip_lf = False
+            for idx, char in enumerate(self._buffer):
+                if char in '\r\n':
+                    end = idx + 1
+                    if char == '\r' and self._buffer[end:end + 1] == '\n':
+                        end += 1
+                    elif char == '\r':
+                        self._skip_lf = True
+                    line, self._buffer = self._buffer[:end], self._buffer[end:]
+                    return line
+            if not await self._fill():
+                line, self._buffer = self._buffer, ''
+                return line or None
+
+    async def read_key(self):
+        """ Next character, None at EOF """
+        if not self._buffer and not await self._fill():
+            return None
+        key, self._buffer = self._buffer[0], self._buffer[1:]
+        return key
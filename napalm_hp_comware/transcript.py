@@ -0,0 +1,196 @@
+"""
+Record and replay of device sessions
+
+A transcript keeps everything written to and read from the channel of one
+netmiko session, with the time of every chunk, so a session with a
+production switch can be played back offline (to profile the parsers on
+real data, or compare 'timing' and 'prompt' read modes):
+
+    # record
+    device = HpComwareDriver(host, user, password, optional_args={'record': 'sw.jsonl.gz'})
+    device.open(); device.get_facts(); device.close()
+
+    # replay, as fast as possible (replay_speed None) or at original speed (1.0)
+    device = HpComwareDriver(host, user, password, optional_args={
+        'replay': 'sw.jsonl.gz', 'replay_speed': 1.0})
+
+The file holds one JSON value per line (gzip compressed when the name ends
+with .gz): a header object, then [offset, kind, data] events with offset in
+seconds from the start of the recording, kind 'w' (written), 'r' (read) or
+'p' (password written, data not kept). Recording starts after the login, so
+the replayed session starts logged in with the recorded base prompt.
+"""
+import gzip
+import json
+import time
+
+from netmiko.hp.hp_comware import HPComwareSSH
+
+TRANSCRIPT_VERSION = 1
+
+
+class TranscriptMismatch(Exception):
+    """ Replayed session wrote something the recorded session did not """
+
+
+def _open_file(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Transcript(object):
+    """ Header and events of a recorded session """
+
+    def __init__(self, header, events):
+        self.header = header
+        self.events = events
+
+    @property
+    def hostname(self):
+        return self.header.get('hostname', '')
+
+    @property
+    def base_prompt(self):
+        return self.header.get('base_prompt', '')
+
+    @classmethod
+    def load(cls, path):
+        with _open_file(path, 'r') as f:
+            header = json.loads(f.readline())
+            if header.get('transcript') != TRANSCRIPT_VERSION:
+                raise ValueError('{} is not a version {} transcript'.format(
+                        path, TRANSCRIPT_VERSION))
+            return cls(header, [tuple(json.loads(line)) for line in f if line.strip()])
+
+    def commands(self):
+        """ Written lines, in order """
+        return [line for offset, kind, data in self.events if kind == 'w'
+                for line in data.splitlines() if line.strip()]
+
+
+class TranscriptRecorder(object):
+    """ Write the channel traffic of a netmiko connection to path """
+
+    def __init__(self, device, path, hostname=''):
+        self.device = device
+        self.path = path
+        self._file = _open_file(path, 'w')
+        self._start = time.time()
+        self._passwords = set(
+                p + device.RETURN for p in (device.password, device.secret) if p)
+        self._write_line({
+            'transcript': TRANSCRIPT_VERSION, 'hostname': hostname,
+            'base_prompt': device.base_prompt, 'started': self._start,
+        })
+        self._read_channel = device.read_channel
+        self._write_channel = device.write_channel
+        self._disconnect = device.disconnect
+        # netmiko calls these on itself, instance attributes catch every call
+        device.read_channel = self.read_channel
+        device.write_channel = self.write_channel
+        device.disconnect = self.disconnect
+
+    def _write_line(self, value):
+        self._file.write(json.dumps(value, separators=(',', ':')) + '\n')
+
+    def _event(self, kind, data):
+        self._write_line([round(time.time() - self._start, 4), kind, data])
+
+    def read_channel(self):
+        data = self._read_channel()
+        if data:
+            self._event('r', data)
+        return data
+
+    def write_channel(self, out_data):
+        # NULL bytes are the keepalives of is_alive()
+        if out_data in self._passwords:
+            self._event('p', '')
+        elif out_data and out_data != chr(0):
+            self._event('w', out_data)
+        return self._write_channel(out_data)
+
+    def disconnect(self):
+        self.close()
+        return self._disconnect()
+
+    def close(self):
+        """ Stop recording and close the file """
+        if self._file is None:
+            return
+        for name in ('read_channel', 'write_channel', 'disconnect'):
+            vars(self.device).pop(name, None)
+        self._file.close()
+        self._file = None
+
+
+def record(device, path, hostname=''):
+    """ Start recording the session of netmiko connection device to path """
+    return TranscriptRecorder(device, path, hostname=hostname)
+
+
+class ReplayDevice(HPComwareSSH):
+    """ netmiko Comware connection playing a Transcript back instead of
+    connecting. speed None replays as fast as possible, 1.0 at the
+    recorded speed (2.0 twice as fast ...).
+
+    A write has to match the next recorded write, or a later one in which
+    case the events in between are skipped (commands the replaying driver
+    did not send, ex: served from its cache). Anything else raises
+    TranscriptMismatch.
+    """
+
+    def __init__(self, transcript, speed=None, **kwargs):
+        self.transcript = transcript
+        self.speed = speed
+        self._next = 0
+        self._closed = False
+        # replay time and recorded offset of the last write
+        self._anchor = self._anchor_offset = 0.0
+        kwargs.setdefault('host', transcript.hostname or 'replay')
+        super(ReplayDevice, self).__init__(**kwargs)
+
+    def _open(self):
+        self.base_prompt = self.transcript.base_prompt
+        self._anchor = time.time()
+
+    def _due(self, offset):
+        if self.speed is None:
+            return True
+        return time.time() >= self._anchor + (offset - self._anchor_offset) / self.speed
+
+    def read_channel(self):
+        """ Recorded chunks due before the next recorded write """
+        events = self.transcript.events
+        output = ''
+        while self._next < len(events):
+            offset, kind, data = events[self._next]
+            if kind != 'r' or not self._due(offset):
+                break
+            output += data
+            self._next += 1
+        return output
+
+    def write_channel(self, out_data):
+        if not out_data or out_data == chr(0):
+            return
+        events = self.transcript.events
+        first_write = True
+        for idx in range(self._next, len(events)):
+            offset, kind, data = events[idx]
+            if kind == 'r':
+                continue
+            # a password matches only in its place
+            if (kind == 'p' and first_write) or (kind == 'w' and data == out_data):
+                self._next = idx + 1
+                self._anchor, self._anchor_offset = time.time(), offset
+                return
+            first_write = False
+        raise TranscriptMismatch('{!r} was not written in the recorded session'.format(out_data))
+
+    def is_alive(self):
+        return not self._closed
+
+    def disconnect(self):
+        self._closed = True
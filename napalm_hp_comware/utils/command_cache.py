@@ -0,0 +1,95 @@
+"""
+Per-session cache of raw command outputs used by HpComwareDriver._send_command
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Session commands which never change the device configuration
+SESSION_COMMANDS = ('screen-length', 'super')
+
+
+def is_read_only(command):
+    """ True for 'display ...' commands (including abbreviations like 'dis')"""
+    words = command.strip().lower().split()
+    if not words:
+        return False
+    return len(words[0]) >= 3 and 'display'.startswith(words[0])
+
+
+def changes_config(command):
+    """ True for every command which may change the device configuration """
+    if is_read_only(command):
+        return False
+    return not command.strip().lower().startswith(SESSION_COMMANDS)
+
+
+class CommandCache(object):
+    """ Size bounded LRU cache of command outputs keyed by command string.
+
+    Every entry expires after its TTL. The TTL of a command is looked up in
+    `ttls` by exact command first and then by the longest matching prefix,
+    falling back to the default `ttl`. A TTL of 0 disables caching of the
+    command.
+
+        cache = CommandCache(maxsize=64, ttl=300,
+                             ttls={'display mac-address': 30})
+    """
+
+    def __init__(self, maxsize=128, ttl=300, ttls=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, command):
+        return self.get(command) is not None
+
+    def ttl_for(self, command):
+        """ Return TTL in seconds for command """
+        command = command.strip()
+        if command in self.ttls:
+            return self.ttls[command]
+        prefixes = [p for p in self.ttls if command.startswith(p)]
+        if prefixes:
+            return self.ttls[max(prefixes, key=len)]
+        return self.ttl
+
+    def get(self, command):
+        """ Return cached output of command or None if missing/expired """
+        command = command.strip()
+        with self._lock:
+            entry = self._entries.get(command)
+            if entry is None:
+                return None
+            expires, output = entry
+            if expires <= self._clock():
+                del self._entries[command]
+                return None
+            self._entries.move_to_end(command)
+            return output
+
+    def set(self, command, output):
+        """ Store output of command, evicting the least recently used entry """
+        command = command.strip()
+        ttl = self.ttl_for(command)
+        if not ttl or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[command] = (self._clock() + ttl, output)
+            self._entries.move_to_end(command)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, command=None):
+        """ Drop one command from the cache or everything if command is None """
+        with self._lock:
+            if command is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(command.strip(), None)
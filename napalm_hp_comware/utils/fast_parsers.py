@@ -0,0 +1,303 @@
+"""
+Single pass parsers for the biggest Comware outputs
+
+Every parser returns exactly the records of the TextFSM template (or regex)
+it replaces, or None when the output shape is not recognised, in which case
+the caller falls back to the template.
+"""
+import re
+
+_VLAN_RE = re.compile(r'\d+\Z')
+_INTERFACE_STATE_RE = re.compile(r'(?:UP|DOWN|ADM|Stby)\Z')
+_PROTOCOL_STATE_RE = re.compile(r'(?:UP|DOWN|UP\(s\)|DOWN\(s\))\Z')
+_IP_ADDRESS_RE = re.compile(r'\d+\.\d+\.\d+\.\d+\Z')
+_SPEED_RE = re.compile(r'(?:\d+|--|\d+G\(a\)|A|auto)\Z')
+_DUPLEX_RE = re.compile(r'(?:A|F|F\(a\))\Z')
+_INTERFACE_MODE_RE = re.compile(r'(?:A|T|H)\Z')
+_ROUTE_MODE_HEADER_RE = re.compile(r'Interface\s+Link\s+Protocol\s+Main\s+IP\s+Description')
+_BRIDGE_MODE_HEADER_RE = re.compile(
+    r'Interface\s+Link\s+Speed\s+Duplex\s+Type\s+PVID\s+Description')
+_MAC_HEADER_RE = re.compile(r'MAC\s+(?:ADDR|Address)\s+VLAN\s+ID', re.I)
+
+# Reference regex of HpComwareDriver.get_arp_table
+ARP_RE = re.compile(
+    r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+([0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4})'
+    r'\s+(\d+)\s+([A-Za-z0-9-/]{1,40})\s+(\d+)\s+(\w+)\n', re.M)
+_ARP_IP_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\Z')
+_ARP_MAC_RE = re.compile(r'[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}\Z')
+_ARP_PORT_RE = re.compile(r'[A-Za-z0-9-/]{1,40}\Z')
+_ARP_TYPE_RE = re.compile(r'\w+\Z')
+_ARP_FIELDS = ('ip', 'mac', 'vlan', 'interface', 'aging', 'type')
+_LLDP_FIELDS = {
+    'Chassis ID': 'remote_chassis_id',
+    'Port ID': 'remote_port',
+    'Port description': 'remote_port_description',
+    'System name': 'remote_system_name',
+    'System description': 'remote_system_description',
+    'System capabilities supported': 'remote_system_capab',
+    'System capabilities enabled': 'remote_system_enable_capab',
+}
+_LLDP_INDEX_KEYS = ('Neighbor index', 'LLDP neighbor index')
+_LLDP_PORT_RE = re.compile(r'LLDP neighbor-information of port (\d+)\[(.*)\]')
+_SLOT_RE = re.compile(r'Slot\s+(\d+):\Z')
+_MANUINFO_KEYS = (
+    'DEVICE_NAME', 'DEVICE_SERIAL_NUMBER', 'MAC_ADDRESS', 'MANUFACTURING_DATE', 'VENDOR_NAME')
+
+# Reference regexes of HpComwareDriver.get_facts and get_interfaces_ip
+MANUINFO_RE = re.compile(
+    r"^Slot\s+(\d+):\nDEVICE_NAME\s+:\s+(.*)\nDEVICE_SERIAL_NUMBER\s+:\s+(.*)\n"
+    r"MAC_ADDRESS\s+:\s+([0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4}-[0-9a-fA-F]{1,4})\n"
+    r"MANUFACTURING_DATE\s+:\s+(.*)\nVENDOR_NAME\s+:\s+(.*)", re.M)
+SYSNAME_RE = re.compile(r'.*\s+sysname\s+(.*)\n', re.M)
+INTERFACE_IPV4_RE = re.compile(
+    r'^interface\s+([A-Za-z0-9-/]{1,40})\n.*\s+ip\s+address\s+'
+    r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\n', re.M)
+
+
+def parse_mac_address_line(line):
+    """ Return record of one 'display mac-address' row or None """
+    if not line or line[0].isspace():
+        return None
+    fields = line.split(None, 5)
+    if len(fields) < 5 or not _VLAN_RE.match(fields[1]):
+        return None
+    return {
+        'mac': fields[0],
+        'interface': fields[3],
+        'vlan': fields[1],
+        'static': '',
+        'active': '',
+        'moves': '',
+        'last_move': '',
+        'state': fields[2],
+        'aging': fields[4],
+    }
+
+
+def is_mac_address_header(line):
+    """ True if line is the column header of 'display mac-address' """
+    return _MAC_HEADER_RE.match(line) is not None
+
+
+def parse_mac_address(raw_text):
+    """ Same records as display_mac_address(_all).tpl """
+    entries = []
+    header_found = False
+    for line in raw_text.splitlines():
+        entry = parse_mac_address_line(line)
+        if entry is not None:
+            entries.append(entry)
+        elif not header_found and _MAC_HEADER_RE.match(line):
+            header_found = True
+    if entries and not header_found:
+        return None
+    return entries
+
+
+def _interface_brief_row(interface=''):
+    return {
+        'interface': interface,
+        'interface_state': '',
+        'interface_protocol_state': '',
+        'ip_address': '',
+        'description': '',
+        'speed': '',
+        'duplex': '',
+        'interface_mode': '',
+        'pvid': '',
+    }
+
+
+def _split_description(line, fields_count):
+    """ Split line into fields_count fields followed by whitespace and return
+    (fields, description) or None
+    """
+    fields = line.split(None, fields_count)
+    if len(fields) < fields_count:
+        return None
+    if len(fields) == fields_count:
+        # the template needs whitespace after the last field
+        if not line[-1].isspace():
+            return None
+        return fields, ''
+    return fields[:fields_count], fields[fields_count]
+
+
+def parse_interface_brief(raw_text):
+    """ Same records as display_interface_brief.tpl """
+    entries = []
+    state = None
+    for line in raw_text.splitlines():
+        if not line or line[0].isspace():
+            continue
+        if state == 'bridge':
+            parts = _split_description(line, 6)
+            if parts is None:
+                continue
+            (iface, link, speed, duplex, mode, pvid), description = parts
+            if (_INTERFACE_STATE_RE.match(link) and _SPEED_RE.match(speed)
+                    and _DUPLEX_RE.match(duplex) and _INTERFACE_MODE_RE.match(mode)
+                    and _VLAN_RE.match(pvid)):
+                row = _interface_brief_row(iface)
+                row.update({
+                    'interface_state': link,
+                    'speed': speed,
+                    'duplex': duplex,
+                    'interface_mode': mode,
+                    'pvid': pvid,
+                    'description': description,
+                })
+                entries.append(row)
+        elif state == 'route':
+            parts = _split_description(line, 4)
+            if parts is not None:
+                (iface, link, protocol, ip_address), description = parts
+                if (_INTERFACE_STATE_RE.match(link) and _PROTOCOL_STATE_RE.match(protocol)
+                        and _IP_ADDRESS_RE.match(ip_address)):
+                    row = _interface_brief_row(iface)
+                    row.update({
+                        'interface_state': link,
+                        'interface_protocol_state': protocol,
+                        'ip_address': ip_address,
+                        'description': description,
+                    })
+                    entries.append(row)
+                    continue
+            if _BRIDGE_MODE_HEADER_RE.match(line):
+                state = 'bridge'
+        elif _ROUTE_MODE_HEADER_RE.match(line):
+            state = 'route'
+        elif _BRIDGE_MODE_HEADER_RE.match(line):
+            state = 'bridge'
+    if state is None and raw_text.strip():
+        return None
+    return entries
+
+
+def parse_arp_regex(raw_text):
+    """ Records of 'display arp' as parsed by the original ARP_RE regex """
+    return [dict(zip(_ARP_FIELDS, rec)) for rec in ARP_RE.findall(raw_text)]
+
+
+def parse_arp(raw_text):
+    """ Same records as parse_arp_regex() for well formed 'display arp' rows """
+    entries = []
+    for line in raw_text.splitlines():
+        fields = line.split()
+        if (len(fields) == 6 and not line[0].isspace()
+                and _ARP_IP_RE.match(fields[0]) and _ARP_MAC_RE.match(fields[1])
+                and _VLAN_RE.match(fields[2]) and _ARP_PORT_RE.match(fields[3])
+                and _VLAN_RE.match(fields[4]) and _ARP_TYPE_RE.match(fields[5])):
+            entries.append(dict(zip(_ARP_FIELDS, fields)))
+    return entries
+
+
+def parse_link_aggregation_verbose(raw_text):
+    """ Return {aggregation interface: [local port records]} of a full
+    'display link-aggregation verbose'. Records have the keys of
+    display_link_aggregation_verbose.tpl (port_name, status, priority,
+    oper_key, flag).
+    """
+    aggregations = {}
+    ports = None
+    local = False
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('Aggregation Interface:'):
+            ports = aggregations.setdefault(stripped.split(':', 1)[1].strip(), [])
+            local = True
+        elif stripped == 'Local:':
+            local = True
+        elif stripped == 'Remote:':
+            local = False
+        elif ports is not None and local and line[:1].isspace():
+            fields = stripped.split()
+            if len(fields) >= 3 and fields[0] != 'Port' and _VLAN_RE.match(fields[2]):
+                fields += [''] * (5 - len(fields))
+                ports.append({
+                    'port_name': fields[0],
+                    'status': fields[1],
+                    'priority': fields[2],
+                    'oper_key': fields[3],
+                    'flag': fields[4],
+                })
+    return aggregations
+
+
+def _lldp_entry(local_interface, local_interface_idx):
+    entry = dict.fromkeys(_LLDP_FIELDS.values(), '')
+    entry['local_interface'] = local_interface
+    entry['local_interface_idx'] = local_interface_idx
+    return entry
+
+
+def parse_lldp_neighbor_information(raw_text):
+    """ Return list of neighbours of 'display lldp neighbor-information
+    [interface X] [verbose]' with the keys of
+    display_lldp_neighbor_information_interface.tpl, one pass over the
+    lines. A 'Neighbor index' (v5) or 'LLDP neighbor index' (v7) line
+    starts the next neighbour of the same port. None if there is output but
+    no port header.
+    """
+    entries = []
+    entry = None
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('LLDP neighbor-information of port'):
+            match = _LLDP_PORT_RE.match(stripped)
+            if match:
+                entry = _lldp_entry(match.group(2), match.group(1))
+                entries.append(entry)
+            continue
+        if entry is None:
+            continue
+        key, sep, value = stripped.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        field = _LLDP_FIELDS.get(key)
+        if field is not None:
+            entry[field] = value.strip()
+        elif key in _LLDP_INDEX_KEYS and entry['remote_chassis_id']:
+            entry = _lldp_entry(entry['local_interface'], entry['local_interface_idx'])
+            entries.append(entry)
+    if not entries and raw_text.strip():
+        return None
+    return entries
+
+
+def parse_device_manuinfo(raw_text):
+    """ Return (slot, device_name, serial_number, mac, manufacturing_date,
+    vendor) tuples of the 'Slot N:' blocks of 'display device manuinfo',
+    line by line (linear time version of MANUINFO_RE).
+    """
+    records = []
+    block = None
+    for line in raw_text.splitlines():
+        match = _SLOT_RE.match(line)
+        if match:
+            block = {'slot': match.group(1)}
+            continue
+        if block is None:
+            continue
+        key, sep, value = line.partition(':')
+        key = key.strip()
+        if not sep or key not in _MANUINFO_KEYS:
+            # the six lines of the slot have to follow each other
+            block = None
+            continue
+        block[key] = value.strip()
+        if key == 'VENDOR_NAME':
+            if len(block) == 6 and _ARP_MAC_RE.match(block['MAC_ADDRESS']):
+                records.append((block['slot'],) + tuple(block[k] for k in _MANUINFO_KEYS))
+            block = None
+    return records
+
+
+# template name -> native parser
+NATIVE_PARSERS = {
+    'display_mac_address': parse_mac_address,
+    'display_mac_address_all': parse_mac_address,
+    'display_interface_brief': parse_interface_brief,
+    'display_lldp_neighbor_information_interface': parse_lldp_neighbor_information,
+}
@@ -0,0 +1,74 @@
+"""
+In-memory index of one MAC address table (and optionally ARP table)
+
+Answers MAC, port and VLAN lookups locally instead of asking the device
+for every MAC address.
+"""
+import time
+from collections import defaultdict
+
+from napalm_hp_comware.utils.mac_table import CompactMacTable, mac_to_int
+
+
+class MacIndex(object):
+    """ Hash maps by MAC, port and VLAN over a CompactMacTable
+
+        index = MacIndex(driver.get_mac_address_table(compact=True),
+                         driver.get_arp_table())
+        index.lookup('2c41-3888-ffff')    # list of MAC table rows
+        index.ips('2c:41:38:88:ff:ff')    # ['10.1.1.1']
+    """
+
+    def __init__(self, mac_table, arp_table=(), clock=time.monotonic):
+        if not isinstance(mac_table, CompactMacTable):
+            mac_table = CompactMacTable(mac_table)
+        self.mac_table = mac_table
+        self._clock = clock
+        self.built_at = clock()
+        self._by_mac = defaultdict(list)
+        self._by_port = defaultdict(list)
+        self._by_vlan = defaultdict(list)
+        for idx in range(len(mac_table)):
+            self._by_mac[mac_table.mac_int(idx)].append(idx)
+            self._by_port[mac_table.interface(idx)].append(idx)
+            self._by_vlan[mac_table.vlan(idx)].append(idx)
+        self._arp_by_mac = defaultdict(list)
+        self._arp_by_ip = {}
+        for entry in arp_table:
+            self._arp_by_mac[mac_to_int(entry['mac'])].append(entry['ip'])
+            self._arp_by_ip[entry['ip']] = entry
+
+    def __len__(self):
+        return len(self.mac_table)
+
+    def age(self):
+        """ Seconds since the index was built """
+        return self._clock() - self.built_at
+
+    def is_fresh(self, max_age):
+        """ True if index is younger than max_age seconds (None - forever) """
+        return max_age is None or self.age() < max_age
+
+    def _rows(self, indexes):
+        return [self.mac_table[idx] for idx in indexes]
+
+    def lookup(self, mac):
+        """ Return MAC table rows of mac (any usual format) """
+        return self._rows(self._by_mac.get(mac_to_int(mac), ()))
+
+    def by_port(self, interface):
+        """ Return MAC table rows learned on interface (normalized name) """
+        return self._rows(self._by_port.get(interface, ()))
+
+    def by_vlan(self, vlan):
+        """ Return MAC table rows of vlan """
+        return self._rows(self._by_vlan.get(int(vlan), ()))
+
+    def ips(self, mac):
+        """ Return ARP IP addresses of mac """
+        return list(self._arp_by_mac.get(mac_to_int(mac), ()))
+
+    def mac_for_ip(self, ip):
+        """ Return ARP MAC address of ip or None """
+        entry = self._arp_by_ip.get(ip)
+        return entry['mac'] if entry else None
@@ -0,0 +1,128 @@
+"""
+Compact array backed MAC address table
+
+MAC addresses are kept as 48-bit integers, VLANs as unsigned shorts and
+interface/state/aging strings as indexes into one table of interned strings.
+A row costs about 18 bytes instead of a dict of ten strings.
+
+    table = driver.get_mac_address_table(compact=True)
+    table[0]['mac']             # '2c:41:38:88:ff:ff'
+    table.mac_int(0)            # 48647286669311
+    [dict(row) for row in table] == driver.get_mac_address_table()
+"""
+from array import array
+from collections.abc import Mapping
+
+ROW_KEYS = ('mac', 'interface', 'vlan', 'static', 'active', 'moves', 'last_move', 'state', 'aging')
+
+
+def mac_to_int(mac):
+    """ Convert MAC in any usual format (aa:bb.., aabb-.., aabb.cc..) to int """
+    return int(mac.replace(':', '').replace('-', '').replace('.', ''), 16)
+
+
+def int_to_mac(value):
+    """ Convert int to MAC in cisco way format aa:bb:cc:dd:ee:ff """
+    digits = '{:012x}'.format(value)
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+class MacTableRow(Mapping):
+    """ Read only dict-like view of one CompactMacTable row """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        table, index = self._table, self._index
+        if key == 'mac':
+            return int_to_mac(table._macs[index])
+        elif key == 'interface':
+            return table._strings[table._ports[index]]
+        elif key == 'vlan':
+            return str(table._vlans[index])
+        elif key == 'state':
+            return table._strings[table._states[index]]
+        elif key == 'aging':
+            return table._strings[table._agings[index]]
+        elif key in ROW_KEYS:
+            # not provided by comware, '' as in the TextFSM entries
+            return ''
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(ROW_KEYS)
+
+    def __len__(self):
+        return len(ROW_KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class CompactMacTable(object):
+    """ Column store of MAC table entries (see module docstring) """
+    __slots__ = ('_macs', '_vlans', '_ports', '_states', '_agings', '_strings', '_string_ids')
+
+    def __init__(self, entries=()):
+        self._macs = array('Q')
+        self._vlans = array('H')
+        self._ports = array('H')
+        self._states = array('H')
+        self._agings = array('H')
+        self._strings = []
+        self._string_ids = {}
+        for entry in entries:
+            self.append(entry['mac'], entry['vlan'], entry['interface'],
+                        entry.get('state', ''), entry.get('aging', ''))
+
+    def _intern(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def append(self, mac, vlan, interface, state='', aging=''):
+        """ Add one entry, mac can be int or string """
+        self._macs.append(mac if isinstance(mac, int) else mac_to_int(mac))
+        self._vlans.append(int(vlan))
+        self._ports.append(self._intern(interface))
+        self._states.append(self._intern(state))
+        self._agings.append(self._intern(aging))
+
+    def __len__(self):
+        return len(self._macs)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('CompactMacTable index out of range')
+        return MacTableRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield MacTableRow(self, index)
+
+    def mac_int(self, index):
+        """ MAC address of row index as 48-bit int """
+        return self._macs[index]
+
+    def vlan(self, index):
+        """ VLAN of row index as int """
+        return self._vlans[index]
+
+    def interface(self, index):
+        """ Interface name of row index """
+        return self._strings[self._ports[index]]
+
+    def interfaces(self):
+        """ Return list of interned interface names """
+        return [self._strings[i] for i in sorted(set(self._ports))]
+
+    def to_list(self):
+        """ Return entries as list of dictionaries """
+        return [dict(row) for row in self]
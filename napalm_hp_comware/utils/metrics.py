@@ -0,0 +1,264 @@
+"""
+Transfer metrics of a driver
+
+Counts commands and received output per command and per getter (the
+outermost metered driver method running when the command was sent).
+
+    device.get_interfaces_ip()
+    device.metrics.as_dict()['getters']['get_interfaces_ip']
+    # {'calls': 1, 'commands': 1, 'bytes': 5210, 'cached': 0}
+
+Sizes are characters of the decoded output, equal to bytes for the ASCII
+Comware CLI.
+
+With a sink (any callable) every transferred command, parse step and
+getter call is also reported as a TimingEvent. Without a sink nothing is
+timed.
+
+    stats = LatencyStats()
+    device.metrics.sink = stats          # or optional_args={'metrics_sink': stats}
+    device.get_facts()
+    stats.report()['commands']['display version']['receive_time']
+    # {'count': 1, 'p50': 0.41, 'p95': 0.41, 'p99': 0.41}
+"""
+import functools
+import math
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+clock = time.perf_counter
+
+
+class TimingEvent(namedtuple('TimingEvent', [
+        'kind', 'command', 'getter', 'elapsed', 'first_byte', 'receive_time', 'bytes',
+        'parse_time'])):
+    """ Timing of one step, times in seconds (None when unknown)
+
+    kind 'command': command sent and read, first_byte is the time from
+        sending to the first non empty read of the channel. Pipelined
+        batches are one event with the commands joined by '; '.
+    kind 'parse': parser (template name or parse function) of an output,
+        elapsed equals parse_time.
+    kind 'getter': outermost metered driver method, receive_time, bytes and
+        parse_time are the sums of its command and parse events.
+    """
+    __slots__ = ()
+
+
+def percentile(values, q):
+    """ Nearest rank q-th percentile of values """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, int(math.ceil(q / 100.0 * len(ordered))) - 1)]
+
+
+class LatencyStats(object):
+    """ Sink keeping events and reporting p50/p95/p99 per command, parser
+    and getter """
+
+    FIELDS = ('elapsed', 'first_byte', 'receive_time', 'bytes', 'parse_time')
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def clear(self):
+        self.events = []
+
+    def report(self):
+        """ {'commands'|'parsers'|'getters': {name: {field: {'count', 'p50',
+        'p95', 'p99'}}}} """
+        groups = {}
+        for event in self.events:
+            section = {'command': 'commands', 'parse': 'parsers'}.get(event.kind, 'getters')
+            groups.setdefault(section, {}).setdefault(event.command, []).append(event)
+        report = {'commands': {}, 'parsers': {}, 'getters': {}}
+        for section, names in groups.items():
+            for name, events in names.items():
+                report[section][name] = self._summary(events)
+        return report
+
+    def _summary(self, events):
+        summary = {}
+        for field in self.FIELDS:
+            values = [getattr(e, field) for e in events if getattr(e, field) is not None]
+            if values:
+                summary[field] = dict(count=len(values), **dict(
+                    ('p{}'.format(q), percentile(values, q)) for q in self.PERCENTILES))
+        return summary
+
+
+def _counter():
+    return {'commands': 0, 'bytes': 0, 'cached': 0}
+
+
+class TransferMetrics(object):
+    """ Per command and per getter transfer counters """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.reset()
+
+    def reset(self):
+        self.commands = {}
+        self.getters = {}
+        self._getter = None
+        self._getter_timing = None
+
+    @property
+    def current_getter(self):
+        return self._getter
+
+    @contextmanager
+    def getter(self, name):
+        """ Attribute commands sent inside the block to getter name
+        (nested getters count for the outermost one) """
+        if self._getter is not None:
+            yield
+            return
+        self._getter = name
+        self.getters.setdefault(name, dict(_counter(), calls=0))['calls'] += 1
+        if self.sink is None:
+            try:
+                yield
+            finally:
+                self._getter = None
+            return
+        # receive_time, bytes, parse_time of the getter
+        self._getter_timing = timing = [0.0, 0, 0.0]
+        start = clock()
+        try:
+            yield
+        finally:
+            self._getter = self._getter_timing = None
+            self.sink(TimingEvent('getter', name, name, clock() - start, None,
+                                  timing[0], timing[1], timing[2]))
+
+    def record(self, command, output, cached=False):
+        """ Count output of command, cached outputs were not transferred """
+        self._count(command, len(output), cached)
+
+    def _count(self, command, size, cached=False):
+        counters = [self.commands.setdefault(command, _counter())]
+        if self._getter is not None:
+            counters.append(self.getters[self._getter])
+        for counter in counters:
+            if cached:
+                counter['cached'] += 1
+            else:
+                counter['commands'] += 1
+                counter['bytes'] += size
+
+    def timed_read(self, device, command, read):
+        """ Return read() (reading output of command from device) and report
+        its timing to the sink. Time to first byte is taken from the
+        first non empty device.read_channel().
+        """
+        if self.sink is None:
+            return read()
+        first_byte = []
+        read_channel = device.read_channel
+        own = 'read_channel' in vars(device)
+
+        def timed_read_channel(*args, **kwargs):
+            data = read_channel(*args, **kwargs)
+            if data and not first_byte:
+                first_byte.append(clock())
+            return data
+
+        start = clock()
+        device.read_channel = timed_read_channel
+        try:
+            output = read()
+        finally:
+            if own:
+                device.read_channel = read_channel
+            else:
+                del device.read_channel
+        size = sum(len(o) for o in output) if isinstance(output, list) else len(output)
+        self._command_event(command, start, first_byte[0] if first_byte else None, size)
+        return output
+
+    def streamed_read(self, command):
+        """ Return StreamedRead counting and timing output of command which
+        is consumed while it is read """
+        return StreamedRead(self, command)
+
+    def _command_event(self, command, start, first_byte, size):
+        end = clock()
+        if self._getter_timing is not None:
+            self._getter_timing[0] += end - start
+            self._getter_timing[1] += size
+        self.sink(TimingEvent('command', command, self._getter, end - start,
+                              first_byte - start if first_byte is not None else None,
+                              end - start, size, None))
+
+    def timed_parse(self, name, parser, *args):
+        """ Return parser(*args) and report its time as parse event name """
+        if self.sink is None:
+            return parser(*args)
+        start = clock()
+        result = parser(*args)
+        elapsed = clock() - start
+        if self._getter_timing is not None:
+            self._getter_timing[2] += elapsed
+        self.sink(TimingEvent('parse', name, self._getter, elapsed, None, None, None, elapsed))
+        return result
+
+    def as_dict(self):
+        return {
+            'commands': dict((k, dict(v)) for k, v in self.commands.items()),
+            'getters': dict((k, dict(v)) for k, v in self.getters.items()),
+        }
+
+
+class StreamedRead(object):
+    """ Output of one command read chunk by chunk: received() every chunk,
+    done() once at the end. Receive time includes the time the consumer
+    spent between two chunks (parsing the rows).
+    """
+    __slots__ = ('metrics', 'command', 'size', 'start', 'first_byte')
+
+    def __init__(self, metrics, command):
+        self.metrics = metrics
+        self.command = command
+        self.size = 0
+        self.start = clock() if metrics.sink is not None else None
+        self.first_byte = None
+
+    def received(self, data):
+        if self.first_byte is None and self.start is not None:
+            self.first_byte = clock()
+        self.size += len(data)
+
+    def done(self):
+        self.metrics._count(self.command, self.size)
+        self.report()
+
+    def report(self):
+        """ Only report the timing (outputs of a batch are counted per command) """
+        if self.start is not None:
+            self.metrics._command_event(self.command, self.start, self.first_byte, self.size)
+
+
+def metered(method):
+    """ Decorator attributing the commands of a driver method to its name """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.metrics.getter(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def metered_async(method):
+    """ metered() of a coroutine method """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with self.metrics.getter(method.__name__):
+            return await method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,87 @@
+"""
+Comware CLI prompt detection
+
+    <sysname>                          - user view
+    [sysname]                          - system view
+    [sysname-GigabitEthernet1/0/1]     - any system view sub-view
+    Password:                          - 'super' password prompt
+"""
+import re
+
+# Commands which ask questions ([Y/N], passwords ...) and can not be read
+# until the device prompt comes back
+INTERACTIVE_COMMANDS = (
+    'super',
+    'save',
+    'reboot',
+    'reset',
+    'delete',
+    'format',
+    'startup saved-configuration',
+)
+
+# Error lines of commands (or command forms) the device does not support
+# and the number of leading lines (command echo, '^' marker) they are
+# searched in
+REJECTED_LINES = 3
+REJECTED_MARKERS = (
+    '% Unrecognized command',
+    '% Too many parameters',
+    '% Wrong parameter',
+    '% Incomplete command',
+    'Invalid input',
+)
+
+
+def prompt_pattern(base_prompt):
+    """ Return regex matching any Comware prompt of the device base_prompt """
+    return r'(?:[<\[]{}[^<>\[\]]*[>\]]|[Pp]assword:)\s*$'.format(
+            re.escape(base_prompt))
+
+
+def prompt_line_pattern(base_prompt):
+    """ Return compiled regex matching prompts at the beginning of a line """
+    return re.compile(r'^[<\[]{}[^<>\[\]\n]*[>\]]'.format(
+            re.escape(base_prompt)), re.M)
+
+
+def split_pipelined_output(raw_output, commands, base_prompt):
+    """ Split output of commands written to the channel at once.
+
+    Every command output ends with the device prompt, followed by the echo
+    of the next command:
+
+        display clock
+        11:20:16 CET Mon 03/25/2019
+        <sysname>display version
+        ...
+        <sysname>
+
+    Return list with one output per command (echo and prompt stripped).
+    """
+    raw_output = raw_output.replace('\r\n', '\n').replace('\r', '')
+    parts = prompt_line_pattern(base_prompt).split(raw_output)
+    if len(parts) < len(commands) + 1:
+        raise ValueError("Expected {} prompts in pipelined output, got {}".format(
+            len(commands), len(parts) - 1))
+    outputs = []
+    for command, part in zip(commands, parts):
+        lines = part.lstrip('\n').split('\n')
+        if lines and command.strip() in lines[0]:
+            lines = lines[1:]
+        outputs.append('\n'.join(lines).strip('\n'))
+    return outputs
+
+
+def is_interactive(command):
+    """ True for commands which need timing based reads """
+    return command.strip().lower().startswith(INTERACTIVE_COMMANDS)
+
+
+def is_rejected(output):
+    """ True if output is the error of a command the device does not support.
+    Comware prints the error right after the echo, only the first lines are
+    checked so a description or banner quoting a marker is not an error.
+    """
+    lines = [line.strip() for line in output[:1024].splitlines() if line.strip()]
+    return any(line.startswith(REJECTED_MARKERS) for line in lines[:REJECTED_LINES])
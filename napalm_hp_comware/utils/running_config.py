@@ -0,0 +1,222 @@
+"""
+Parsed model of 'display current-configuration'
+
+The config is split once into global lines and sections (a non indented
+header like 'interface GigabitEthernet1/0/1' or 'vlan 10' with its
+indented lines). Interface attributes are parsed on first access.
+
+    config = RunningConfig(raw_config, key=driver.port_key)
+    config.sysname                                  # 'sw-01'
+    config.interface('GE1/0/1').vlans               # [1, 10, 11, 12]
+    config.interface('Vlan10').ipv4                 # [('10.0.0.1', 24)]
+"""
+import ipaddress
+
+
+def _mask_to_prefix_length(mask):
+    return ipaddress.IPv4Network('0.0.0.0/' + mask).prefixlen
+
+
+def parse_vlan_list(words):
+    """ Return VLAN ids of '1 10 to 20 all' like words """
+    vlans = []
+    idx = 0
+    while idx < len(words):
+        word = words[idx]
+        if word == 'all':
+            return list(range(1, 4095))
+        if idx + 2 < len(words) and words[idx + 1] == 'to':
+            vlans.extend(range(int(word), int(words[idx + 2]) + 1))
+            idx += 3
+            continue
+        if word.isdigit():
+            vlans.append(int(word))
+        idx += 1
+    return vlans
+
+
+class ConfigSection(object):
+    """ Header line and indented lines (stripped) of one config section """
+    __slots__ = ('header', 'lines', '_cache')
+
+    def __init__(self, header, lines=None):
+        self.header = header
+        self.lines = lines if lines is not None else []
+        self._cache = {}
+
+    @property
+    def name(self):
+        """ Header without its keyword ('interface Vlan-interface10' -> 'Vlan-interface10') """
+        return self.header.partition(' ')[2]
+
+    def values(self, keyword):
+        """ Return rest of every line starting with keyword """
+        prefix = keyword + ' '
+        return [line[len(prefix):] for line in self.lines if line.startswith(prefix)]
+
+    def value(self, keyword, default=None):
+        values = self.values(keyword)
+        return values[0] if values else default
+
+    def _cached(self, name, function):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = function()
+            return value
+
+
+class InterfaceConfig(ConfigSection):
+    """ Section of one interface with lazily parsed attributes """
+    __slots__ = ()
+
+    @property
+    def description(self):
+        return self.value('description', '')
+
+    @property
+    def shutdown(self):
+        return 'shutdown' in self.lines
+
+    @property
+    def link_type(self):
+        """ 'access', 'trunk' or 'hybrid' if configured, else None """
+        return self.value('port link-type')
+
+    @property
+    def ipv4(self):
+        """ List of (address, prefix_length), primary address first """
+        return self._cached('ipv4', self._parse_ipv4)
+
+    def _parse_ipv4(self):
+        addresses = []
+        for value in self.values('ip address'):
+            fields = value.split()
+            if len(fields) >= 2 and fields[1][0].isdigit():
+                if fields[1].isdigit():
+                    prefix = int(fields[1])
+                else:
+                    prefix = _mask_to_prefix_length(fields[1])
+                addresses.append((fields[0], prefix))
+        return addresses
+
+    @property
+    def ipv6(self):
+        """ List of (address, prefix_length), prefix_length 'N/A' for link-local """
+        return self._cached('ipv6', self._parse_ipv6)
+
+    def _parse_ipv6(self):
+        addresses = []
+        for value in self.values('ipv6 address'):
+            fields = value.split()
+            if not fields or fields[0] == 'auto':
+                continue
+            address, _, prefix = fields[0].partition('/')
+            if not prefix and len(fields) > 1 and fields[1].isdigit():
+                prefix = fields[1]
+            addresses.append((address, int(prefix) if prefix else u'N/A'))
+        return addresses
+
+    @property
+    def access_vlan(self):
+        vlan = self.value('port access vlan')
+        return int(vlan) if vlan else None
+
+    @property
+    def pvid(self):
+        vlan = self.value('port trunk pvid vlan') or self.value('port hybrid pvid vlan')
+        return int(vlan) if vlan else None
+
+    @property
+    def trunk_vlans(self):
+        return self._cached('trunk_vlans', lambda: self._vlan_lines('port trunk permit vlan'))
+
+    @property
+    def hybrid_vlans(self):
+        """ {'tagged': [...], 'untagged': [...]} """
+        return self._cached('hybrid_vlans', self._parse_hybrid_vlans)
+
+    def _vlan_lines(self, keyword):
+        vlans = []
+        for value in self.values(keyword):
+            vlans.extend(parse_vlan_list(value.split()))
+        return vlans
+
+    def _parse_hybrid_vlans(self):
+        vlans = {'tagged': [], 'untagged': []}
+        for value in self.values('port hybrid vlan'):
+            words = value.split()
+            if words and words[-1] in vlans:
+                vlans[words[-1]].extend(parse_vlan_list(words[:-1]))
+        return vlans
+
+    @property
+    def vlans(self):
+        """ Sorted VLAN ids carried by the port according to its link-type """
+        link_type = self.link_type
+        if link_type == 'trunk':
+            vlans = set(self.trunk_vlans) | {self.pvid or 1}
+        elif link_type == 'hybrid':
+            hybrid = self.hybrid_vlans
+            vlans = set(hybrid['tagged'] + hybrid['untagged'])
+        else:
+            vlans = {self.access_vlan or 1}
+        return sorted(vlans)
+
+
+class RunningConfig(object):
+    """ One pass index of the running config (see module docstring).
+    key normalizes interface names for lookups (default: unchanged).
+    """
+
+    def __init__(self, raw_text, key=None):
+        self.raw_text = raw_text
+        self._key = key or (lambda name: name)
+        self.global_lines = []
+        self.sections = []
+        self.interfaces = {}
+        self._parse(raw_text)
+
+    def _parse(self, raw_text):
+        section = None
+        for line in raw_text.splitlines():
+            if not line.strip() or line[0] == '#':
+                section = None
+            elif not line[0].isspace():
+                if line.startswith('interface '):
+                    section = InterfaceConfig(line.strip())
+                    self.interfaces[self._key(section.name)] = section
+                else:
+                    section = ConfigSection(line.strip())
+                self.sections.append(section)
+            elif section is not None:
+                section.lines.append(line.strip())
+            else:
+                self.global_lines.append(line.strip())
+
+    def interface(self, name):
+        """ InterfaceConfig of name (any form key accepts) or None """
+        return self.interfaces.get(self._key(name))
+
+    def sections_of(self, keyword):
+        """ Sections whose header starts with keyword (ex: 'vlan', 'ospf') """
+        prefix = keyword + ' '
+        return [section for section in self.sections
+                if section.header == keyword or section.header.startswith(prefix)]
+
+    def global_value(self, keyword, default=None):
+        """ Rest of the first global line starting with keyword """
+        prefix = keyword + ' '
+        for line in self.global_lines:
+            if line.startswith(prefix):
+                return line[len(prefix):]
+        return default
+
+    @property
+    def sysname(self):
+        sysname = self.global_value('sysname')
+        if sysname is None:
+            # '| include sysname' output may come without the indentation
+            sections = self.sections_of('sysname')
+            sysname = sections[0].name if sections else ''
+        return sysname
@@ -0,0 +1,26 @@
+"""
+Per-connection state of a Comware CLI session
+"""
+
+
+class SessionState(object):
+    """ Facts about the open CLI session which do not change until it is closed.
+
+        - paging_disabled - 'screen-length disable' was accepted
+        - user_level - current user level as shown by 'display users'
+        - os_version - Comware version string (ex: '5.20.105')
+        - prompt_pattern - regex matching the session prompts
+
+    Unknown values are None. Everything is forgotten by reset() which the
+    driver calls on open(), close() and when the connection drops.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """ Forget everything known about the session """
+        self.paging_disabled = False
+        self.user_level = None
+        self.os_version = None
+        self.prompt_pattern = None
@@ -0,0 +1,233 @@
+"""
+Synthetic Comware outputs of any size
+
+Deterministic generators used by the benchmarks and tests. Every
+generator returns the output text of one command with about n records.
+
+    raw = lldp_neighbor_information(500)
+    config = current_configuration(10000)
+
+GENERATORS maps the command of every generator to it.
+"""
+
+
+def _port(idx, members=9, ports=48):
+    """ idx-th physical port of an IRF stack (GigabitEthernet1/0/1 ...),
+    unique for any idx thanks to the slot number """
+    return 'GigabitEthernet{}/{}/{}'.format(
+            idx // ports % members + 1, idx // (ports * members), idx % ports + 1)
+
+
+def _mac(idx, prefix=0x2c41):
+    value = '{:08x}'.format(idx)
+    return '{:04x}-{}-{}'.format(prefix, value[:4], value[4:])
+
+
+def _ip(idx, first=10):
+    return '{}.{}.{}.{}'.format(first, idx >> 16 & 255, idx >> 8 & 255, idx & 255 or 1)
+
+
+def version(n=0, os_version='5.20.105', release='1808P21'):
+    """ 'display version' of a switch up for n minutes """
+    return (
+        'HP Comware Platform Software\n'
+        'Comware Software, Version {}, Release {}\n'
+        'Copyright (c) 2010-2014 Hewlett-Packard Development Company, L.P.\n'
+        'HP A5800-24G-SFP Switch with 1 Interface Slot uptime is '
+        '{} weeks, {} days, {} hours, {} minutes\n'
+        '\n'
+        'HP A5800-24G-SFP Switch with 1 Interface Slot with 2 Processors\n'
+        '1024M   bytes SDRAM\n'
+        'BootRom Version is 220\n'.format(
+            os_version, release, n // 10080, n // 1440 % 7, n // 60 % 24, n % 60))
+
+
+def mac_address(n):
+    """ 'display mac-address' with n learned entries """
+    lines = ['MAC ADDR       VLAN ID  STATE          PORT INDEX               AGING TIME(s)']
+    for idx in range(n):
+        port = 'Bridge-Aggregation{}'.format(idx % 64 + 1) if idx % 5 == 0 else _port(idx)
+        lines.append('{:<15}{:<9}{:<15}{:<25}AGING'.format(
+                _mac(idx, prefix=0xa036), idx % 4094 + 1, 'Learned', port))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def interface_brief(n):
+    """ 'display interface brief' with n bridge mode ports after a few
+    route mode interfaces """
+    lines = [
+        'The brief information of interface(s) under route mode:',
+        'Link: ADM - administratively down; Stby - standby',
+        'Protocol: (s) - spoofing',
+        'Interface            Link Protocol Main IP         Description',
+        'M-GE0/0/0            DOWN DOWN     --',
+        'NULL0                UP   UP(s)    --',
+        'Vlan1                UP   UP       10.0.0.1        management',
+        '',
+        'The brief information of interface(s) under bridge mode:',
+        'Link: ADM - administratively down; Stby - standby',
+        'Speed or Duplex: (a)/A - auto; H - half; F - full',
+        'Type: A - access; T - trunk; H - hybrid',
+        'Interface            Link Speed   Duplex Type PVID Description',
+    ]
+    for idx in range(n):
+        port = _port(idx).replace('GigabitEthernet', 'GE')
+        if idx % 3:
+            lines.append('{:<21}{:<5}{:<8}{:<7}{:<5}{:<5}access port {}'.format(
+                    port, 'UP', '1G(a)', 'F(a)', 'A', idx % 4094 + 1, idx))
+        else:
+            lines.append('{:<21}{:<5}{:<8}{:<7}{:<5}{:<5}'.format(
+                    port, 'DOWN', 'auto', 'A', 'T', 1))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def arp(n):
+    """ 'display arp' with n dynamic entries """
+    lines = [
+        '                Type: S-Static    D-Dynamic    A-Authorized',
+        'IP Address      MAC Address     VLAN ID  Interface              Aging Type',
+    ]
+    for idx in range(n):
+        lines.append('{:<16}{:<16}{:<9}{:<23}{:<6}D'.format(
+                _ip(idx), _mac(idx), idx % 4094 + 1,
+                _port(idx).replace('GigabitEthernet', 'GE'), idx % 20 + 1))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def link_aggregation_verbose(n, members=2):
+    """ 'display link-aggregation verbose' with n member ports in dynamic
+    aggregations of members ports """
+    lines = [
+        'Loadsharing Type: Shar -- Loadsharing, NonS -- Non-Loadsharing',
+        'Port Status: S -- Selected, U -- Unselected',
+        'Flags:  A -- LACP_Activity, B -- LACP_Timeout, C -- Aggregation,',
+        '        D -- Synchronization, E -- Collecting, F -- Distributing,',
+        '        G -- Defaulted, H -- Expired',
+    ]
+    separator = '-' * 80
+    for first in range(0, n, members):
+        ports = [_port(idx).replace('GigabitEthernet', 'GE')
+                 for idx in range(first, min(first + members, n))]
+        key = first // members + 1
+        lines += [
+            '',
+            'Aggregation Interface: Bridge-Aggregation{}'.format(key),
+            'Aggregation Mode: Dynamic',
+            'Loadsharing Type: Shar',
+            'System ID: 0x8000, d07e-28cf-0001',
+            'Local:',
+            '  Port             Status  Priority Oper-Key  Flag',
+            separator,
+        ]
+        lines += ['  {:<17}{:<8}{:<9}{:<10}{{ACDEF}}'.format(port, 'S', 32768, key)
+                  for port in ports]
+        lines += [
+            'Remote:',
+            '  Actor            Partner Priority Oper-Key  SystemID               Flag',
+            separator,
+        ]
+        lines += ['  {:<17}{:<8}{:<9}{:<10}0xf20b, e007-1b62-0001 {{ACDEF}}'.format(
+                  port, idx + 1, 0, 210) for idx, port in enumerate(ports)]
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def lldp_neighbor_information(n):
+    """ 'display lldp neighbor-information' with n neighbours """
+    blocks = []
+    for idx in range(n):
+        blocks.append(
+            'LLDP neighbor-information of port {idx}[{port}]:\n'
+            '  Neighbor index   : 1\n'
+            '  Update time      : 0 days,0 hours,18 minutes,2 seconds\n'
+            '  Chassis type     : MAC address\n'
+            '  Chassis ID       : {mac}\n'
+            '  Port ID type     : Locally assigned\n'
+            '  Port ID          : {remote_port}\n'
+            '  Port description : 1/{remote_port}\n'
+            '  System name        : sw-{remote}\n'
+            '  System description : HP J9728A 2920-48G Switch, revision WB.15.15.0012\n'
+            '  System capabilities supported : Bridge,Router\n'
+            '  System capabilities enabled   : Bridge\n'
+            '\n'
+            '  Management address type           : ipv4\n'
+            '  Management address                : {ip}\n'
+            '  Management address interface type : IfIndex\n'
+            '  Management address interface ID   : Unknown\n'
+            '  Management address OID            : 0\n'
+            '\n'
+            '  Port VLAN ID(PVID): 1\n'
+            '\n'.format(idx=idx + 1, port=_port(idx), mac=_mac(idx), remote_port=idx % 48 + 1,
+                        remote=idx // 48, ip=_ip(idx)))
+    return ''.join(blocks)
+
+
+def current_configuration(n, sysname='sw-01', description_words=1):
+    """ 'display current-configuration' with n interface blocks, every
+    fourth a VLAN interface with a primary and a sub address, descriptions
+    of description_words words
+    """
+    words = ' x' * (description_words - 1)
+    lines = [
+        '#',
+        ' version 5.20.105, Release 1808P21',
+        '#',
+        ' sysname {}'.format(sysname),
+        '#',
+        ' irf mac-address persistent timer',
+        ' lldp enable',
+        '#',
+    ]
+    for idx in range(n):
+        if idx % 4 == 0:
+            lines += [
+                'interface Vlan-interface{}'.format(idx + 1),
+                ' ip address {} 255.255.255.0'.format(_ip(idx)),
+                ' ip address {} 255.255.255.0 sub'.format(_ip(idx, first=172)),
+                ' description vlan {}{}'.format(idx + 1, words),
+                '#',
+            ]
+        else:
+            lines += [
+                'interface {}'.format(_port(idx)),
+                ' port link-mode bridge',
+                ' description access port {}{}'.format(idx, words),
+                ' port access vlan {}'.format(idx % 4094 + 1),
+                ' stp edged-port enable',
+                '#',
+            ]
+    lines += ['return', '']
+    return '\n'.join(lines)
+
+
+def device_manuinfo(n):
+    """ 'display device manuinfo' of n slots with fan and power blocks """
+    blocks = []
+    for idx in range(n):
+        blocks.append(
+            'Slot {slot}:\n'
+            'DEVICE_NAME          : HP A5800-24G-SFP JC100A\n'
+            'DEVICE_SERIAL_NUMBER : CN{serial:08d}\n'
+            'MAC_ADDRESS          : {mac}\n'
+            'MANUFACTURING_DATE   : 2011-01-01\n'
+            'VENDOR_NAME          : HP\n'
+            ' Fan 1:\n'
+            ' DEVICE_NAME          : FAN\n'
+            ' Power 1:\n'
+            ' DEVICE_NAME          : PSR150\n'.format(slot=idx + 1, serial=idx, mac=_mac(idx)))
+    return ''.join(blocks)
+
+
+GENERATORS = {
+    'display version': version,
+    'display mac-address': mac_address,
+    'display interface brief': interface_brief,
+    'display arp': arp,
+    'display lldp neighbor-information': lldp_neighbor_information,
+    'display link-aggregation verbose': link_aggregation_verbose,
+    'display current-configuration': current_configuration,
+    'display device manuinfo': device_manuinfo,
+}
@@ -0,0 +1,107 @@
+"""
+Registry of compiled TextFSM templates from utils/textfsm_templates
+
+Templates are read and compiled once per process and reused by all driver
+instances. TextFSM parsers keep state while parsing, so every thread gets
+its own parser from a per template pool of compiled instances. textfsm is
+imported with the first template.
+
+    from napalm_hp_comware.utils.textfsm_registry import TEMPLATES
+
+    TEMPLATES.preload()   # compile everything before forking workers
+    TEMPLATES.parse('display_version', raw_out)
+"""
+import io
+import os
+import threading
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'textfsm_templates')
+
+
+class TextFSMRegistry(object):
+    """ Lazily compiled, thread safe pool of TextFSM parsers per template """
+
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self._sources = {}
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def template_names(self):
+        """ Return names of all templates in template_dir """
+        return sorted(f[:-len('.tpl')] for f in os.listdir(self.template_dir)
+                      if f.endswith('.tpl'))
+
+    def preload(self, template_names=None):
+        """ Read and compile templates (all of them by default) """
+        for name in template_names or self.template_names():
+            self._release(name, self._acquire(name))
+
+    def clear(self):
+        """ Forget all compiled templates """
+        with self._lock:
+            self._sources.clear()
+            self._pools.clear()
+
+    def parse(self, template_name, raw_text):
+        """ Parse raw_text with template_name and return list of dictionaries
+        with lower case keys (same as napalm textfsm_extractor)
+        """
+        fsm = self._acquire(template_name)
+        try:
+            fsm.Reset()
+            header = [h.lower() for h in fsm.header]
+            return [dict(zip(header, row)) for row in fsm.ParseText(raw_text)]
+        finally:
+            self._release(template_name, fsm)
+
+    def _acquire(self, template_name):
+        with self._lock:
+            pool = self._pools.setdefault(template_name, [])
+            if pool:
+                return pool.pop()
+            source = self._sources.get(template_name)
+        if source is None:
+            source = self._read(template_name)
+        import textfsm
+        try:
+            fsm = textfsm.TextFSM(io.StringIO(source))
+        except textfsm.TextFSMTemplateError as e:
+            from napalm.base.exceptions import TemplateRenderException
+            raise TemplateRenderException(
+                "Wrong format of TextFSM template {}: {}".format(template_name, e))
+        with self._lock:
+            self._sources[template_name] = source
+        return fsm
+
+    def _release(self, template_name, fsm):
+        with self._lock:
+            self._pools.setdefault(template_name, []).append(fsm)
+
+    def _read(self, template_name):
+        path = os.path.join(self.template_dir, template_name + '.tpl')
+        try:
+            with open(path) as f:
+                return f.read()
+        except IOError:
+            from napalm.base.exceptions import TemplateNotImplemented
+            raise TemplateNotImplemented(
+                "TextFSM template {}.tpl is not defined under {}".format(
+                    template_name, self.template_dir))
+
+    def _after_fork(self):
+        # a lock held by another thread while forking stays locked in the child
+        self._lock = threading.Lock()
+
+
+TEMPLATES = TextFSMRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=TEMPLATES._after_fork)
+
+
+def textfsm_extractor(cls, template_name, raw_text):
+    """ Drop-in replacement of napalm.base.helpers.textfsm_extractor using
+    the compiled templates of TEMPLATES
+    """
+    return TEMPLATES.parse(template_name, raw_text)
@@ -33,8 +33,8 @@
 #  PSE pairs control ability : No
 #  Power pairs               : Signal
 #  Port power classification : Class 0
-Value LOCAL_INTERFACE (.*)
-Value LOCAL_INTERFACE_IDX (\d+)
+Value Filldown LOCAL_INTERFACE (.*)
+Value Filldown LOCAL_INTERFACE_IDX (\d+)
 Value REMOTE_CHASSIS_ID (.*)
 Value REMOTE_PORT (.*)
 Value REMOTE_PORT_DESCRIPTION (.+)
@@ -32,4 +32,5 @@ setup(
     url="https://github.com/zhecho/napalm-hp-comware",
     include_package_data=True,
     install_requires=reqs,
+    extras_require={'async': ['asyncssh'], 'simulator': ['asyncssh']},
 )
@@ -0,0 +1,58 @@
+"""Netmiko connection and clock doubles."""
+
+
+class FakeChannelDevice(object):
+    """Answer commands from a dict of outputs, echoing them like Comware."""
+
+    base_prompt = 'sw-01'
+
+    def __init__(self, outputs, chunk_size=7):
+        """Start with an empty channel."""
+        self.outputs = outputs
+        self.chunk_size = chunk_size
+        self.written = []
+        self.channel = ''
+
+    def normalize_cmd(self, command):
+        """Append newline like netmiko."""
+        return command + '\n'
+
+    def clear_buffer(self):
+        """Drop pending channel data."""
+        self.channel = ''
+
+    def write_channel(self, data):
+        """Answer every written command in order."""
+        for command in data.splitlines():
+            self.written.append(command)
+            output = self.outputs[command].replace('\n', '\r\n')
+            self.channel += '{}\r\n{}\r\n<{}>'.format(command, output, self.base_prompt)
+
+    def read_channel(self):
+        """Return the channel in small chunks."""
+        data = self.channel[:self.chunk_size]
+        self.channel = self.channel[self.chunk_size:]
+        return data
+
+    def send_command_timing(self, command, **kwargs):
+        """Answer one command."""
+        self.written.append(command)
+        if command == 'screen-length disable':
+            return '% Screen-length configuration is disabled for current user.'
+        return self.outputs[command]
+
+    def send_command(self, command, **kwargs):
+        """Answer one command (read_mode 'prompt')."""
+        return self.send_command_timing(command, **kwargs)
+
+
+class FakeClock(object):
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return current time."""
+        return self.now
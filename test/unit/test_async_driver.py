@@ -0,0 +1,140 @@
+"""Tests for the asyncio driver against an in-process SSH server."""
+
+import asyncio
+import os
+
+import pytest
+
+asyncssh = pytest.importorskip('asyncssh')
+
+from napalm.base.exceptions import ConnectionClosedException  # noqa: E402
+
+from napalm_hp_comware import HpComwareDriver  # noqa: E402
+from napalm_hp_comware.hp_comware_async import AsyncHpComwareDriver  # noqa: E402
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+
+def _mock(name):
+    with open(os.path.join(MOCK_DATA, name)) as f:
+        return f.read().strip('\n')
+
+
+OUTPUTS = {
+    'screen-length disable': 'Info: The configuration is disabled for current user.',
+    'display version': _mock('display_version.txt'),
+    'display users': _mock('display_users.txt'),
+    'display interface brief': _mock('display_interface_brief.txt'),
+    'display mac-address': _mock('display_mac_address.txt'),
+    'display arp': _mock('display_arp.txt'),
+    'display lldp neighbor-information': _mock('display_lldp_neighbor-information.txt'),
+}
+
+
+class _Server(asyncssh.SSHServer):
+    """Accept user/secret only."""
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return (username, password) == ('user', 'secret')
+
+
+async def _comware_cli(process):
+    """Echo commands and answer them from OUTPUTS like a Comware switch."""
+    process.stdout.write('\r\n******\r\n<sw-01>')
+    while True:
+        line = await process.stdin.readline()
+        command = line.strip()
+        if not line or command == 'quit':
+            break
+        output = OUTPUTS.get(command, ' ^\n % Unrecognized command found at \'^\' position.')
+        process.stdout.write('{}\r\n{}\r\n<sw-01>'.format(command, output.replace('\n', '\r\n')))
+    process.exit(0)
+
+
+def _run(coroutine_function, sessions=1, **optional_args):
+    """Run coroutine_function(driver) on sessions drivers against a fresh server."""
+    async def session(port):
+        async with AsyncHpComwareDriver('127.0.0.1', 'user', 'secret', timeout=10,
+                                        optional_args=dict(optional_args, port=port)) as driver:
+            return await coroutine_function(driver)
+
+    async def main():
+        server = await asyncssh.create_server(
+                _Server, '127.0.0.1', 0, line_editor=False, process_factory=_comware_cli,
+                server_host_keys=[asyncssh.generate_private_key('ssh-ed25519')])
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(*(session(port) for _ in range(sessions)))
+        finally:
+            server.close()
+            await server.wait_closed()
+    results = asyncio.run(main())
+    return results if sessions > 1 else results[0]
+
+
+def _sync_driver():
+    """Driver used to compute the expected results from the same outputs."""
+    return HpComwareDriver('sw-01', 'user', 'secret')
+
+
+def test_cli_and_base_prompt():
+    async def run(driver):
+        assert driver.device.base_prompt == 'sw-01'
+        return await driver.cli(['display version'])
+    assert _run(run) == {'display version': OUTPUTS['display version']}
+
+
+def test_getters_match_sync_parsing():
+    async def run(driver):
+        return (await driver.get_interfaces(), await driver.get_mac_address_table(),
+                await driver.get_arp_table(), await driver.get_lldp_neighbors())
+    interfaces, mac_table, arp_table, lldp = _run(run)
+    sync = _sync_driver()
+    assert interfaces == sync._interfaces_from_output(OUTPUTS['display interface brief'])
+    assert mac_table == sync._mac_table_from_output(OUTPUTS['display mac-address'])
+    assert arp_table == sync._arp_table_from_output(OUTPUTS['display arp'])
+    assert lldp == sync._lldp_neighbors_from_output(OUTPUTS['display lldp neighbor-information'])
+    assert mac_table and lldp
+
+
+def test_read_only_commands_are_cached():
+    async def run(driver):
+        first = await driver.get_arp_table()
+        assert await driver.get_arp_table() == first
+        return list(driver.command_cache._entries)
+    assert _run(run, command_cache=True) == ['display arp']
+
+
+def test_concurrent_sessions():
+    async def run(driver):
+        return (await driver.get_version())['os_version']
+    versions = _run(run, sessions=5)
+    assert len(versions) == 5 and len(set(versions)) == 1
+
+
+@pytest.mark.parametrize('optional_args', [
+    {'proxy_host': 'bastion', 'proxy_port': 22, 'proxy_username': 'user'},
+    {'connection_pool': object()},
+    {'read_mode': 'prompt'},
+    {'replay': 'session.jsonl'},
+])
+def test_netmiko_session_args_are_rejected(optional_args):
+    with pytest.raises(ValueError, match=next(iter(optional_args))):
+        AsyncHpComwareDriver('sw-01', 'user', 'secret', optional_args=optional_args)
+
+
+def test_closed_driver_fails_cleanly():
+    async def run(driver):
+        await driver.close()
+        assert driver.device is None
+        await driver.close()
+        with pytest.raises(ConnectionClosedException):
+            await driver.get_arp_table()
+        return True
+    assert _run(run)
@@ -0,0 +1,39 @@
+"""Tests for HpComwareDriver.cli()."""
+
+import pytest
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+
+
+OUTPUTS = {
+    'display clock': '11:20:16 CET Mon 03/25/2019',
+    'display version': 'Comware Software, Version 5.20.105, Release 1808P21',
+    'display foo': '            ^\n % Unrecognized command found at \'^\' position.\n'
+                   'Invalid input: display foo',
+}
+
+
+@pytest.fixture
+def driver():
+    """Driver with the fake device."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass',
+                             optional_args={'cli_pipeline_window': 2})
+    driver.device = FakeChannelDevice(OUTPUTS)
+    return driver
+
+
+def test_pipelined_cli_matches_sequential(driver):
+    """Pipelined outputs are split per command."""
+    commands = ['display clock', 'display version', 'display clock']
+    pipelined = driver.cli(commands)
+    sequential = driver.cli(commands, pipeline_window=0)
+    assert pipelined == sequential
+    assert pipelined['display clock'] == OUTPUTS['display clock']
+
+
+def test_pipelined_cli_detects_invalid_input(driver):
+    """Invalid input is detected per command."""
+    with pytest.raises(ValueError, match='display foo'):
+        driver.cli(['display clock', 'display foo', 'display version'])
@@ -0,0 +1,121 @@
+"""Tests for the command output cache."""
+
+import os
+
+import pytest
+
+from fake_device import FakeChannelDevice, FakeClock
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils.command_cache import (
+    CommandCache,
+    changes_config,
+    is_read_only,
+)
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+with open(os.path.join(MOCK_DATA, 'display_users.txt')) as f:
+    USERS = f.read()
+
+
+class SuperFakeDevice(FakeChannelDevice):
+    """Fake Comware v5 session raised to level 3 by 'super'."""
+
+    password = 'pass'
+    secret = 'secret'
+
+    def send_command_expect(self, command, **kwargs):
+        """Answer 'super' with the password prompt."""
+        self.written.append(command)
+        self.outputs['display users'] = USERS.replace('SSH  1', 'SSH  3')
+        return 'Password:'
+
+    def send_command_timing(self, command, **kwargs):
+        """Accept the level 3 password."""
+        if command == self.secret:
+            self.written.append('<secret>')
+            return ''
+        return super(SuperFakeDevice, self).send_command_timing(command, **kwargs)
+
+
+@pytest.fixture
+def driver():
+    """Driver with the command cache on a fake v5 device at level 1."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args={'command_cache': True})
+    driver.device = SuperFakeDevice({
+        'display clock': '11:20:16 CET Mon 03/25/2019',
+        'display users': USERS,
+        'undo lldp global enable': '',
+    })
+    driver.session.os_version = '5.20.105'
+    return driver
+
+
+def test_read_only_commands():
+    """Only display commands and their abbreviations are read only."""
+    assert is_read_only('display version')
+    assert is_read_only('dis cur')
+    assert not is_read_only('di version')
+    assert not is_read_only('system-view')
+    assert not changes_config('screen-length disable')
+    assert changes_config('undo shutdown')
+
+
+def test_ttl_expiry_and_prefix_ttls():
+    """Entries expire after default, exact or longest prefix TTL."""
+    clock = FakeClock()
+    cache = CommandCache(ttl=10, ttls={'display mac': 1, 'display mac-address': 2},
+                         clock=clock)
+    cache.set('display version', 'v')
+    cache.set('display mac-address', 'm')
+    assert cache.ttl_for('display mac-address 0000-1111-2222') == 2
+    clock.now = 5
+    assert cache.get('display version') == 'v'
+    assert cache.get('display mac-address') is None
+    clock.now = 11
+    assert 'display version' not in cache
+
+
+def test_lru_eviction_and_invalidation():
+    """Least recently used entry is evicted first."""
+    cache = CommandCache(maxsize=2)
+    cache.set('display a', 'a')
+    cache.set('display b', 'b')
+    cache.get('display a')
+    cache.set('display c', 'c')
+    assert cache.get('display b') is None
+    assert len(cache) == 2
+    cache.invalidate('display a')
+    assert cache.get('display a') is None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_repeated_display_is_not_sent_again(driver):
+    """Cached outputs are served without a round trip, also through cli()."""
+    assert len(driver.command_cache) == 0
+    first = driver._send_command('display clock')
+    assert driver._send_command('display clock') == first
+    assert driver.cli(['display clock', 'display clock']) == {'display clock': first}
+    assert driver.device.written.count('display clock') == 1
+    assert driver.metrics.as_dict()['commands']['display clock']['cached'] == 3
+
+
+def test_config_change_flushes_cache(driver):
+    """A command which may change the config drops every cached output."""
+    driver.cli(['display clock'])
+    driver.cli(['undo lldp global enable'])
+    assert len(driver.command_cache) == 0
+    driver._send_command('display clock')
+    assert driver.device.written.count('display clock') == 2
+
+
+def test_privilege_escalation_flushes_cache(driver):
+    """Outputs read at the old user level are not served after 'super'."""
+    driver._send_command('display clock')
+    assert driver.get_current_privilege() == '1'
+    driver.privilege_escalation()
+    assert driver.current_user_level == '3'
+    driver._send_command('display clock')
+    assert driver.device.written.count('display clock') == 2
+    assert driver.device.written.count('display users') == 2
@@ -0,0 +1,172 @@
+"""Tests for the SSH connection pool."""
+
+import os
+import threading
+
+import pytest
+
+from fake_device import FakeChannelDevice, FakeClock
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.connection_pool import ConnectionPool, HpConnectionPoolTimeout
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+with open(os.path.join(MOCK_DATA, 'display_users.txt')) as f:
+    USERS = f.read().replace('SSH  1', 'SSH  3')
+
+OUTPUTS = {
+    'display users': USERS,
+    'display clock': '11:20:16 CET Mon 03/25/2019',
+    'display mac-address': 'MAC ADDR       VLAN ID  STATE          PORT INDEX  AGING TIME(s)\n'
+                           '2c41-3888-0001 1        Learned        BAGG30      AGING',
+}
+
+
+class PooledFakeDevice(FakeChannelDevice):
+    """Fake connection which can die."""
+
+    def __init__(self, outputs):
+        """Start alive."""
+        super(PooledFakeDevice, self).__init__(outputs)
+        self.alive = True
+        self.disconnected = False
+
+    def is_alive(self):
+        """Netmiko health check."""
+        return self.alive
+
+    def disconnect(self):
+        """Close the fake session."""
+        self.disconnected = True
+
+    def send_command_timing(self, command, **kwargs):
+        """Fail like a dropped SSH session once dead."""
+        if not self.alive:
+            raise EOFError('session dropped')
+        return super(PooledFakeDevice, self).send_command_timing(command, **kwargs)
+
+    def write_channel(self, data):
+        """Fail like a dropped SSH session once dead."""
+        if not self.alive:
+            raise EOFError('session dropped')
+        return super(PooledFakeDevice, self).write_channel(data)
+
+
+class PoolDriver(HpComwareDriver):
+    """Driver connecting fake devices and counting handshakes."""
+
+    def __init__(self, connects, *args, **kwargs):
+        """Append every connected device to connects."""
+        super(PoolDriver, self).__init__(*args, **kwargs)
+        self.connects = connects
+
+    def _connect(self):
+        device = PooledFakeDevice(OUTPUTS)
+        self.connects.append(device)
+        return device
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def connects():
+    """Devices connected by the drivers of one test."""
+    return []
+
+
+@pytest.fixture
+def make_driver(connects):
+    """Return a factory of pooled drivers sharing connects."""
+    def _driver(pool, password='pass', **optional_args):
+        optional_args['connection_pool'] = pool
+        return PoolDriver(connects, 'sw-01', 'user', password, optional_args=optional_args)
+    return _driver
+
+
+def test_sessions_are_reused_prepared(clock, connects, make_driver):
+    """Second open() skips the handshake and the session preparation."""
+    pool = ConnectionPool(clock=clock)
+    for _ in range(3):
+        driver = make_driver(pool)
+        driver.open()
+        assert driver.cli(['display clock'])['display clock'] == OUTPUTS['display clock']
+        driver.close()
+    assert len(connects) == 1
+    written = connects[0].written
+    assert written.count('screen-length disable') == 1
+    assert written.count('display users') == 1
+    assert len(pool.stats()) == 1
+
+
+def test_keys_separate_credentials(clock, connects, make_driver):
+    """Different passwords never share a session."""
+    pool = ConnectionPool(clock=clock)
+    for password in ('a', 'b'):
+        driver = make_driver(pool, password=password)
+        driver.open()
+        driver.close()
+    assert len(connects) == 2
+
+
+def test_max_sessions_per_device(clock, connects, make_driver):
+    """Borrowers wait for a free VTY slot."""
+    pool = ConnectionPool(max_sessions_per_device=1, acquire_timeout=0, clock=clock)
+    first = make_driver(pool)
+    first.open()
+    with pytest.raises(HpConnectionPoolTimeout):
+        make_driver(pool).open()
+    pool.acquire_timeout = 5
+    waiter = make_driver(pool)
+    thread = threading.Thread(target=waiter.open)
+    thread.start()
+    first.close()
+    thread.join(5)
+    assert waiter.device is connects[0]
+    assert len(connects) == 1
+
+
+def test_idle_eviction_and_health_check(clock, connects, make_driver):
+    """Expired sessions are closed, dead ones replaced."""
+    pool = ConnectionPool(idle_timeout=300, health_check_interval=30, clock=clock)
+    driver = make_driver(pool)
+    driver.open()
+    driver.close()
+    clock.now = 301
+    pool.maintain()
+    assert connects[0].disconnected
+    assert pool.stats() == {}
+
+    driver.open()
+    driver.close()
+    connects[1].alive = False
+    clock.now = 400
+    driver.open()
+    assert driver.device is connects[2]
+    assert connects[1].disconnected
+
+
+def test_transparent_reconnect(clock, connects, make_driver):
+    """A session dropped mid use is replaced and the command retried."""
+    pool = ConnectionPool(clock=clock)
+    driver = make_driver(pool)
+    driver.open()
+    connects[0].alive = False
+    assert driver.cli(['display clock'])['display clock'] == OUTPUTS['display clock']
+    assert driver.device is connects[1]
+    assert driver.session.paging_disabled
+    driver.close()
+    assert pool.stats()[next(iter(pool.stats()))] == {'idle': 1, 'borrowed': 0}
+
+
+def test_streamed_read_reconnects(clock, connects, make_driver):
+    """A session dropped before a streamed output is replaced too."""
+    pool = ConnectionPool(clock=clock)
+    driver = make_driver(pool, read_mode='prompt')
+    driver.open()
+    connects[0].alive = False
+    entries = driver.get_mac_address_table()
+    assert [e['interface'] for e in entries] == ['Bridge-Aggregation 30']
+    assert driver.device is connects[1]
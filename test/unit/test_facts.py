@@ -0,0 +1,57 @@
+"""Tests for HpComwareDriver.get_facts_fast()."""
+
+import os
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils import synthetic
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+
+def _facts_driver(manuinfo):
+    """Driver with outputs of get_facts_fast()."""
+    outputs = {}
+    for command, filename in (('display version', 'display_version.txt'),
+                              ('display interface brief', 'display_interface_brief.txt'),
+                              ('display users', 'display_users.txt')):
+        with open(os.path.join(MOCK_DATA, filename)) as f:
+            outputs[command] = f.read()
+    outputs['display users'] = outputs['display users'].replace('SSH  1', 'SSH  3')
+    outputs['display device manuinfo'] = manuinfo or synthetic.device_manuinfo(2)
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args={'fast_facts': True})
+    driver.device = FakeChannelDevice(outputs)
+    return driver
+
+
+def test_fast_facts_one_batch_without_escalation():
+    """Three reads go out in one batch, no 'display users' is needed."""
+    driver = _facts_driver(None)
+    facts = driver.get_facts()
+    assert facts['os_version'] == '5.20.105'
+    assert facts['hostname'] == ('sw-01',)
+    assert facts['fqdn'] == ('sw-01',)
+    assert facts['serial_number'] in (('CN00000000,CN00000001',), ('CN00000001,CN00000000',))
+    assert len(facts['interface_list']) > 100
+    assert driver.device.written == [
+        'screen-length disable',
+        'display version', 'display interface brief', 'display device manuinfo']
+
+
+def test_fast_facts_escalates_when_manuinfo_rejected():
+    """Rejected manuinfo is sent again after the privilege check."""
+    driver = _facts_driver(" ^\n % Unrecognized command found at '^' position.")
+    driver.get_facts()
+    assert driver.device.written[-2:] == ['display users', 'display device manuinfo']
+
+
+def test_fast_facts_keep_running_config():
+    """The hostname of the prompt does not replace the parsed running config."""
+    driver = _facts_driver(None)
+    driver.device.outputs['display current-configuration'] = (
+            ' sysname core-01\n#\ninterface GigabitEthernet1/0/1\n#\n')
+    config = driver.get_running_config()
+    driver.get_facts()
+    assert driver.get_running_config() is config
+    assert config.sysname == 'core-01'
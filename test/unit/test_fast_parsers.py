@@ -0,0 +1,155 @@
+"""Equivalence tests of the native parsers and the TextFSM templates."""
+
+import os
+
+import pytest
+
+from napalm_hp_comware.utils import synthetic
+from napalm_hp_comware.utils.fast_parsers import (
+    MANUINFO_RE,
+    NATIVE_PARSERS,
+    parse_arp,
+    parse_arp_regex,
+    parse_device_manuinfo,
+    parse_interface_brief,
+    parse_link_aggregation_verbose,
+    parse_mac_address,
+)
+from napalm_hp_comware.utils.textfsm_registry import TEMPLATES
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+EDGE_CASES = [
+    '',
+    'No mac address found.\n',
+    'MAC ADDR       VLAN ID  STATE          PORT INDEX               AGING TIME(s)\n'
+    '2c41-3888-ffff 1        Learned        BAGG30     AGING\n'
+    '2c41-3888-fffe x        Learned        BAGG30     AGING\n'
+    ' 2c41-3888-fffd 1       Learned        BAGG30     AGING\n'
+    '2c41-3888-fffc 1        Learned        BAGG30\n'
+    '2c41-3888-fffb 4094     Config static  BAGG30     NOAGED  extra\n',
+    'MAC Address    VLAN ID    State            Port/NickName            Aging\n'
+    '0000-5e00-0101 10         Learned          XGE1/0/27                Y\r\n',
+    'Interface            Link Protocol Main IP         Description\n'
+    'Vlan1                UP   UP       10.107.4.1      Ma\n'
+    'Vlan2                UP   UP       10.107.4.2\n'
+    'Vlan3                UP   UP       10.107.4.3      \n'
+    'Vlan4                UP   UP(s)    --              x\n'
+    'Interface            Link Speed   Duplex Type PVID Description\n'
+    'GE1/0/1              UP   1G(a)   F(a)   T    1    with  two  spaces  \n'
+    'GE1/0/2              UP   1G      F      T    1    fixed speed\n'
+    'GE1/0/3              ADM  auto    A      A    1\n'
+    'GE1/0/4              Stby 10      A      H    4094 \n',
+    'Interface            Link Speed   Duplex Type PVID Description\n'
+    'Interface            Link Protocol Main IP         Description\n'
+    'Vlan1                UP   UP       10.107.4.1      Ma\n',
+]
+
+
+def read_fixture(filename):
+    """Return content of a mock_data file."""
+    with open(os.path.join(MOCK_DATA, filename)) as f:
+        return f.read()
+
+
+# fixture: templates whose native parser has to recognise it
+FIXTURES = {
+    'display_mac_address.txt': ('display_mac_address', 'display_mac_address_all'),
+    'display_interface_brief.txt': ('display_interface_brief',),
+    'display_lldp_neighbor-information.txt': ('display_lldp_neighbor_information_interface',),
+    'display_lldp_neighbor-information_interface.txt': (
+        'display_lldp_neighbor_information_interface',),
+    'display_lldp_neighbor-information_v7_verbose.txt': (
+        'display_lldp_neighbor_information_interface',),
+}
+
+
+@pytest.mark.parametrize('template_name', sorted(NATIVE_PARSERS))
+@pytest.mark.parametrize('filename', sorted(FIXTURES))
+def test_native_parser_equals_template(template_name, filename):
+    """Native parser returns the template records of its fixtures."""
+    raw_text = read_fixture(filename)
+    entries = NATIVE_PARSERS[template_name](raw_text)
+    if template_name in FIXTURES[filename]:
+        assert entries
+        assert entries == TEMPLATES.parse(template_name, raw_text)
+    elif entries is not None:
+        assert entries == TEMPLATES.parse(template_name, raw_text)
+
+
+@pytest.mark.parametrize('template_name', sorted(NATIVE_PARSERS))
+@pytest.mark.parametrize('raw_text', EDGE_CASES)
+def test_native_parser_edge_cases(template_name, raw_text):
+    """Native parser returns the template records or gives up."""
+    entries = NATIVE_PARSERS[template_name](raw_text)
+    if entries is not None:
+        assert entries == TEMPLATES.parse(template_name, raw_text)
+
+
+def test_lldp_parser_v7_neighbours_of_one_port():
+    """'LLDP neighbor index' of v7 starts the next neighbour of the port."""
+    entries = NATIVE_PARSERS['display_lldp_neighbor_information_interface'](
+            read_fixture('display_lldp_neighbor-information_v7_verbose.txt'))
+    assert [(e['local_interface'], e['remote_system_name']) for e in entries] == [
+        ('GigabitEthernet1/0/1', 'core-01'), ('GigabitEthernet1/0/1', 'ap-17'),
+        ('Ten-GigabitEthernet1/0/50', 'core-02')]
+
+
+def test_native_parsers_recognise_fixtures():
+    """Fixtures are parsed natively, foreign output falls back."""
+    assert len(parse_mac_address(read_fixture('display_mac_address.txt'))) == 5
+    assert len(parse_interface_brief(read_fixture('display_interface_brief.txt'))) == 206
+    assert parse_interface_brief(read_fixture('display_mac_address.txt')) is None
+    assert parse_mac_address('2c41-3888-ffff 1 Learned BAGG30 AGING\n') is None
+
+
+def test_arp_parser_equals_regex():
+    """Native ARP parser returns the records of the original regex."""
+    raw_text = read_fixture('display_arp.txt')
+    entries = parse_arp(raw_text)
+    assert entries == parse_arp_regex(raw_text)
+    assert [e['interface'] for e in entries] == ['BAGG5', 'GE1/0/3', 'XGE1/0/27', 'GE2/0/14']
+
+
+def test_manuinfo_parser_equals_regex():
+    """Line oriented parser returns what the replaced regex found."""
+    manuinfo = synthetic.device_manuinfo(9)
+    assert parse_device_manuinfo(manuinfo) == MANUINFO_RE.findall(manuinfo)
+    assert len(parse_device_manuinfo(manuinfo)) == 9
+
+
+def test_lldp_parser_on_synthetic_dump():
+    """One record per neighbour of a 9 member stack."""
+    entries = NATIVE_PARSERS['display_lldp_neighbor_information_interface'](
+            synthetic.lldp_neighbor_information(432))
+    assert len(entries) == 432
+    assert entries[-1]['local_interface'] == 'GigabitEthernet9/0/48'
+    assert entries[-1]['remote_system_name'] == 'sw-8'
+
+
+@pytest.mark.parametrize('template_name, generator', [
+    ('display_mac_address_all', synthetic.mac_address),
+    ('display_interface_brief', synthetic.interface_brief),
+])
+def test_synthetic_outputs_equal_template(template_name, generator):
+    """Synthetic outputs are parsed natively into the template records."""
+    raw_text = generator(500)
+    entries = NATIVE_PARSERS[template_name](raw_text)
+    assert entries == TEMPLATES.parse(template_name, raw_text)
+    # plus Vlan1 of the route mode part
+    assert len(entries) == 500 + (template_name == 'display_interface_brief')
+
+
+def test_synthetic_generator_sizes():
+    """Every generator returns about n records, with unique port names."""
+    assert parse_arp(synthetic.arp(1000)) == parse_arp_regex(synthetic.arp(1000))
+    assert len(parse_arp(synthetic.arp(1000))) == 1000
+    aggregations = parse_link_aggregation_verbose(synthetic.link_aggregation_verbose(101))
+    assert len(aggregations) == 51
+    assert sum(len(ports) for ports in aggregations.values()) == 101
+    names = [e['interface'] for e in parse_interface_brief(synthetic.interface_brief(2000))]
+    assert len(set(names)) == 2001
+    assert set(synthetic.GENERATORS) >= {
+        'display mac-address', 'display interface brief', 'display arp',
+        'display lldp neighbor-information', 'display link-aggregation verbose',
+        'display current-configuration'}
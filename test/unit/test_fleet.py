@@ -0,0 +1,95 @@
+"""Tests for the fleet executor."""
+
+import threading
+import time
+
+import pytest
+
+from napalm_hp_comware.fleet import FleetExecutor, HpFleetTimeout
+
+
+class SiteTracker(object):
+    """Concurrency per site and open/close threads of the fake drivers."""
+
+    def __init__(self):
+        """Nothing running."""
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+        self.events = []
+
+    def factory(self, device):
+        """driver_factory of the executor."""
+        return FakeDriver(device, self)
+
+
+class FakeDriver(object):
+    """Driver double recording concurrency per site."""
+
+    def __init__(self, device, tracker):
+        """Keep the inventory entry."""
+        self.device = device
+        self.tracker = tracker
+
+    def open(self):
+        """Fail for unreachable devices."""
+        if self.device.get('unreachable'):
+            raise IOError('unreachable')
+        site = self.device['site']
+        with self.tracker.lock:
+            self.tracker.running[site] = self.tracker.running.get(site, 0) + 1
+            self.tracker.max_running[site] = max(
+                    self.tracker.max_running.get(site, 0), self.tracker.running[site])
+            self.tracker.events.append(('open', self.device['hostname'], threading.get_ident()))
+
+    def close(self):
+        """Leave the site."""
+        with self.tracker.lock:
+            self.tracker.running[self.device['site']] -= 1
+            self.tracker.events.append(('close', self.device['hostname'], threading.get_ident()))
+
+    def get_facts(self):
+        """Return hostname after a short delay."""
+        time.sleep(self.device.get('delay', 0.01))
+        return {'hostname': self.device['hostname']}
+
+    def get_broken(self):
+        """Fail."""
+        raise ValueError('broken')
+
+
+@pytest.fixture
+def tracker():
+    return SiteTracker()
+
+
+def test_run_yields_all_devices_with_limits_and_errors(tracker):
+    """Site caps hold, errors and timeouts are reported per device."""
+    inventory = [{'hostname': f'sw-{i}', 'site': 'dc1' if i % 2 else 'dc2'} for i in range(10)]
+    inventory.append({'hostname': 'down', 'site': 'dc1', 'unreachable': True})
+    inventory.append({'hostname': 'slow', 'site': 'dc2', 'delay': 1})
+    executor = FleetExecutor(max_workers=6, timeout=0.3, site_limits={'dc1': 2},
+                             driver_factory=tracker.factory, poll_interval=0.01)
+    results = dict((r['hostname'], r) for r in executor.run(inventory, ['get_facts', 'get_broken']))
+    assert len(results) == 12
+    assert results['sw-3']['results'] == {'get_facts': {'hostname': 'sw-3'}}
+    assert isinstance(results['sw-3']['errors']['get_broken'], ValueError)
+    assert isinstance(results['down']['errors']['open'], IOError)
+    assert isinstance(results['slow']['errors']['timeout'], HpFleetTimeout)
+    assert tracker.max_running['dc1'] <= 2
+
+
+def test_timed_out_device_keeps_its_site_slot(tracker):
+    """The next device of the site starts once the slow worker closed its session."""
+    inventory = [{'hostname': 'slow', 'site': 'dc1', 'delay': 0.5},
+                 {'hostname': 'next', 'site': 'dc1'}]
+    executor = FleetExecutor(max_workers=4, timeout=0.1, site_limits={'dc1': 1},
+                             driver_factory=tracker.factory, poll_interval=0.01)
+    results = list(executor.run(inventory, ['get_facts', 'get_broken']))
+    assert [r['hostname'] for r in results] == ['slow', 'next']
+    assert list(results[0]['errors']) == ['timeout']
+    assert tracker.max_running['dc1'] == 1
+    assert [event[:2] for event in tracker.events] == [
+        ('open', 'slow'), ('close', 'slow'), ('open', 'next'), ('close', 'next')]
+    # the slow session was closed by its own worker, after get_facts only
+    assert tracker.events[0][2] == tracker.events[1][2]
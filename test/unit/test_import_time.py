@@ -0,0 +1,83 @@
+"""Import time budget of the package."""
+
+import json
+import os
+import subprocess
+import sys
+
+import napalm_hp_comware
+
+# milliseconds, measured with compiled bytecode plus a margin: package,
+# connection pool and parsing utils 15 ms (mostly logging and hashlib),
+# driver module on top of napalm.base.base 6 ms.
+# napalm.base.base itself (which loads netmiko, paramiko and textfsm, about
+# 480 ms) is not budgeted: HpComwareDriver subclasses its NetworkDriver.
+PACKAGE_BUDGET_MS = 25
+DRIVER_BUDGET_MS = 10
+
+HEAVY_MODULES = ('napalm', 'netmiko', 'paramiko', 'textfsm', 'asyncssh')
+
+MEASURE_PACKAGE = '''
+import json, sys, time
+start = time.perf_counter()
+import napalm_hp_comware
+import napalm_hp_comware.connection_pool
+import napalm_hp_comware.utils.fast_parsers
+import napalm_hp_comware.utils.metrics
+import napalm_hp_comware.utils.running_config
+import napalm_hp_comware.utils.textfsm_registry
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed * 1000, [m for m in {heavy!r} if m in sys.modules]]))
+'''.format(heavy=HEAVY_MODULES)
+
+MEASURE_DRIVER = '''
+import json, sys, time
+import napalm.base.base
+loaded = set(sys.modules)
+start = time.perf_counter()
+import napalm_hp_comware.hp_comware
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed * 1000, sorted(m for m in set(sys.modules) - loaded
+                                         if not m.startswith('napalm_hp_comware'))]))
+'''
+
+
+def _measure(script):
+    """Return best of 3 [milliseconds, modules loaded] of script run in
+    fresh interpreters."""
+    root = os.path.dirname(os.path.dirname(napalm_hp_comware.__file__))
+    env = dict(os.environ, PYTHONPATH=root)
+    # the first run writes the bytecode the budget assumes
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    runs = [json.loads(subprocess.check_output([sys.executable, '-c', script], env=env))
+            for _ in range(3)]
+    return min(runs)
+
+
+def test_package_import_is_lazy():
+    """Package and utils load no heavy dependency."""
+    elapsed, heavy = _measure(MEASURE_PACKAGE)
+    assert heavy == []
+    assert elapsed < PACKAGE_BUDGET_MS, 'package import took {:.1f} ms'.format(elapsed)
+
+
+def test_driver_import_adds_nothing_to_napalm():
+    """Driver module loads no module napalm.base.base has not loaded."""
+    elapsed, loaded = _measure(MEASURE_DRIVER)
+    assert loaded == []
+    assert elapsed < DRIVER_BUDGET_MS, 'driver import took {:.1f} ms'.format(elapsed)
+
+
+def test_netmiko_is_imported_on_connect():
+    """The driver module has no module level netmiko import."""
+    from napalm_hp_comware import hp_comware
+    assert not hasattr(hp_comware, 'ConnectHandler')
+    assert not hasattr(hp_comware, 'netmiko_version')
+
+
+def test_driver_is_found_by_napalm():
+    """Lazy attribute is visible to napalm.get_network_driver()."""
+    from napalm import get_network_driver
+    from napalm_hp_comware.hp_comware import HpComwareDriver
+    assert 'HpComwareDriver' in dir(napalm_hp_comware)
+    assert get_network_driver('hp_comware') is HpComwareDriver
@@ -0,0 +1,125 @@
+"""Tests for the shared jump host transport."""
+
+import asyncio
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+asyncssh = pytest.importorskip('asyncssh')
+
+from napalm_hp_comware import HpComwareDriver  # noqa: E402
+from napalm_hp_comware.jump_host import JumpHost  # noqa: E402
+
+
+class _Bastion(asyncssh.SSHServer):
+    """Password only bastion allowing direct-tcpip, counting logins."""
+
+    logins = 0
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        if (username, password) == ('jump', 'secret'):
+            _Bastion.logins += 1
+            return True
+        return False
+
+    def connection_requested(self, dest_host, dest_port, orig_host, orig_port):
+        return True
+
+
+class _Echo(socketserver.BaseRequestHandler):
+    """Stand-in for a switch SSH port."""
+
+    def handle(self):
+        data = self.request.recv(1024)
+        self.request.sendall(data.upper())
+
+
+@pytest.fixture(scope='module')
+def bastion():
+    """Run bastion (asyncssh) and echo server in background threads."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def start():
+        return await asyncssh.create_server(
+                _Bastion, '127.0.0.1', 0,
+                server_host_keys=[asyncssh.generate_private_key('ssh-ed25519')])
+    server = asyncio.run_coroutine_threadsafe(start(), loop).result(10)
+    echo = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _Echo)
+    echo.daemon_threads = True
+    threading.Thread(target=echo.serve_forever, daemon=True).start()
+    yield server.sockets[0].getsockname()[1], echo.server_address[1]
+    echo.shutdown()
+    server.close()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def _roundtrip(jump_host, port, text):
+    channel = jump_host.open_channel('127.0.0.1', port)
+    try:
+        channel.sendall(text.encode())
+        return channel.recv(1024).decode()
+    finally:
+        channel.close()
+
+
+def test_channels_share_one_password_login(bastion):
+    """Many threads open channels over one bastion login."""
+    bastion_port, echo_port = bastion
+    _Bastion.logins = 0
+    jump_host = JumpHost('127.0.0.1', port=bastion_port, username='jump', password='secret',
+                         allow_agent=False, look_for_keys=False, timeout=10)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            answers = list(pool.map(
+                    lambda i: _roundtrip(jump_host, echo_port, f'sw-{i}'), range(16)))
+        assert answers == [f'SW-{i}' for i in range(16)]
+        assert _Bastion.logins == 1
+
+        # lost transport is reconnected on the next channel
+        jump_host._client.get_transport().close()
+        assert _roundtrip(jump_host, echo_port, 'again') == 'AGAIN'
+        assert _Bastion.logins == 2
+    finally:
+        jump_host.close()
+
+
+def test_drivers_share_jump_host():
+    """Native proxy mode shares one JumpHost and writes no ssh config file."""
+    args = {'proxy_host': 'bastion', 'proxy_port': 22, 'proxy_username': 'jump',
+            'proxy_password': 'secret'}
+    first = HpComwareDriver('sw-01', 'user', 'pass', optional_args=args)
+    second = HpComwareDriver('sw-02', 'user', 'pass', optional_args=args)
+    try:
+        assert first.jump_host is second.jump_host
+        assert first.ssh_proxy_file is None
+        assert 'ssh_config_file' not in first.netmiko_optional_args
+    finally:
+        JumpHost.close_all()
+    with pytest.raises(ValueError):
+        HpComwareDriver('sw-01', 'user', 'pass', optional_args=dict(args, proxy_mode='nc'))
+
+
+def test_unreachable_target_raises(bastion):
+    """Refused forwarding surfaces as an exception, the transport survives."""
+    bastion_port, echo_port = bastion
+    jump_host = JumpHost('127.0.0.1', port=bastion_port, username='jump', password='secret',
+                         allow_agent=False, look_for_keys=False, timeout=10)
+    with socket.socket() as closed:
+        closed.bind(('127.0.0.1', 0))
+        closed_port = closed.getsockname()[1]
+    try:
+        with pytest.raises(Exception):
+            jump_host.open_channel('127.0.0.1', closed_port)
+        assert jump_host.is_active
+    finally:
+        jump_host.close()
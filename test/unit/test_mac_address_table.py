@@ -0,0 +1,95 @@
+"""Tests for the MAC address table getters."""
+
+import os
+import time
+
+import pytest
+from napalm.base.exceptions import CommandErrorException
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+
+with open(os.path.join(MOCK_DATA, 'display_mac_address.txt')) as f:
+    MAC_TABLE = f.read()
+
+
+def make_driver(mac_table=MAC_TABLE, **optional_args):
+    """Driver answering 'display mac-address' from mock data."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args=optional_args)
+    driver.device = FakeChannelDevice({'display mac-address': mac_table})
+    return driver
+
+
+@pytest.mark.parametrize('read_mode', ['prompt', 'timing'])
+def test_native_table_equals_textfsm_table(read_mode):
+    """Native getter, streamed or not, returns the TextFSM entries."""
+    native = make_driver(read_mode=read_mode).get_mac_address_table()
+    textfsm = make_driver(parser='textfsm').get_mac_address_table()
+    assert native == textfsm
+    assert native[0]['mac'] == '2c:41:38:88:ff:ff'
+    assert native[0]['interface'] == 'Bridge-Aggregation30'
+
+
+@pytest.mark.parametrize('optional_args', [
+    {'read_mode': 'prompt'}, {'read_mode': 'timing'}, {'parser': 'textfsm'}])
+def test_no_mac_address_found(optional_args):
+    """Empty table answers like raw_mac_table input."""
+    driver = make_driver('No mac address found.', **optional_args)
+    assert driver.get_mac_address_table() == ['No mac address found']
+    assert driver.get_mac_address_table(raw_mac_table='No mac address found.') == [
+        'No mac address found']
+    assert list(driver.iter_mac_address_table()) == []
+
+
+def test_unrecognised_output_falls_back_to_textfsm():
+    """Rows without the column header are parsed by the template."""
+    mac_table = MAC_TABLE.split('\n', 1)[1]
+    streamed = make_driver(mac_table, read_mode='prompt').get_mac_address_table()
+    assert len(streamed) == 5
+    assert streamed == make_driver(mac_table, parser='textfsm').get_mac_address_table()
+
+
+def test_cached_output_is_not_read_again():
+    """With the command cache the output is read once per session."""
+    driver = make_driver(read_mode='prompt', command_cache=True)
+    first = driver.get_mac_address_table()
+    assert driver.get_mac_address_table() == first
+    assert list(driver.iter_mac_address_table()) == first
+    assert driver.device.written.count('display mac-address') == 1
+
+
+def test_streaming_timeout_does_not_wait_twice():
+    """A silent channel fails after one timeout."""
+    driver = make_driver(read_mode='prompt')
+    driver.timeout = 0.2
+    driver.device.write_channel = lambda data: None
+    start = time.time()
+    with pytest.raises(CommandErrorException):
+        list(driver.iter_mac_address_table())
+    assert time.time() - start < 0.35
+
+
+def test_iter_mac_address_table_closed_early():
+    """Output of a generator closed early is drained from the channel."""
+    driver = make_driver(read_mode='prompt')
+    entries = driver.iter_mac_address_table()
+    assert next(entries)['vlan'] == '1'
+    entries.close()
+    assert driver.device.channel == ''
+
+
+def test_compact_table_rows_equal_entries():
+    """Compact table rows look like the list entries."""
+    entries = make_driver().get_mac_address_table()
+    table = make_driver().get_mac_address_table(compact=True)
+    assert len(table) == len(entries)
+    assert [dict(row) for row in table] == entries
+    assert table[-1]['mac'] == entries[-1]['mac']
+    assert table.mac_int(0) == 0x2c413888ffff
+    assert table.vlan(0) == 1
+    assert table.interfaces() == ['Bridge-Aggregation30', 'Bridge-Aggregation31',
+                                  'Bridge-Aggregation2']
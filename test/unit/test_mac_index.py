@@ -0,0 +1,36 @@
+"""Tests for the MAC/ARP index."""
+
+from fake_device import FakeClock
+
+from napalm_hp_comware.utils.mac_index import MacIndex
+
+MAC_ENTRIES = [
+    {'mac': '2c:41:38:88:ff:ff', 'interface': 'Bridge-Aggregation 30', 'vlan': '1'},
+    {'mac': 'a0:36:9f:00:ff:ff', 'interface': 'Bridge-Aggregation 30', 'vlan': '1'},
+    {'mac': 'a0:36:9f:00:ff:ff', 'interface': 'GigabitEthernet 1/0/5', 'vlan': '222'},
+]
+ARP_ENTRIES = [
+    {'mac': '2c:41:38:88:ff:ff', 'ip': '10.1.1.1', 'interface': 'Bridge-Aggregation 30'},
+]
+
+
+def test_lookups():
+    """MAC, port, VLAN and ARP lookups are answered from the index."""
+    index = MacIndex(MAC_ENTRIES, ARP_ENTRIES)
+    assert len(index) == 3
+    assert [r['vlan'] for r in index.lookup('a036-9f00-ffff')] == ['1', '222']
+    assert index.lookup('0000-0000-0001') == []
+    assert len(index.by_port('Bridge-Aggregation 30')) == 2
+    assert index.by_vlan(222)[0]['interface'] == 'GigabitEthernet 1/0/5'
+    assert index.ips('2C41.3888.FFFF') == ['10.1.1.1']
+    assert index.mac_for_ip('10.1.1.1') == '2c:41:38:88:ff:ff'
+
+
+def test_freshness():
+    """Index is stale after max_age seconds."""
+    clock = FakeClock()
+    index = MacIndex(MAC_ENTRIES, clock=clock)
+    clock.now = 10
+    assert index.is_fresh(11)
+    assert not index.is_fresh(10)
+    assert index.is_fresh(None)
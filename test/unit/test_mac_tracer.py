@@ -0,0 +1,104 @@
+"""Tests for the multi-hop MAC tracer."""
+
+import os
+
+import pytest
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.mac_tracer import MacTracer
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+with open(os.path.join(MOCK_DATA, 'display_version.txt')) as f:
+    VERSION = f.read()
+MAC_HEADER = 'MAC ADDR       VLAN ID  STATE          PORT INDEX               AGING TIME(s)\n'
+LLDP = """LLDP neighbor-information of port {idx}[{port}]:
+  Port ID          : {remote_port}
+  Port description : uplink
+  System name        : {name}
+  System description : HP Comware Platform Software
+  System capabilities supported : Bridge,Router
+  System capabilities enabled   : Bridge
+"""
+AGGREGATION = """Aggregation Interface: Bridge-Aggregation1
+Local:
+  Port             Status  Priority Oper-Key  Flag
+--------------------------------------------------------------------------------
+  XGE1/0/1         S       32768    1         {ACDEF}
+  XGE2/0/1         S       32768    1         {ACDEF}
+Remote:
+"""
+
+DEVICES = {
+    # core: MAC behind aggregation with members to two different devices
+    'core': {
+        'display mac-address': MAC_HEADER + '2c41-3888-0001 1 Learned BAGG1 AGING\n',
+        'display link-aggregation verbose': AGGREGATION,
+        'display lldp neighbor-information':
+            LLDP.format(idx=1, port='Ten-GigabitEthernet1/0/1', remote_port='25', name='dist-a')
+            + LLDP.format(idx=2, port='Ten-GigabitEthernet2/0/1', remote_port='25', name='dist-b'),
+    },
+    'dist-a': {
+        'display mac-address': MAC_HEADER + '2c41-3888-0001 1 Learned GE1/0/10 AGING\n',
+        'display link-aggregation verbose': '',
+        'display lldp neighbor-information':
+            LLDP.format(idx=10, port='GigabitEthernet1/0/10', remote_port='49', name='access'),
+    },
+    'dist-b': {
+        'display mac-address': MAC_HEADER,
+        'display link-aggregation verbose': '',
+        'display lldp neighbor-information': '',
+    },
+    'access': {
+        'display mac-address': MAC_HEADER + '2c41-3888-0001 1 Learned GE1/0/5 AGING\n',
+        'display link-aggregation verbose': '',
+        'display lldp neighbor-information': '',
+    },
+}
+
+
+class FakeDriver(HpComwareDriver):
+    """Driver connecting to a fake device."""
+
+    def __init__(self, opened, *args, **kwargs):
+        """Append the hostname to opened on every open()."""
+        super(FakeDriver, self).__init__(*args, **kwargs)
+        self.opened = opened
+
+    def open(self):
+        """Attach the fake device."""
+        outputs = dict(DEVICES[self.hostname], **{'display version': VERSION})
+        self.device = FakeChannelDevice(outputs)
+        self.opened.append(self.hostname)
+
+    def close(self):
+        """Nothing to close."""
+
+
+@pytest.fixture
+def opened():
+    """Hostnames opened by the drivers of one test."""
+    return []
+
+
+@pytest.fixture
+def driver_factory(opened):
+    """driver_factory of the tracer."""
+    return lambda hostname: FakeDriver(opened, hostname, 'user', 'pass')
+
+
+def test_trace_follows_all_aggregation_members(opened, driver_factory):
+    """Paths end at the edge port and at the device without the MAC."""
+    start = driver_factory('core')
+    start.open()
+    with MacTracer(driver_factory) as tracer:
+        paths = tracer.trace(start, '2c:41:38:88:00:01')
+        assert tracer.trace(start, '2c:41:38:88:00:01') == paths
+    by_end = dict((path[-1]['device'], path) for path in paths)
+    assert [hop['device'] for hop in by_end['access']] == ['core', 'dist-a', 'access']
+    assert by_end['access'][-1]['local_port'] == 'GigabitEthernet 1/0/5'
+    assert by_end['access'][-1]['next_device'] == ''
+    assert by_end['dist-b'][-1]['found'] is False
+    # every device was connected and read once
+    assert sorted(opened) == ['access', 'core', 'dist-a', 'dist-b']
@@ -0,0 +1,86 @@
+"""Tests for the timing events and their percentiles."""
+
+import os
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils import synthetic
+from napalm_hp_comware.utils.metrics import LatencyStats, TimingEvent, percentile
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+
+def _driver(**optional_args):
+    outputs = {'display device manuinfo': synthetic.device_manuinfo(2)}
+    for command in ('display version', 'display interface brief'):
+        with open(os.path.join(MOCK_DATA, command.replace(' ', '_') + '.txt')) as f:
+            outputs[command] = f.read()
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args=optional_args)
+    driver.device = FakeChannelDevice(outputs)
+    return driver
+
+
+def test_percentile_nearest_rank():
+    """p50/p95/p99 of a known distribution."""
+    values = list(range(100, 0, -1))
+    assert [percentile(values, q) for q in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([], 50) is None
+    stats = LatencyStats()
+    for elapsed in (0.1, 0.2, 0.3):
+        stats(TimingEvent('command', 'display arp', None, elapsed, None, elapsed, 10, None))
+    receive_time = stats.report()['commands']['display arp']['receive_time']
+    assert receive_time == {'count': 3, 'p50': 0.2, 'p95': 0.3, 'p99': 0.3}
+
+
+def test_events_of_getter():
+    """Command, parse and getter events of one get_facts_fast()."""
+    stats = LatencyStats()
+    driver = _driver(metrics_sink=stats)
+    driver.get_facts_fast()
+    kinds = [event.kind for event in stats.events]
+    assert kinds[-1] == 'getter' and kinds.count('getter') == 1
+    batch = [e for e in stats.events if e.kind == 'command' and ';' in e.command][0]
+    assert batch.command == 'display version; display interface brief; display device manuinfo'
+    assert 0 <= batch.first_byte <= batch.receive_time
+    assert batch.getter == 'get_facts_fast'
+    parsers = set(e.command for e in stats.events if e.kind == 'parse')
+    assert {'display_version', 'display_interface_brief', 'parse_device_manuinfo'} <= parsers
+    getter = stats.events[-1]
+    commands = [e for e in stats.events if e.kind == 'command']
+    assert getter.bytes == sum(e.bytes for e in commands)
+    assert getter.elapsed >= getter.receive_time + getter.parse_time
+    report = stats.report()
+    assert set(report['getters']['get_facts_fast']) == {
+        'elapsed', 'receive_time', 'bytes', 'parse_time'}
+    # the device is left unchanged
+    assert 'read_channel' not in vars(driver.device)
+
+
+def test_no_sink_no_timing():
+    """Without a sink the device is not wrapped and no event is built."""
+    driver = _driver()
+    calls = []
+
+    def read():
+        calls.append('read_channel' in vars(driver.device))
+        return 'output'
+    assert driver.metrics.timed_read(driver.device, 'display arp', read) == 'output'
+    assert calls == [False]
+    assert driver.metrics.timed_parse('len', len, 'abc') == 3
+    driver.get_facts_fast()
+    assert driver.metrics.as_dict()['getters']['get_facts_fast']['commands'] == 4
+
+
+def test_streamed_mac_table_is_timed_and_counted():
+    """The streamed read of get_mac_address_table is a command event."""
+    stats = LatencyStats()
+    driver = _driver(metrics_sink=stats, read_mode='prompt')
+    driver.device.outputs['display mac-address'] = synthetic.mac_address(100)
+    assert len(driver.get_mac_address_table()) == 100
+    event = [e for e in stats.events if e.command == 'display mac-address'][0]
+    assert event.kind == 'command' and event.getter == 'get_mac_address_table'
+    assert 0 <= event.first_byte <= event.receive_time
+    assert event.bytes > len(synthetic.mac_address(100))
+    counters = driver.metrics.as_dict()['getters']['get_mac_address_table']
+    assert counters['commands'] == 2 and counters['bytes'] == stats.events[-1].bytes
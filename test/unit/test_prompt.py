@@ -0,0 +1,32 @@
+"""Tests for Comware prompt detection."""
+
+import re
+
+from napalm_hp_comware.utils.prompt import is_interactive, is_rejected, prompt_pattern
+
+
+def test_prompt_pattern_matches_comware_views():
+    """User view, system view, sub-views and super password prompt."""
+    pattern = prompt_pattern('sw-01.lab')
+    assert re.search(pattern, 'Comware Software\n<sw-01.lab>')
+    assert re.search(pattern, '\n[sw-01.lab]')
+    assert re.search(pattern, '\n[sw-01.lab-GigabitEthernet1/0/1]')
+    assert re.search(pattern, ' Password:')
+    assert not re.search(pattern, '\n<sw-01xlab>')
+    assert not re.search(pattern, 'description <sw-01.lab> uplink\n')
+
+
+def test_interactive_commands():
+    """Commands asking questions need timing based reads."""
+    assert is_interactive('super 3')
+    assert is_interactive('save force')
+    assert not is_interactive('display version')
+
+
+def test_rejected_only_in_leading_lines():
+    """Errors follow the echo, markers later in the output are data."""
+    assert is_rejected("display foo\n     ^\n % Unrecognized command found at '^' position.")
+    assert is_rejected("  ^\n % Wrong parameter found at '^' position.\nInvalid input: x")
+    assert not is_rejected('#\n sysname sw-01\n#\ninterface GigabitEthernet1/0/1\n'
+                           ' description Invalid input\n#\n')
+    assert not is_rejected('')
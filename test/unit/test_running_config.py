@@ -0,0 +1,122 @@
+"""Tests for the running config model."""
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils import synthetic
+from napalm_hp_comware.utils.fast_parsers import INTERFACE_IPV4_RE, SYSNAME_RE
+from napalm_hp_comware.utils.running_config import RunningConfig, parse_vlan_list
+
+CONFIG = """#
+ version 7.1.045, Release 2418P06
+#
+ sysname core-01
+#
+ lldp global enable
+#
+vlan 10
+ name users
+#
+interface Vlan-interface10
+ description users gateway
+ ip address 10.0.10.1 255.255.255.0
+ ip address 10.0.11.1 255.255.255.0 sub
+ ipv6 address 2001:DB8:10::1/64
+ ipv6 address FE80::1 link-local
+#
+interface GigabitEthernet1/0/1
+ port link-mode bridge
+ port link-type trunk
+ undo port trunk permit vlan 1
+ port trunk permit vlan 10 20 to 22
+ port trunk pvid vlan 10
+#
+interface GigabitEthernet1/0/2
+ port access vlan 10
+ shutdown
+#
+interface GigabitEthernet1/0/3
+ port link-type hybrid
+ port hybrid vlan 10 untagged
+ port hybrid vlan 30 to 31 tagged
+#
+return
+"""
+
+
+def test_sections_and_attributes():
+    """Global lines, sections and lazily parsed interface attributes."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass')
+    config = RunningConfig(CONFIG, key=driver.port_key)
+    assert config.sysname == 'core-01'
+    assert [s.name for s in config.sections_of('vlan')] == ['10']
+    vlan_if = config.interface('Vlan10')
+    assert vlan_if.description == 'users gateway'
+    assert vlan_if.ipv4 == [('10.0.10.1', 24), ('10.0.11.1', 24)]
+    assert vlan_if.ipv6 == [('2001:DB8:10::1', 64), ('FE80::1', u'N/A')]
+    trunk = config.interface('GE1/0/1')
+    assert (trunk.link_type, trunk.pvid, trunk.vlans) == ('trunk', 10, [10, 20, 21, 22])
+    access = config.interface('GigabitEthernet 1/0/2')
+    assert (access.link_type, access.vlans, access.shutdown) == (None, [10], True)
+    hybrid = config.interface('GigabitEthernet1/0/3')
+    assert hybrid.hybrid_vlans == {'tagged': [30, 31], 'untagged': [10]}
+    assert parse_vlan_list(['all'])[-1] == 4094
+
+
+def test_matches_replaced_regexes():
+    """Same sysname and primary addresses as the regexes on a big config."""
+    raw = synthetic.current_configuration(400)
+    config = RunningConfig(raw)
+    assert config.sysname == ''.join(SYSNAME_RE.findall(raw))
+    primary = [(i.name, i.ipv4[0][0]) for i in config.interfaces.values() if i.ipv4]
+    assert primary == [(name, ip) for name, ip, mask in INTERFACE_IPV4_RE.findall(raw)]
+
+
+def test_getters_share_one_parse():
+    """Config getters reuse the cached full config and its parse."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass', optional_args={'command_cache': True})
+    driver.device = FakeChannelDevice({'display current-configuration': CONFIG})
+    config = driver.get_running_config()
+    interfaces_ip = driver.get_interfaces_ip()
+    assert interfaces_ip == {'Vlan-interface10': {
+        'ipv4': {'10.0.10.1': {'prefix_length': 24}, '10.0.11.1': {'prefix_length': 24}},
+        'ipv6': {'2001:DB8:10::1': {'prefix_length': 64}, 'FE80::1': {'prefix_length': u'N/A'}},
+    }}
+    assert driver.get_running_config() is config
+    assert driver.device.written.count('display current-configuration') == 1
+
+
+def test_scoped_config_with_fallback():
+    """Scoped forms are used, rejected ones fall back and are not retried."""
+    interfaces = CONFIG[CONFIG.index('interface Vlan-interface10'):]
+    driver = HpComwareDriver('sw-01', 'user', 'pass')
+    driver.device = FakeChannelDevice({
+        'display current-configuration interface':
+            "                                  ^\n % Wrong parameter found at '^' position.",
+        'display current-configuration | begin interface': interfaces,
+        'display current-configuration | include sysname': ' sysname core-01',
+        'display current-configuration': CONFIG,
+    })
+    assert driver.get_interfaces_ip() == driver.get_interfaces_ip()
+    assert driver._scoped_config_output('display current-configuration | include sysname') \
+        == ' sysname core-01'
+    assert driver.device.written.count('display current-configuration interface') == 1
+    assert 'display current-configuration' not in driver.device.written
+    getter = driver.metrics.as_dict()['getters']['get_interfaces_ip']
+    # screen-length, rejected form and two '| begin interface'
+    assert getter['calls'] == 2 and getter['commands'] == 4
+    assert getter['bytes'] < 2 * len(CONFIG)
+
+
+def test_scoped_config_quoting_error_marker():
+    """A description quoting an error marker does not reject the form."""
+    interfaces = CONFIG[CONFIG.index('interface Vlan-interface10'):].replace(
+            'description users gateway', 'description Invalid input % Unrecognized command')
+    driver = HpComwareDriver('sw-01', 'user', 'pass')
+    driver.device = FakeChannelDevice({
+        'display current-configuration interface': interfaces,
+        'display current-configuration': CONFIG,
+    })
+    assert list(driver.get_interfaces_ip()) == ['Vlan-interface10']
+    assert driver._rejected_commands == set()
+    assert 'display current-configuration' not in driver.device.written
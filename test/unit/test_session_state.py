@@ -0,0 +1,63 @@
+"""Tests for the per session state of the driver."""
+
+import os
+
+import pytest
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+SESSION_COMMANDS = [
+    ('disable_pageing', 'screen-length disable'),
+    ('get_current_privilege', 'display users'),
+    ('get_os_version', 'display version'),
+]
+
+
+def _outputs():
+    outputs = {}
+    for command in ('display users', 'display version'):
+        with open(os.path.join(MOCK_DATA, command.replace(' ', '_') + '.txt')) as f:
+            outputs[command] = f.read()
+    return outputs
+
+
+class SessionDriver(HpComwareDriver):
+    """Driver connecting a new fake device on every open()."""
+
+    def _connect(self):
+        return FakeChannelDevice(_outputs())
+
+
+@pytest.fixture
+def driver():
+    driver = SessionDriver('sw-01', 'user', 'pass')
+    driver.open()
+    return driver
+
+
+@pytest.mark.parametrize('method, command', SESSION_COMMANDS)
+def test_asked_once_per_session(driver, method, command):
+    """Session facts are asked once, again after reset() and reconnect."""
+    first = getattr(driver, method)()
+    assert getattr(driver, method)() == first
+    assert driver.device.written.count(command) == 1
+
+    driver.session.reset()
+    assert getattr(driver, method)() == first
+    assert driver.device.written.count(command) == 2
+
+    driver.open()
+    getattr(driver, method)()
+    getattr(driver, method)()
+    assert driver.device.written.count(command) == 1
+
+
+def test_refresh_asks_again(driver):
+    """refresh=True reads the user level from the device."""
+    assert driver.get_current_privilege() == '1'
+    assert driver.get_current_privilege(refresh=True) == '1'
+    assert driver.device.written.count('display users') == 2
@@ -0,0 +1,137 @@
+"""Tests of the drivers against the simulated Comware SSH server."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+asyncssh = pytest.importorskip('asyncssh')
+
+from napalm_hp_comware import HpComwareDriver  # noqa: E402
+from napalm_hp_comware.hp_comware_async import AsyncHpComwareDriver  # noqa: E402
+from napalm_hp_comware.simulator import ComwareSimulator, synthetic_outputs  # noqa: E402
+
+FAST_OPEN = {'read_mode': 'prompt', 'global_delay_factor': 0.1, 'fast_cli': True}
+
+
+@pytest.fixture(scope='module')
+def switch():
+    with ComwareSimulator(synthetic_outputs(rows=50)) as simulator:
+        yield simulator
+
+
+def _driver(switch, **optional_args):
+    return HpComwareDriver('127.0.0.1', 'admin', 'admin', timeout=10, optional_args=dict(
+            FAST_OPEN, port=switch.port, secret='super', **optional_args))
+
+
+def test_open_escalate_and_get_facts(switch):
+    """Login, paging, super and privileged commands of one netmiko session."""
+    device = _driver(switch)
+    device.open()
+    try:
+        sent = len(switch.commands)
+        facts = device.get_facts()
+        assert facts['hostname'] == ('sw-01',)
+        assert len(facts['interface_list']) == 51
+        assert device.current_user_level == '3'
+        assert switch.commands[sent:] == [
+            'screen-length disable', 'display version', 'display interface brief',
+            'display users', 'super', 'display users', 'display device manuinfo',
+            'display current-configuration | include sysname']
+        assert device.cli(['display arp'])['display arp'].count('\n') == 52
+    finally:
+        device.close()
+
+
+def test_concurrent_sessions(switch):
+    """Sessions of several threads are independent."""
+    def run(_):
+        device = _driver(switch)
+        device.open()
+        try:
+            return len(device.get_arp_table()), device.get_current_privilege()
+        finally:
+            device.close()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(run, range(4))) == [(50, '1')] * 4
+
+
+def test_paging_latency_and_throttling():
+    """Pages until 'screen-length disable', delays of latency and bandwidth."""
+    outputs = {'display arp': '\n'.join('line {}'.format(i) for i in range(30))}
+
+    async def run(port):
+        async with asyncssh.connect('127.0.0.1', port=port, username='admin',
+                                    password='admin', known_hosts=None) as connection:
+            process = await connection.create_process(term_type='vt100')
+            await process.stdout.readuntil('<sw-01>')
+            process.stdin.write('display arp\n')
+            first_page = await process.stdout.readuntil('---- More ----')
+            process.stdin.write(' ')
+            second_page = await process.stdout.readuntil('---- More ----')
+            process.stdin.write(' ')
+            rest = await process.stdout.readuntil('<sw-01>')
+            process.stdin.write('screen-length disable\n')
+            await process.stdout.readuntil('<sw-01>')
+            start = time.perf_counter()
+            process.stdin.write('display arp\n')
+            unpaged = await process.stdout.readuntil('<sw-01>')
+            return first_page, second_page + rest, unpaged, time.perf_counter() - start
+
+    with ComwareSimulator(outputs, page_lines=10, command_latency={'display arp': 0.2},
+                          bandwidth=2000, chunk_size=100) as simulator:
+        first_page, rest, unpaged, seconds = asyncio.run(run(simulator.port))
+    assert 'line 9' in first_page and 'line 10' not in first_page
+    assert 'line 29' in rest and rest.count('---- More ----') == 1
+    assert '---- More ----' not in unpaged and 'line 29' in unpaged
+    # 0.2s latency and about 230 characters at 2000 per second
+    assert seconds > 0.3
+
+
+def test_async_driver_and_filters(switch):
+    """asyncio driver runs against the same server, pipes are filtered."""
+    async def run():
+        async with AsyncHpComwareDriver('127.0.0.1', 'admin', 'admin', timeout=10,
+                                        optional_args={'port': switch.port}) as device:
+            return await device.cli(['display arp | include 10.0.0.4',
+                                     'display arp | begin 10.0.0.49',
+                                     'display current-configuration'])
+    outputs = asyncio.run(run())
+    assert outputs['display arp | include 10.0.0.4'].splitlines()[0].startswith('10.0.0.4 ')
+    assert len(outputs['display arp | begin 10.0.0.49'].strip().splitlines()) == 1
+    assert 'Unrecognized command' in outputs['display current-configuration']
+
+
+def test_async_facts_scoped_and_fast(switch):
+    """Async get_facts reads the scoped config, fast_facts one batch."""
+    async def run(**optional_args):
+        sent = len(switch.commands)
+        async with AsyncHpComwareDriver('127.0.0.1', 'admin', 'admin', timeout=10,
+                                        optional_args=dict(optional_args, port=switch.port,
+                                                           secret='super')) as device:
+            facts = await device.get_facts()
+            getters = device.metrics.as_dict()['getters']
+        return facts, switch.commands[sent:], getters
+    facts, commands, getters = asyncio.run(run())
+    assert facts['hostname'] == ('sw-01',) and len(facts['interface_list']) == 51
+    assert commands[-1] == 'display current-configuration | include sysname'
+    assert getters['get_facts']['calls'] == 1 and getters['get_facts']['commands'] == 7
+    fast_facts, commands, getters = asyncio.run(run(fast_facts=True))
+    assert fast_facts['hostname'] == facts['hostname']
+    assert fast_facts['serial_number'] == facts['serial_number']
+    assert commands == ['screen-length disable', 'display version', 'display interface brief',
+                        'display device manuinfo', 'display users', 'super', 'display users',
+                        'display device manuinfo']
+    assert list(getters) == ['get_facts']
+
+
+def test_async_driver_has_only_async_getters():
+    """Getters of the sync driver without async version do not exist."""
+    for name in ('get_interfaces_ip', 'get_lldp_neighbors_detail', 'trace_mac_address',
+                 'trace_mac_addresses', 'get_running_config', 'iter_mac_address_table'):
+        assert not hasattr(AsyncHpComwareDriver, name)
+    for name in ('get_facts', 'get_facts_fast', 'get_interfaces', 'get_mac_address_table',
+                 'get_arp_table', 'get_lldp_neighbors', 'cli'):
+        assert asyncio.iscoroutinefunction(getattr(AsyncHpComwareDriver, name))
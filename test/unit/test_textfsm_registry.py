@@ -0,0 +1,67 @@
+"""Tests for the compiled TextFSM template registry."""
+
+import os
+import threading
+
+import pytest
+from napalm.base.exceptions import TemplateNotImplemented
+from napalm.base.helpers import textfsm_extractor as napalm_textfsm_extractor
+
+from napalm_hp_comware import HpComwareDriver
+from napalm_hp_comware.utils.textfsm_registry import TextFSMRegistry
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+TEMPLATE_FIXTURES = [
+    ('display_interface_brief', 'display_interface_brief.txt'),
+    ('display_mac_address_all', 'display_mac_address.txt'),
+    ('display_link_aggregation_verbose', 'display_link-aggregation_verbose.txt'),
+    ('display_lldp_neighbor_information_interface',
+     'display_lldp_neighbor-information_interface.txt'),
+    ('display_users', 'display_users.txt'),
+    ('display_version', 'display_version.txt'),
+]
+
+
+def read_fixture(filename):
+    """Return content of a mock_data file."""
+    with open(os.path.join(MOCK_DATA, filename)) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('template_name,filename', TEMPLATE_FIXTURES)
+def test_same_result_as_napalm_extractor(template_name, filename):
+    """Registry returns what napalm textfsm_extractor returns."""
+    raw_text = read_fixture(filename)
+    driver = HpComwareDriver('sw-01', 'user', 'pass')
+    registry = TextFSMRegistry()
+    expected = napalm_textfsm_extractor(driver, template_name, raw_text)
+    assert registry.parse(template_name, raw_text) == expected
+    # second parse reuses the compiled parser
+    assert registry.parse(template_name, raw_text) == expected
+
+
+def test_preload_and_threads():
+    """Preloaded parsers are shared safely between threads."""
+    registry = TextFSMRegistry()
+    registry.preload()
+    raw_text = read_fixture('display_interface_brief.txt')
+    expected = registry.parse('display_interface_brief', raw_text)
+    results = []
+
+    def worker():
+        for _ in range(20):
+            results.append(registry.parse('display_interface_brief', raw_text) == expected)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(results) and len(results) == 80
+
+
+def test_missing_template():
+    """Unknown templates raise napalm TemplateNotImplemented."""
+    with pytest.raises(TemplateNotImplemented):
+        TextFSMRegistry().parse('display_nothing', '')
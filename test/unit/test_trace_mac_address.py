@@ -0,0 +1,107 @@
+"""Tests for MAC address tracing."""
+
+import os
+
+import pytest
+
+from fake_device import FakeChannelDevice
+
+from napalm_hp_comware import HpComwareDriver
+
+MOCK_DATA = os.path.join(os.path.dirname(__file__), 'hp_comware', 'mock_data')
+
+MAC_TABLE = """MAC ADDR       VLAN ID  STATE          PORT INDEX               AGING TIME(s)
+2c41-3888-0001 1        Learned        BAGG30                   AGING
+2c41-3888-0002 1        Learned        BAGG31                   AGING
+2c41-3888-0003 10       Learned        GE1/0/3                  AGING
+2c41-3888-0004 10       Learned        GE1/0/4                  AGING
+"""
+
+
+def read_fixture(filename):
+    """Return content of a mock_data file."""
+    with open(os.path.join(MOCK_DATA, filename)) as f:
+        return f.read()
+
+
+def make_driver():
+    """Driver with a fake Comware v5 device."""
+    driver = HpComwareDriver('sw-01', 'user', 'pass')
+    driver.device = FakeChannelDevice({
+        'display mac-address': MAC_TABLE,
+        'display link-aggregation verbose':
+            read_fixture('display_link-aggregation_verbose_all.txt'),
+        'display lldp neighbor-information':
+            read_fixture('display_lldp_neighbor-information.txt'),
+        'display version': read_fixture('display_version.txt'),
+    })
+    return driver
+
+
+def test_trace_mac_addresses():
+    """Every MAC is resolved from one fetch of each table."""
+    driver = make_driver()
+    results = driver.trace_mac_addresses([
+        '2c:41:38:88:00:01', '2c41.3888.0002', '2c41-3888-0003', '2c41-3888-0004',
+        '0000-0000-0000',
+    ])
+    assert results['2c:41:38:88:00:01']['local_port'] == 'Bridge-Aggregation 30'
+    assert results['2c:41:38:88:00:01']['remote_port'] == '45'
+    assert results['2c41.3888.0002']['next_device'] == 'Site-SW-b9a'
+    assert results['2c41-3888-0003']['next_device'] == 'Site-SW-b7'
+    assert results['2c41-3888-0004']['found'] is True
+    assert results['2c41-3888-0004']['lldp_answer'] is False
+    assert results['0000-0000-0000']['found'] is False
+    assert sorted(set(driver.device.written)) == [
+        'display link-aggregation verbose', 'display lldp neighbor-information',
+        'display mac-address', 'display version', 'screen-length disable']
+
+
+def test_lldp_getters_share_one_snapshot():
+    """LLDP getters and trace_mac_address need one LLDP command per session."""
+    driver = make_driver()
+    driver.device.outputs['display mac-address 2c41-3888-0003'] = '\n'.join(
+            MAC_TABLE.splitlines()[0:4:3])
+    neighbors = driver.get_lldp_neighbors()
+    assert neighbors['GigabitEthernet4/0/17'] == [{'hostname': 'Site-SW-b6-3', 'port': '97'}]
+    detail = driver.get_lldp_neighbors_detail(interface='GE4/0/17')
+    assert detail[0]['remote_system_name'] == 'Site-SW-b6-3'
+    assert driver.get_lldp_neighbors_detail(interface='GE9/0/9') == {}
+    assert len(driver.get_lldp_neighbors_detail()) == sum(len(n) for n in neighbors.values())
+    assert driver.trace_mac_address('2c41-3888-0003')['next_device'] == 'Site-SW-b7'
+    assert driver.device.written.count('display lldp neighbor-information') == 1
+    assert driver.device.written.count('display version') == 1
+
+
+@pytest.mark.parametrize('parser', ['native', 'textfsm'])
+def test_lldp_snapshot_verbose_on_v7(parser):
+    """A fresh session asks v7 for the verbose form, with description and capabilities."""
+    driver = make_driver()
+    driver.parser = parser
+    driver.device.outputs.update({
+        'display version': read_fixture('display_version_v7.txt'),
+        'display lldp neighbor-information':
+            read_fixture('display_lldp_neighbor-information_v7.txt'),
+        'display lldp neighbor-information verbose':
+            read_fixture('display_lldp_neighbor-information_v7_verbose.txt'),
+    })
+    detail = driver.get_lldp_neighbors_detail()
+    assert [(n['local_interface'], n['remote_system_name']) for n in detail] == [
+        ('GigabitEthernet1/0/1', 'core-01'), ('GigabitEthernet1/0/1', 'ap-17'),
+        ('Ten-GigabitEthernet1/0/50', 'core-02')]
+    assert detail[1]['remote_system_description'] == 'Access point'
+    assert detail[1]['remote_system_capab'] == 'Bridge,WLAN access point'
+    assert detail[1]['remote_system_enable_capab'] == 'WLAN access point'
+    assert driver.get_lldp_neighbors_detail(interface='GE1/0/1') == detail[:2]
+    assert driver.device.written == [
+        'screen-length disable', 'display version', 'display lldp neighbor-information verbose']
+
+
+def test_malformed_mac_is_not_found():
+    """Malformed MACs are rejected before any lookup."""
+    for use_mac_index in (False, True):
+        driver = make_driver()
+        driver.use_mac_index = use_mac_index
+        for mac_address in ('zz:41:38:88:00:03', '2c41-3888-00', 'x2c41388800031'):
+            assert driver.trace_mac_address(mac_address)['found'] is False
+        assert driver.device.written == []
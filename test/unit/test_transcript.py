@@ -0,0 +1,79 @@
+"""Tests for recording sessions and replaying them offline."""
+
+import time
+
+import pytest
+
+asyncssh = pytest.importorskip('asyncssh')
+
+from napalm_hp_comware import HpComwareDriver  # noqa: E402
+from napalm_hp_comware.simulator import ComwareSimulator, synthetic_outputs  # noqa: E402
+from napalm_hp_comware.transcript import Transcript, TranscriptMismatch  # noqa: E402
+
+FAST_OPEN = {'global_delay_factor': 0.1, 'fast_cli': True, 'secret': 'l3-secret'}
+
+
+def _session(device):
+    device.open()
+    try:
+        return device.get_facts(), device.get_arp_table(), device.cli(['display version'])
+    finally:
+        device.close()
+
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    """Transcript of a prompt mode session with 0.2s per command latency."""
+    path = str(tmp_path_factory.mktemp('transcripts') / 'sw-01.jsonl.gz')
+    with ComwareSimulator(synthetic_outputs(rows=20), latency=0.2,
+                          super_password='l3-secret') as switch:
+        device = HpComwareDriver('127.0.0.1', 'admin', 'admin', timeout=10, optional_args=dict(
+                FAST_OPEN, port=switch.port, read_mode='prompt', record=path))
+        start = time.perf_counter()
+        results = _session(device)
+        return path, results, time.perf_counter() - start
+
+
+def _replay(path, **optional_args):
+    return HpComwareDriver('sw-01', 'admin', 'other', timeout=10, optional_args=dict(
+            FAST_OPEN, replay=path, **optional_args))
+
+
+def test_transcript_content(recording):
+    """Commands in order, chunk times, passwords not kept."""
+    path, _, _ = recording
+    transcript = Transcript.load(path)
+    assert transcript.base_prompt == 'sw-01'
+    commands = transcript.commands()
+    assert commands[:3] == ['screen-length disable', 'display version', 'display interface brief']
+    assert 'super' in commands
+    assert [e[2] for e in transcript.events if e[1] == 'p'] == ['']
+    assert not any('l3-secret' in e[2] for e in transcript.events)
+    offsets = [e[0] for e in transcript.events]
+    assert offsets == sorted(offsets)
+
+
+def test_replay_fast_and_at_original_speed(recording):
+    """Replays return the recorded results, fast or at recorded speed."""
+    path, results, recorded_seconds = recording
+    start = time.perf_counter()
+    assert _session(_replay(path, read_mode='prompt')) == results
+    fast_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    assert _session(_replay(path, read_mode='prompt', replay_speed=1.0)) == results
+    original_seconds = time.perf_counter() - start
+    assert fast_seconds < recorded_seconds / 2 < original_seconds
+
+
+def test_replay_with_other_read_mode(recording):
+    """A prompt mode recording replays with timing reads."""
+    path, results, _ = recording
+    assert _session(_replay(path, read_mode='timing')) == results
+
+
+def test_replay_rejects_unrecorded_command(recording):
+    path, _, _ = recording
+    device = _replay(path, read_mode='prompt')
+    device.open()
+    with pytest.raises(TranscriptMismatch):
+        device.cli(['display mac-address'])